@@ -1,9 +1,9 @@
-import streamlit as st
 import os
 import json
-import requests
 import re
-from groq import Groq
+import time
+import hashlib
+from groq import RateLimitError
 from prompts import (
     GET_COMPANY_DATA_SYSTEM_PROMPT,
     GET_COMPANY_PROFILE_PROMPT_TEMPLATE,
@@ -32,109 +32,245 @@ from new_prompts import (
     PRODUCT_HEALTHTECH_PROMPT
 )
 import concurrent.futures
+from pipeline import Pipeline
+from response_cache import get_response_cache
+from layer_cache import cached_layer
+from providers import get_perplexity_session, get_groq_client
+from rate_limit import Throttled
+from resilience import resilient_call
 
-def _extract_json_from_response(raw_content):
-    """Extracts and merges all JSON objects from a raw string response."""
-    print(f"--- RAW CONTENT ---\n{raw_content}\n--- END RAW CONTENT ---")
-    
-    merged_json = {}
-    
-    # First, try to find JSON within ```json ... ``` blocks
-    json_blocks = re.findall(r'```json\s*(\{.*?\})\s*```', raw_content, re.DOTALL)
-    for block in json_blocks:
+PERPLEXITY_MODEL = "sonar-pro"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_TOKENS = re.compile(r'[{}"\\]')
+_FENCE_OPEN = re.compile(r'```json\s*\Z')
+_FENCE_CLOSE = re.compile(r'\s*```')
+
+def _skip_json_object(text, start):
+    """Returns the index just past the balanced {...} starting at `start`, ignoring braces inside strings."""
+    depth = 0
+    in_string = False
+    escaped_until = -1
+    for match in _JSON_TOKENS.finditer(text, start):
+        index = match.start()
+        if index < escaped_until:
+            continue
+        char = match.group()
+        if in_string:
+            if char == '\\':
+                escaped_until = index + 2
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return len(text)
+
+def _merge_json_objects(raw_content, log=False):
+    """
+    Merges all top-level JSON objects in a raw string response in a single
+    pass; {} when there are none. Objects inside ```json fences are merged
+    first, so keys from unfenced objects win.
+    """
+    fenced = {}
+    unfenced = {}
+    start = raw_content.find('{')
+    while start != -1:
         try:
-            merged_json.update(json.loads(block))
+            obj, end = _JSON_DECODER.raw_decode(raw_content, start)
         except json.JSONDecodeError as e:
-            print(f"!!! JSONDecodeError in json block: {e}")
-
-    # Then, process the rest of the content
-    content_without_blocks = re.sub(r'```json\s*(\{.*?\})\s*```', '', raw_content, flags=re.DOTALL)
-    
-    # Find all top-level JSON objects in the remaining content
-    brace_level = 0
-    start_index = -1
-    
-    for i, char in enumerate(content_without_blocks):
-        if char == '{':
-            if brace_level == 0:
-                start_index = i
-            brace_level += 1
-        elif char == '}':
-            if brace_level > 0:
-                brace_level -= 1
-                if brace_level == 0 and start_index != -1:
-                    json_str = content_without_blocks[start_index:i+1]
-                    try:
-                        merged_json.update(json.loads(json_str))
-                        start_index = -1
-                    except json.JSONDecodeError as e:
-                        print(f"!!! JSONDecodeError parsing object: {e}")
+            if log:
+                print(f"!!! JSONDecodeError parsing object: {e}")
+            end = _skip_json_object(raw_content, start)
+        else:
+            is_fenced = _FENCE_OPEN.search(raw_content, max(0, start - 64), start) and _FENCE_CLOSE.match(raw_content, end)
+            (fenced if is_fenced else unfenced).update(obj)
+        start = raw_content.find('{', end)
+    return {**fenced, **unfenced}
 
+def _extract_json_from_response(raw_content, log=None):
+    """
+    Extracts and merges all top-level JSON objects from a raw string response
+    (see _merge_json_objects). Set LOG_RAW_RESPONSES=1 (or pass log=True) to
+    print the raw content and decode errors.
+    """
+    if log is None:
+        log = os.getenv("LOG_RAW_RESPONSES", "").lower() in ("1", "true", "yes")
+    if log:
+        print(f"--- RAW CONTENT ---\n{raw_content}\n--- END RAW CONTENT ---")
+
+    merged_json = _merge_json_objects(raw_content, log)
     if not merged_json:
-        print(f"!!! FAILED TO EXTRACT JSON. Raw response was:\n{raw_content}")
+        print("!!! FAILED TO EXTRACT JSON." + (f" Raw response was:\n{raw_content}" if log else ""))
         return {"error": "Could not find a valid JSON object in the model's response."}
 
     return merged_json
 
-def _make_perplexity_request(prompt_template, startup_name, sector):
-    """Makes a single request to the Perplexity API."""
+PERPLEXITY_URL = "https://api.perplexity.ai/chat/completions"
+
+def _perplexity_messages(prompt_template, startup_name, sector):
+    prompt = prompt_template.format(startup_name=startup_name, sector=sector)
+    return [
+        {"role": "system", "content": GET_COMPANY_DATA_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def _make_perplexity_request(prompt_template, startup_name, sector, ttl=None, fresh=False):
+    """
+    Makes a single request to the Perplexity API. `ttl` limits the age of a
+    cached response that may be reused; `fresh` skips the cache lookup.
+    """
     api_key = os.getenv("PERPLEXITY_API_KEY")
     if not api_key:
         return {"error": "Critical: PERPLEXITY_API_KEY environment variable not found."}
 
-    url = "https://api.perplexity.ai/chat/completions"
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "authorization": f"Bearer {api_key}"
-    }
-    
-    prompt = prompt_template.format(startup_name=startup_name, sector=sector)
-    
+    headers = {"authorization": f"Bearer {api_key}"}
     payload = {
-        "model": "sonar-pro",
-        "messages": [
-            {"role": "system", "content": GET_COMPANY_DATA_SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ]
+        "model": PERPLEXITY_MODEL,
+        "messages": _perplexity_messages(prompt_template, startup_name, sector)
     }
 
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
+    cache = get_response_cache()
+    cache_key = cache.make_key("perplexity", PERPLEXITY_MODEL, payload["messages"]) if cache else None
+    cached, cached_at = cache.get("perplexity", cache_key, ttl) if cache and not fresh else (None, None)
+    if cached is not None:
+        return _with_fetched_at(_extract_json_from_response(cached), cached_at)
+
+    def post():
+        response = get_perplexity_session().post(PERPLEXITY_URL, headers=headers, json=payload, timeout=60)
+        if response.status_code == 429:
+            raise Throttled(response.headers)
         response.raise_for_status()
-        raw_content = response.json()['choices'][0]['message']['content']
-        return _extract_json_from_response(raw_content)
+        return response.json()['choices'][0]['message']['content'], response.headers
+
+    try:
+        raw_content = resilient_call("perplexity", PERPLEXITY_MODEL, post)
+        data = _extract_json_from_response(raw_content)
+        # An answer without JSON would otherwise keep failing until its TTL; only cache usable ones.
+        if cache and "error" not in data:
+            cache.set("perplexity", cache_key, raw_content)
+        return data
     except Exception as e:
         print(f"!!! PERPLEXITY API ERROR: {e}") 
         return {"error": f"An unexpected error occurred with Perplexity: {e}"}
 
 
+def _groq_chat_completion(system_prompt, user_prompt, temperature):
+    """Runs a single Groq chat completion and returns the raw message content."""
+    messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+
+    cache = get_response_cache()
+    cache_key = cache.make_key("groq", GROQ_MODEL, messages, temperature) if cache else None
+    cached, _ = cache.get("groq", cache_key) if cache else (None, None)
+    if cached is not None:
+        return cached
+
+    def create():
+        try:
+            response = get_groq_client().chat.completions.with_raw_response.create(
+                model=GROQ_MODEL,
+                messages=messages,
+                temperature=temperature,
+            )
+        except RateLimitError as e:
+            raise Throttled(e.response.headers)
+        return response.parse().choices[0].message.content, response.headers
+
+    raw_content = resilient_call("groq", GROQ_MODEL, create)
+    if cache and _merge_json_objects(raw_content):
+        cache.set("groq", cache_key, raw_content)
+    return raw_content
+
+
+# Each Layer 1 section and the top-level fields its prompt template asks for.
+# Downstream layers subscribe to these fields in the streaming pipeline.
+COMPANY_DATA_SECTIONS = {
+    "profile": (GET_COMPANY_PROFILE_PROMPT_TEMPLATE, [
+        "name", "foundedYear", "geo", "domain", "description", "metrics", "social_media",
+        "category", "business_model", "revenue_model", "pricing_model", "revenue_stream_diversified",
+    ]),
+    "financials": (GET_FINANCIALS_PROMPT_TEMPLATE, [
+        "total_funding", "last_funding_round", "valuation", "revenue", "profitability",
+        "key_investors", "stage", "aggregate_founder_shareholding",
+    ]),
+    "market": (GET_MARKET_COMPETITION_PROMPT_TEMPLATE, [
+        "market_size", "market_growth_rate", "competitive_advantage", "product_differentiation",
+        "innovative_solution", "technology_stack", "product_roadmap", "competitors", "patents",
+        "product_validation",
+    ]),
+    "team": (GET_TEAM_CULTURE_PROMPT_TEMPLATE, [
+        "founders_analysis", "key_hires", "employee_growth_rate", "glassdoor_rating",
+    ]),
+}
+
+COMPANY_DATA_FIELDS = [field for _, fields in COMPANY_DATA_SECTIONS.values() for field in fields]
+
+# How long each section stays fresh in a report. A company's profile rarely
+# changes, its financials often do. Overridable with e.g. FINANCIALS_TTL_HOURS.
+# Layer 1 cache lookups use the shorter of this and PERPLEXITY_CACHE_TTL_HOURS.
+SECTION_TTL_HOURS = {
+    "profile": 24 * 30,
+    "financials": 24,
+    "market": 24 * 7,
+    "team": 24 * 7,
+}
+
+def section_ttl(section):
+    """The section's TTL in seconds."""
+    return float(os.getenv(f"{section.upper()}_TTL_HOURS", SECTION_TTL_HOURS[section])) * 3600
+
+# A Perplexity answer served from the response cache carries the time it was
+# fetched under this key, so its section is dated by the cache entry, not now.
+FETCHED_AT_KEY = "_fetched_at"
+
+def _with_fetched_at(data, fetched_at):
+    if "error" not in data:
+        data[FETCHED_AT_KEY] = fetched_at
+    return data
+
+def pop_fetched_at(data, now=None):
+    """Removes and returns a Layer 1 answer's fetch time; an answer fetched live counts as fetched `now`."""
+    fetched_at = data.pop(FETCHED_AT_KEY, None)
+    if fetched_at is None:
+        fetched_at = time.time() if now is None else now
+    return fetched_at
+
+
 # --- KNOWLEDGE LAYER 1: LIVE WEB SEARCH VIA PERPLEXITY AI (Working) ---
-@st.cache_data
-def get_company_data(startup_name, sector):
+# No st.cache_data here: the response cache already reuses answers, within each section's TTL.
+def fetch_company_section(section, startup_name, sector):
+    """Fetches a single Layer 1 section (profile, financials, market or team)."""
+    template, _ = COMPANY_DATA_SECTIONS[section]
+    return _make_perplexity_request(template, startup_name, sector, ttl=section_ttl(section))
+
+def get_company_data(startup_name, sector, fetched_at=None):
     """
     Gathers company data from Perplexity AI by making parallel API calls.
+    `fetched_at`, if given, is filled with the fetch time of each section
+    that succeeded.
     """
     company_data = {}
-    
-    prompt_templates = {
-        "profile": GET_COMPANY_PROFILE_PROMPT_TEMPLATE,
-        "financials": GET_FINANCIALS_PROMPT_TEMPLATE,
-        "market": GET_MARKET_COMPETITION_PROMPT_TEMPLATE,
-        "team": GET_TEAM_CULTURE_PROMPT_TEMPLATE,
-    }
 
     with concurrent.futures.ThreadPoolExecutor() as executor:
         future_to_prompt = {
-            executor.submit(_make_perplexity_request, template, startup_name, sector): name
-            for name, template in prompt_templates.items()
+            executor.submit(fetch_company_section, name, startup_name, sector): name
+            for name in COMPANY_DATA_SECTIONS
         }
         for future in concurrent.futures.as_completed(future_to_prompt):
             prompt_name = future_to_prompt[future]
             try:
                 data = future.result()
+                section_fetched_at = pop_fetched_at(data)
                 if data.get("error"):
                     print(f"Error fetching {prompt_name} data: {data['error']}")
+                elif fetched_at is not None:
+                    fetched_at[prompt_name] = section_fetched_at
                 company_data.update(data)
             except Exception as exc:
                 print(f"{prompt_name} generated an exception: {exc}")
@@ -143,44 +279,42 @@ def get_company_data(startup_name, sector):
 
 
 # --- KNOWLEDGE LAYER 2: DEEP ANALYSIS VIA GROQ (With Polished Prompt) ---
-@st.cache_data
-def generate_qualitative_analysis(company_data):
-    api_key = os.getenv("GROQ_API_KEY")
-    client = Groq(api_key=api_key)
-    prompt_context = f"Company Name: {company_data.get('name', 'N/A')}\nDescription: {company_data.get('description', 'N/A')}\nSector: {company_data.get('category', {}).get('sector', 'N/A')}\nTags: {company_data.get('tags', [])}\nLocation: {company_data.get('geo', {}).get('city', 'N/A')}\nYear Founded: {company_data.get('foundedYear', 'N/A')}\nTeam Size: {company_data.get('metrics', {}).get('employees', 'N/A')}"
-    
-    user_prompt = QUALITATIVE_ANALYSIS_USER_PROMPT_TEMPLATE.format(prompt_context=prompt_context)
+# Each *_prompt helper returns (system_prompt, user_prompt, temperature) so the
+# sync functions below and their async twins in async_api_calls.py share them.
+# Each *_inputs helper returns exactly the values its prompt_context reads; the
+# layer cache keys on them, so a change to any other field reuses the output.
+def _qualitative_analysis_inputs(company_data):
+    return {
+        "name": company_data.get('name', 'N/A'),
+        "description": company_data.get('description', 'N/A'),
+        "sector": company_data.get('category', {}).get('sector', 'N/A'),
+        "tags": company_data.get('tags', []),
+        "city": company_data.get('geo', {}).get('city', 'N/A'),
+        "founded_year": company_data.get('foundedYear', 'N/A'),
+        "team_size": company_data.get('metrics', {}).get('employees', 'N/A'),
+    }
 
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "system", "content": QUALITATIVE_ANALYSIS_SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}],
-            temperature=0.7,
-        )
-        raw_content = response.choices[0].message.content
-        return _extract_json_from_response(raw_content)
-    except Exception as e:
-        return {"error": f"LLM generation failed with an unexpected error: {e}"}
+def _qualitative_analysis_prompt(company_data):
+    inputs = _qualitative_analysis_inputs(company_data)
+    prompt_context = f"Company Name: {inputs['name']}\nDescription: {inputs['description']}\nSector: {inputs['sector']}\nTags: {inputs['tags']}\nLocation: {inputs['city']}\nYear Founded: {inputs['founded_year']}\nTeam Size: {inputs['team_size']}"
+    user_prompt = QUALITATIVE_ANALYSIS_USER_PROMPT_TEMPLATE.format(prompt_context=prompt_context)
+    return QUALITATIVE_ANALYSIS_SYSTEM_PROMPT, user_prompt, 0.7
 
-@st.cache_data
-def generate_investment_thesis(company_data, llm_analysis):
-    api_key = os.getenv("GROQ_API_KEY")
-    client = Groq(api_key=api_key)
-    
-    prompt_context = f"Company Name: {company_data.get('name', 'N/A')}\nSWOT Analysis: {llm_analysis.get('swot_analysis', 'N/A')}\nCompetitive Landscape: {llm_analysis.get('competitive_landscape', 'N/A')}\nTAM Analysis: {llm_analysis.get('tam_analysis', 'N/A')}\nTeam: {company_data.get('founders_analysis', {})}\nKey Highlights: {llm_analysis.get('key_highlights', [])}"
+def _investment_thesis_inputs(company_data, llm_analysis):
+    return {
+        "name": company_data.get('name', 'N/A'),
+        "swot_analysis": llm_analysis.get('swot_analysis', 'N/A'),
+        "competitive_landscape": llm_analysis.get('competitive_landscape', 'N/A'),
+        "tam_analysis": llm_analysis.get('tam_analysis', 'N/A'),
+        "team": company_data.get('founders_analysis', {}),
+        "key_highlights": llm_analysis.get('key_highlights', []),
+    }
 
+def _investment_thesis_prompt(company_data, llm_analysis):
+    inputs = _investment_thesis_inputs(company_data, llm_analysis)
+    prompt_context = f"Company Name: {inputs['name']}\nSWOT Analysis: {inputs['swot_analysis']}\nCompetitive Landscape: {inputs['competitive_landscape']}\nTAM Analysis: {inputs['tam_analysis']}\nTeam: {inputs['team']}\nKey Highlights: {inputs['key_highlights']}"
     user_prompt = INVESTMENT_THESIS_USER_PROMPT_TEMPLATE.format(prompt_context=prompt_context)
-
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "system", "content": INVESTMENT_THESIS_SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}],
-            temperature=0.8,
-        )
-        raw_content = response.choices[0].message.content
-        return _extract_json_from_response(raw_content)
-    except Exception as e:
-        return {"error": f"LLM generation failed for thesis with an unexpected error: {e}"}
+    return INVESTMENT_THESIS_SYSTEM_PROMPT, user_prompt, 0.8
 
 def get_stage_prompt(stage_str, prompt_map):
     if not isinstance(stage_str, str):
@@ -206,100 +340,207 @@ def get_sector_prompt(sector_str, prompt_map):
         return prompt_map["healthtech"]
     return None
 
-@st.cache_data
-def generate_founders_analysis(company_data):
-    api_key = os.getenv("GROQ_API_KEY")
-    client = Groq(api_key=api_key)
-    
-    stage = company_data.get("stage", "N/A")
-    sector = company_data.get("category", {}).get("sector", "N/A")
-    
-    stage_prompt_map = {
-        "preseed_seed": FOUNDERS_PRESEED_SEED_PROMPT,
-        "early_stage": FOUNDERS_EARLY_STAGE_PROMPT,
-        "growth_stage": FOUNDERS_GROWTH_STAGE_PROMPT,
-        "later_stage": FOUNDERS_LATER_STAGE_PROMPT
+def _staged_analysis_inputs(company_data):
+    """The values the founders and product prompts read (stage and sector also pick the templates)."""
+    return {
+        "name": company_data.get('name', 'N/A'),
+        "description": company_data.get('description', 'N/A'),
+        "sector": company_data.get("category", {}).get("sector", "N/A"),
+        "stage": company_data.get("stage", "N/A"),
     }
-    
-    sector_prompt_map = {
-        "fintech": FOUNDERS_FINTECH_PROMPT,
-        "healthtech": FOUNDERS_HEALTHTECH_PROMPT
-    }
-    
+
+def _staged_analysis_prompt(company_data, system_prompt, stage_prompt_map, sector_prompt_map):
+    """Builds a stage/sector-specific prompt, or returns None if neither can be determined."""
+    inputs = _staged_analysis_inputs(company_data)
+    stage = inputs["stage"]
+    sector = inputs["sector"]
+
     stage_prompt = get_stage_prompt(stage, stage_prompt_map)
     sector_prompt = get_sector_prompt(sector, sector_prompt_map)
-    
+
     if not stage_prompt and not sector_prompt:
-        return {"error": "Could not determine stage or sector for founders analysis."}
-        
-    prompt_context = f"Company Name: {company_data.get('name', 'N/A')}\nDescription: {company_data.get('description', 'N/A')}\nSector: {company_data.get('category', {}).get('sector', 'N/A')}\nStage: {stage}"
-    
+        return None
+
+    prompt_context = f"Company Name: {inputs['name']}\nDescription: {inputs['description']}\nSector: {sector}\nStage: {stage}"
+
     user_prompt_parts = []
     if stage_prompt:
         user_prompt_parts.append(stage_prompt)
     if sector_prompt:
         user_prompt_parts.append(sector_prompt)
-    
+
     user_prompt = "\n".join(user_prompt_parts)
-        
+
     user_prompt = user_prompt.format(prompt_context=prompt_context)
+    return system_prompt, user_prompt, 0.7
+
+FOUNDERS_STAGE_PROMPTS = {
+    "preseed_seed": FOUNDERS_PRESEED_SEED_PROMPT,
+    "early_stage": FOUNDERS_EARLY_STAGE_PROMPT,
+    "growth_stage": FOUNDERS_GROWTH_STAGE_PROMPT,
+    "later_stage": FOUNDERS_LATER_STAGE_PROMPT
+}
+FOUNDERS_SECTOR_PROMPTS = {
+    "fintech": FOUNDERS_FINTECH_PROMPT,
+    "healthtech": FOUNDERS_HEALTHTECH_PROMPT
+}
+PRODUCT_STAGE_PROMPTS = {
+    "preseed_seed": PRODUCT_PRESEED_SEED_PROMPT,
+    "early_stage": PRODUCT_EARLY_STAGE_PROMPT,
+    "growth_stage": PRODUCT_GROWTH_STAGE_PROMPT,
+    "later_stage": PRODUCT_LATER_STAGE_PROMPT
+}
+PRODUCT_SECTOR_PROMPTS = {
+    "fintech": PRODUCT_FINTECH_PROMPT,
+    "healthtech": PRODUCT_HEALTHTECH_PROMPT
+}
+
+def _founders_analysis_prompt(company_data):
+    return _staged_analysis_prompt(company_data, FOUNDERS_ANALYSIS_SYSTEM_PROMPT, FOUNDERS_STAGE_PROMPTS, FOUNDERS_SECTOR_PROMPTS)
+
+def _product_analysis_prompt(company_data):
+    return _staged_analysis_prompt(company_data, PRODUCT_ANALYSIS_SYSTEM_PROMPT, PRODUCT_STAGE_PROMPTS, PRODUCT_SECTOR_PROMPTS)
 
+def _prompt_version(*parts):
+    """Fingerprint of the model and templates behind a layer; editing a prompt invalidates its cached outputs."""
+    return hashlib.sha256(json.dumps([GROQ_MODEL, *parts], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+# Cache key inputs of each Groq layer: (prompt version, *_inputs helper).
+LAYER_CACHE_KEYS = {
+    "llm_analysis": (_prompt_version(QUALITATIVE_ANALYSIS_SYSTEM_PROMPT, QUALITATIVE_ANALYSIS_USER_PROMPT_TEMPLATE, 0.7),
+                     _qualitative_analysis_inputs),
+    "investment_thesis": (_prompt_version(INVESTMENT_THESIS_SYSTEM_PROMPT, INVESTMENT_THESIS_USER_PROMPT_TEMPLATE, 0.8),
+                          _investment_thesis_inputs),
+    "founders_analysis": (_prompt_version(FOUNDERS_ANALYSIS_SYSTEM_PROMPT, FOUNDERS_STAGE_PROMPTS, FOUNDERS_SECTOR_PROMPTS, 0.7),
+                          _staged_analysis_inputs),
+    "product_analysis": (_prompt_version(PRODUCT_ANALYSIS_SYSTEM_PROMPT, PRODUCT_STAGE_PROMPTS, PRODUCT_SECTOR_PROMPTS, 0.7),
+                         _staged_analysis_inputs),
+}
+
+@cached_layer("llm_analysis", *LAYER_CACHE_KEYS["llm_analysis"])
+def generate_qualitative_analysis(company_data):
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "system", "content": FOUNDERS_ANALYSIS_SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}],
-            temperature=0.7,
-        )
-        raw_content = response.choices[0].message.content
+        raw_content = _groq_chat_completion(*_qualitative_analysis_prompt(company_data))
+        return _extract_json_from_response(raw_content)
+    except Exception as e:
+        return {"error": f"LLM generation failed with an unexpected error: {e}"}
+
+@cached_layer("investment_thesis", *LAYER_CACHE_KEYS["investment_thesis"])
+def generate_investment_thesis(company_data, llm_analysis):
+    try:
+        raw_content = _groq_chat_completion(*_investment_thesis_prompt(company_data, llm_analysis))
+        return _extract_json_from_response(raw_content)
+    except Exception as e:
+        return {"error": f"LLM generation failed for thesis with an unexpected error: {e}"}
+
+@cached_layer("founders_analysis", *LAYER_CACHE_KEYS["founders_analysis"])
+def generate_founders_analysis(company_data):
+    prompt = _founders_analysis_prompt(company_data)
+    if not prompt:
+        return {"error": "Could not determine stage or sector for founders analysis."}
+
+    try:
+        raw_content = _groq_chat_completion(*prompt)
         return _extract_json_from_response(raw_content)
     except Exception as e:
         return {"error": f"LLM generation failed for founders analysis with an unexpected error: {e}"}
 
-@st.cache_data
+@cached_layer("product_analysis", *LAYER_CACHE_KEYS["product_analysis"])
 def generate_product_analysis(company_data):
-    api_key = os.getenv("GROQ_API_KEY")
-    client = Groq(api_key=api_key)
-    
-    stage = company_data.get("stage", "N/A")
-    sector = company_data.get("category", {}).get("sector", "N/A")
-    
-    stage_prompt_map = {
-        "preseed_seed": PRODUCT_PRESEED_SEED_PROMPT,
-        "early_stage": PRODUCT_EARLY_STAGE_PROMPT,
-        "growth_stage": PRODUCT_GROWTH_STAGE_PROMPT,
-        "later_stage": PRODUCT_LATER_STAGE_PROMPT
-    }
-    
-    sector_prompt_map = {
-        "fintech": PRODUCT_FINTECH_PROMPT,
-        "healthtech": PRODUCT_HEALTHTECH_PROMPT
-    }
-    
-    stage_prompt = get_stage_prompt(stage, stage_prompt_map)
-    sector_prompt = get_sector_prompt(sector, sector_prompt_map)
-    
-    if not stage_prompt and not sector_prompt:
+    prompt = _product_analysis_prompt(company_data)
+    if not prompt:
         return {"error": "Could not determine stage or sector for product analysis."}
-        
-    prompt_context = f"Company Name: {company_data.get('name', 'N/A')}\nDescription: {company_data.get('description', 'N/A')}\nSector: {company_data.get('category', {}).get('sector', 'N/A')}\nStage: {stage}"
-    
-    user_prompt_parts = []
-    if stage_prompt:
-        user_prompt_parts.append(stage_prompt)
-    if sector_prompt:
-        user_prompt_parts.append(sector_prompt)
-    
-    user_prompt = "\n".join(user_prompt_parts)
-        
-    user_prompt = user_prompt.format(prompt_context=prompt_context)
 
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "system", "content": PRODUCT_ANALYSIS_SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}],
-            temperature=0.7,
-        )
-        raw_content = response.choices[0].message.content
+        raw_content = _groq_chat_completion(*prompt)
         return _extract_json_from_response(raw_content)
     except Exception as e:
-        return {"error": f"LLM generation failed for product analysis with an unexpected error: {e}"}
\ No newline at end of file
+        return {"error": f"LLM generation failed for product analysis with an unexpected error: {e}"}
+
+
+# --- ORCHESTRATION: LAYERS 2-5 AS A DEPENDENCY GRAPH ---
+def build_analysis_pipeline(max_workers=None, initializer=None):
+    """
+    Declares the Groq analysis layers and their inputs. Only the thesis waits on
+    the qualitative analysis; the other layers run concurrently.
+    """
+    pipeline = Pipeline(max_workers=max_workers, initializer=initializer)
+    pipeline.add("llm_analysis", generate_qualitative_analysis, inputs=["company_data"])
+    pipeline.add("investment_thesis", generate_investment_thesis, inputs=["company_data", "llm_analysis"])
+    pipeline.add("founders_analysis", generate_founders_analysis, inputs=["company_data"])
+    pipeline.add("product_analysis", generate_product_analysis, inputs=["company_data"])
+    return pipeline
+
+
+# --- ORCHESTRATION: STREAMING LAYER 1 SECTIONS INTO LAYERS 2-5 ---
+# The fields each layer actually reads. Note that `stage` comes from the
+# financials section, so founders/product wait on profile + financials only,
+# and the qualitative analysis can start as soon as the profile lands. The
+# streaming report pipeline itself lives in async_api_calls.py.
+LAYER_FIELDS = {
+    "llm_analysis": ["name", "description", "category", "geo", "foundedYear", "metrics"],
+    "investment_thesis": ["name", "founders_analysis"],
+    "founders_analysis": ["name", "description", "category", "stage"],
+    "product_analysis": ["name", "description", "category", "stage"],
+}
+
+def company_field(field):
+    """Pipeline context key for a Layer 1 field, namespaced so it cannot clash with layer outputs."""
+    return f"company_data.{field}"
+
+def with_company_fields(func, fields):
+    """
+    Adapts a function taking `company_data` as its first argument into a pipeline
+    node that receives the individual fields it subscribes to. Any further
+    pipeline inputs are passed through after the rebuilt `company_data`.
+    """
+    def node(*args):
+        company_data = {key: value for key, value in zip(fields, args) if value is not None}
+        return func(company_data, *args[len(fields):])
+    node.__name__ = getattr(func, "__name__", "node")
+    return node
+
+def merge_company_sections(pipeline_result):
+    """
+    Rebuilds the full company_data dict from the section nodes of a pipeline
+    run, with the fields its gap_fill node found merged in.
+    """
+    prefix = company_field("")
+    company_data = {}
+    for section in COMPANY_DATA_SECTIONS:
+        data = pipeline_result.results.get(section)
+        if isinstance(data, dict) and not data.get(company_field("error")):
+            company_data.update({key[len(prefix):]: value for key, value in data.items()
+                                 if key != company_field(FETCHED_AT_KEY)})
+    company_data.update((pipeline_result.results.get("gap_fill") or {}).get("fields", {}))
+    return company_data
+
+def section_error(pipeline_result, section):
+    """Returns the Perplexity error message for a section of a streaming run, if any."""
+    data = pipeline_result.results.get(section)
+    if isinstance(data, dict):
+        return data.get(company_field("error"))
+    return None
+
+def section_fetch_times(pipeline_result, now=None):
+    """`section_fetched_at` for the sections of a streaming run that succeeded; a cached section keeps its cache time."""
+    now = time.time() if now is None else now
+    return {
+        section: pipeline_result.results[section].get(company_field(FETCHED_AT_KEY), now)
+        for section in COMPANY_DATA_SECTIONS
+        if isinstance(pipeline_result.results.get(section), dict) and not section_error(pipeline_result, section)
+    }
+
+def build_report_data(pipeline_result, startup_name):
+    """Shapes a streaming pipeline run into the report_data dict the UI and PDF expect."""
+    return {
+        'company_data': merge_company_sections(pipeline_result),
+        'llm_analysis': pipeline_result.results.get("llm_analysis", {}),
+        'investment_thesis': pipeline_result.results.get("investment_thesis", {}),
+        'founders_analysis': pipeline_result.results.get("founders_analysis", {}),
+        'product_analysis': pipeline_result.results.get("product_analysis", {}),
+        'rules_feedback': pipeline_result.results.get("rules_feedback", []),
+        'startup_name': startup_name,
+        'gap_filled': (pipeline_result.results.get("gap_fill") or {}).get("filled", []),
+        'section_fetched_at': section_fetch_times(pipeline_result),
+    }
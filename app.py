@@ -2,16 +2,189 @@
 import streamlit as st
 import os
 import json
+import time
+import sqlite3
+import threading
 from dotenv import load_dotenv
-from api_calls import get_company_data, generate_qualitative_analysis, generate_investment_thesis, generate_founders_analysis, generate_product_analysis
-from rules import apply_investment_rules
-from pdf_generator import PDFReport
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from api_calls import (
+    get_company_data,
+    build_analysis_pipeline,
+    merge_company_sections,
+    section_error,
+    section_fetch_times,
+    COMPANY_DATA_SECTIONS
+)
+from async_api_calls import generate_report
+from rules import apply_investment_rules, IncrementalRules, SECTOR_INPUT
+from company_record import CompanyRecord
+from response_cache import get_response_cache
+from layer_cache import get_layer_cache
+from providers import connection_stats
+from rate_limit import limiter_stats
+from resilience import latency_stats
+from report_document import build_report_document, render_markdown, report_key
+from pdf_jobs import submit_pdf, get_pdf_job, WAIT_SECONDS as PDF_WAIT_SECONDS
+from report_store import get_report_store
+from refresh import refresh_report, section_ages, stale_sections
+from gap_fill import fill_gaps
+
+NODE_LABELS = {
+    "profile": "Layer 1 (Perplexity, profile)",
+    "financials": "Layer 1 (Perplexity, financials)",
+    "market": "Layer 1 (Perplexity, market)",
+    "team": "Layer 1 (Perplexity, team)",
+    "gap_fill": "Layer 1 (Perplexity, missing fields)",
+    "llm_analysis": "Layer 2 (Groq)",
+    "investment_thesis": "Layer 3 (Groq)",
+    "founders_analysis": "Layer 4 (Groq)",
+    "product_analysis": "Layer 5 (Groq)",
+    "rules_feedback": "Investment Rules",
+}
+
+def _live_preview(container, first_content_at, start):
+    """
+    Returns an on_partial callback that renders each node's text as it streams
+    in, one placeholder per node, inside `container`.
+    """
+    placeholders = {}
+    def on_partial(name, text):
+        if name not in placeholders:
+            first_content_at[name] = time.perf_counter() - start
+            container.caption(NODE_LABELS.get(name, name))
+            placeholders[name] = container.empty()
+        placeholders[name].code(text, language="json")
+    return on_partial
+
+def _attach_script_run_ctx(ctx):
+    """Returns a thread initializer so pipeline workers share the session's script context."""
+    def initializer():
+        add_script_run_ctx(threading.current_thread(), ctx)
+    return initializer
 
 # --- UI Rendering Functions ---
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_markdown_file(report_hash, _report_data):
+    """
+    The Markdown download for one report. Cached on the report's content hash,
+    so reruns (widget clicks, sidebar changes) reuse the rendered file.
+    """
+    return render_markdown(build_report_document(_report_data))
+
+def _pdf_download(report_data, file_name):
+    """
+    The PDF download button, served from the background render (pdf_jobs).
+    The fragment runs in parallel with the rest of the script: it shows a
+    disabled placeholder, waits for the render and swaps in the button, so
+    the report is on screen meanwhile and nothing polls or reruns afterwards.
+    """
+    job = get_pdf_job(report_data) or submit_pdf(report_data, log=st.session_state.debug_mode)
+
+    @st.fragment(parallel=True)
+    def pdf_download():
+        slot = st.empty()
+        if not job.done:
+            slot.button("Preparing PDF...", disabled=True)
+            job.wait(PDF_WAIT_SECONDS)
+        if job.pdf is not None:
+            with slot.container():
+                st.download_button(label="Download as PDF", data=job.pdf, file_name=file_name, mime="application/pdf")
+                if st.session_state.debug_mode:
+                    st.caption(f"PDF rendered in {job.render_seconds:.2f}s, {job.size / 1024:.1f} KiB")
+        elif job.error:
+            slot.error(job.error)
+
+    pdf_download()
+
+def _open_stored_report(report_id):
+    """Loads a stored report into the session. Runs as a button callback, before the inputs are drawn."""
+    start = time.perf_counter()
+    report_data = get_report_store().get(report_id)
+    if report_data is None:
+        return
+    company_record = CompanyRecord.from_dict(report_data.get('company_data', {}))
+    report_data['company_record'] = company_record
+    st.session_state.rules_state.update(company_record, report_data.get('user_sector_input', ''))
+    st.session_state.report_data = report_data
+    st.session_state.startup_name_input = report_data.get('startup_name', '')
+    st.session_state.sector_input = report_data.get('user_sector_input', '')
+    submit_pdf(report_data, log=st.session_state.debug_mode)
+    if st.session_state.debug_mode:
+        print(f"\n--- REPORT STORE ---\nOpened report {report_id} in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+def _reset_stored_report_pages():
+    st.session_state.stored_report_pages = [None]
+
+def _stored_reports_sidebar(report_store):
+    """A paged list of stored reports, newest first; clicking one opens it without any API calls."""
+    total = report_store.count()
+    if not total:
+        return
+    if 'stored_report_pages' not in st.session_state:
+        _reset_stored_report_pages()  # holds the `before` cursor of each page visited
+    pages = st.session_state.stored_report_pages
+    with st.sidebar.expander(f"Saved Reports ({total})"):
+        name_filter = st.text_input("Company", key="stored_report_filter", placeholder="Filter by company name",
+                                    on_change=_reset_stored_report_pages)
+        reports, next_cursor = report_store.list_reports(before=pages[-1], name=name_filter or None)
+        if not reports:
+            st.caption("No saved reports match.")
+        for report in reports:
+            generated = time.strftime('%Y-%m-%d %H:%M', time.localtime(report['generated_at']))
+            st.button(f"{report['startup_name']} · {report['sector'] or 'no sector'} · {generated}",
+                      key=f"stored_report_{report['id']}", on_click=_open_stored_report, args=(report['id'],))
+        newer, older = st.columns(2)
+        newer.button("Newer", key="stored_report_newer", disabled=len(pages) == 1, on_click=pages.pop)
+        older.button("Older", key="stored_report_older", disabled=next_cursor is None,
+                     on_click=pages.append, args=(next_cursor,))
+
+def _format_age(seconds):
+    if seconds is None:
+        return "at an unknown time"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min ago"
+    if seconds < 48 * 3600:
+        return f"{seconds / 3600:.0f} h ago"
+    return f"{seconds / 86400:.0f} days ago"
+
+def _refresh_controls(report_data):
+    """Shows each Layer 1 section's age and refreshes sections on request. Returns the current report_data."""
+    stale = stale_sections(report_data)
+    with st.expander(f"Data freshness: {len(stale)} stale section(s)" if stale else "Data freshness: up to date"):
+        st.markdown("\n".join(
+            f"- **{section.title()}:** fetched {_format_age(age)}" + (" (stale)" if section in stale else "")
+            for section, age in section_ages(report_data).items()
+        ))
+        refresh_stale = st.button("Refresh stale sections", disabled=not stale,
+                                  help="Re-query only the stale sections; AI layers re-run only if their inputs changed.")
+        refresh_all = st.button("Re-fetch all sections", help="Bypass the response cache for every section.")
+    if not (refresh_stale or refresh_all):
+        return report_data
+
+    with st.spinner("Refreshing company data..."):
+        refreshed, summary = refresh_report(report_data, sections=list(COMPANY_DATA_SECTIONS) if refresh_all else None,
+                                            fresh=refresh_all, rules_state=st.session_state.rules_state)
+    for section, error in summary['failed'].items():
+        st.error(f"{NODE_LABELS[section]} Error: {error}")
+    rerun = ', '.join(NODE_LABELS[layer] for layer in summary['rerun_layers']) or "none"
+    st.success(f"Refreshed {', '.join(summary['refreshed']) or 'no sections'}: "
+               f"{len(summary['changed_fields'])} field(s) changed, AI layers re-run: {rerun}.")
+    st.session_state.report_data = refreshed
+    submit_pdf(refreshed, log=st.session_state.debug_mode)
+    report_store = get_report_store()
+    if report_store and summary['refreshed']:
+        try:
+            report_store.save(refreshed)
+        except sqlite3.Error as e:
+            print(f"!!! Could not save the report: {e}")
+    if st.session_state.debug_mode:
+        print(f"\n--- DELTA REFRESH ---\n{json.dumps(summary, indent=2)}")
+    return refreshed
+
 def display_report_ui(report_data):
     """Renders the entire report UI from the report_data dictionary."""
-    company_data = report_data.get('company_data', {})
+    company_record = report_data.get('company_record') or CompanyRecord.from_dict(report_data.get('company_data', {}))
     llm_analysis = report_data.get('llm_analysis', {})
     investment_thesis = report_data.get('investment_thesis', {})
     founders_analysis = report_data.get('founders_analysis', {})
@@ -19,24 +192,21 @@ def display_report_ui(report_data):
     rules_feedback = report_data.get('rules_feedback', [])
     startup_name = report_data.get('startup_name', 'N/A')
 
-    st.header(f"Preliminary Investment Fit Report: {company_data.get('name', startup_name)}")
+    st.header(f"Preliminary Investment Fit Report: {company_record.get('name', startup_name)}")
     
     col1, col2 = st.columns((1, 1))
 
     # --- Column 1: Company Details, Social, Founders, Investors ---
     with col1:
         st.subheader("Company Details")
-        st.markdown(f"**Year Founded:** {company_data.get('foundedYear', 'N/A')}")
-        geo = company_data.get('geo', {})
-        st.markdown(f"**HQ Location:** {geo.get('city', 'N/A')}, {geo.get('country', 'N/A')}")
-        st.markdown(f"**Address:** {geo.get('address', 'N/A')}")
-        domain = company_data.get('domain', 'N/A')
-        website_url = f"https://{domain}" if domain != 'N/A' else '#'
-        st.markdown(f"**Website:** [{domain}]({website_url})")
-        st.markdown(f"**Team Strength:** {company_data.get('metrics', {}).get('employees', 'N/A')} employees")
+        st.markdown(f"**Year Founded:** {company_record.text('foundedYear')}")
+        st.markdown(f"**HQ Location:** {company_record.city}, {company_record.country}")
+        st.markdown(f"**Address:** {company_record.address}")
+        st.markdown(f"**Website:** [{company_record.text('domain')}]({company_record.website_url})")
+        st.markdown(f"**Team Strength:** {company_record.employees} employees")
 
         st.subheader("Social Media")
-        social_media = company_data.get('social_media', {})
+        social_media = company_record.social_links
         if social_media:
             for platform, link in social_media.items():
                 if link and link != 'N/A':
@@ -47,14 +217,14 @@ def display_report_ui(report_data):
             st.markdown("N/A")
 
         st.subheader("Founders")
-        st.markdown(f"**Founder(s):** {', '.join(company_data.get('founders_analysis', {}).get('names_of_founders', []))}")
-        st.markdown(f"**Complementarity:** {company_data.get('founders_analysis', {}).get('complementarity', 'N/A')}")
-        st.markdown(f"**Key Competency:** {company_data.get('founders_analysis', {}).get('key_competency', 'N/A')}")
-        st.markdown(f"**Prior Experience:** {company_data.get('founders_analysis', {}).get('prior_startup_experience', 'N/A')}")
-        st.markdown(f"**Red Flags:** {company_data.get('founders_analysis', {}).get('red_flags', 'N/A')}")
+        st.markdown(f"**Founder(s):** {', '.join(company_record.founder_names)}")
+        st.markdown(f"**Complementarity:** {company_record.founder_detail('complementarity')}")
+        st.markdown(f"**Key Competency:** {company_record.founder_detail('key_competency')}")
+        st.markdown(f"**Prior Experience:** {company_record.founder_detail('prior_startup_experience')}")
+        st.markdown(f"**Red Flags:** {company_record.founder_detail('red_flags')}")
 
         st.subheader("Key Investors")
-        key_investors = company_data.get('key_investors', [])
+        key_investors = company_record.get('key_investors', [])
         if key_investors:
             # Now we just display each investor name from the simple list
             for investor in key_investors:
@@ -65,45 +235,44 @@ def display_report_ui(report_data):
     # --- Column 2: Sector, Business, Revenue, Financials ---
     with col2:
         st.subheader("Sector & Activity")
-        category = company_data.get('category', {})
-        st.markdown(f"**Sector:** {category.get('sector', 'N/A')}")
-        st.markdown(f"**Sub-sector:** {category.get('sub_sector', 'N/A')}")
-        st.markdown(f"**Industry:** {category.get('industry', 'N/A')}")
-        st.markdown(f"**Activity:** {category.get('activity', 'N/A')}")
+        st.markdown(f"**Sector:** {company_record.sector}")
+        st.markdown(f"**Sub-sector:** {company_record.sub_sector}")
+        st.markdown(f"**Industry:** {company_record.industry}")
+        st.markdown(f"**Activity:** {company_record.activity}")
 
         st.subheader("Business & Revenue")
-        st.markdown(f"**Business Model:** {company_data.get('business_model', 'N/A')}")
-        st.markdown(f"**Revenue Model:** {company_data.get('revenue_model', 'N/A')}")
-        st.markdown(f"**Pricing Model:** {company_data.get('pricing_model', 'N/A')}")
-        st.markdown(f"**Revenue Stream Diversified:** {company_data.get('revenue_stream_diversified', 'N/A')}")
+        st.markdown(f"**Business Model:** {company_record.text('business_model')}")
+        st.markdown(f"**Revenue Model:** {company_record.text('revenue_model')}")
+        st.markdown(f"**Pricing Model:** {company_record.text('pricing_model')}")
+        st.markdown(f"**Revenue Stream Diversified:** {company_record.text('revenue_stream_diversified')}")
 
         st.subheader("Financials")
-        st.markdown(f"**Total Funding:** {company_data.get('total_funding', 'N/A')}")
-        st.markdown(f"**Last Funding Round:** {company_data.get('last_funding_round', 'N/A')}")
-        st.markdown(f"**Valuation:** {company_data.get('valuation', 'N/A')}")
-        st.markdown(f"**Revenue:** {company_data.get('revenue', 'N/A')}")
-        st.markdown(f"**Profitability:** {company_data.get('profitability', 'N/A')}")
+        st.markdown(f"**Total Funding:** {company_record.text('total_funding')}")
+        st.markdown(f"**Last Funding Round:** {company_record.text('last_funding_round')}")
+        st.markdown(f"**Valuation:** {company_record.text('valuation')}")
+        st.markdown(f"**Revenue:** {company_record.text('revenue')}")
+        st.markdown(f"**Profitability:** {company_record.text('profitability')}")
 
 
     # --- Full Width Sections ---
     st.subheader("Market & Competition")
-    st.markdown(f"**Market Size:** {company_data.get('market_size', 'N/A')}")
-    st.markdown(f"**Market Growth Rate:** {company_data.get('market_growth_rate', 'N/A')}")
-    st.markdown(f"**Competitive Advantage:** {company_data.get('competitive_advantage', 'N/A')}")
-    st.markdown(f"**Competitors:** {', '.join(company_data.get('competitors', [])) if company_data.get('competitors') else 'N/A'}")
+    st.markdown(f"**Market Size:** {company_record.text('market_size')}")
+    st.markdown(f"**Market Growth Rate:** {company_record.text('market_growth_rate')}")
+    st.markdown(f"**Competitive Advantage:** {company_record.text('competitive_advantage')}")
+    st.markdown(f"**Competitors:** {company_record.joined('competitors')}")
 
     st.subheader("Product & Technology")
-    st.markdown(f"**Product Differentiation:** {company_data.get('product_differentiation', 'N/A')}")
-    st.markdown(f"**Innovative Solution:** {company_data.get('innovative_solution', 'N/A')}")
-    st.markdown(f"**Patents:** {', '.join(company_data.get('patents', [])) if company_data.get('patents') else 'N/A'}")
-    st.markdown(f"**Product Validation:** {company_data.get('product_validation', 'N/A')}")
-    st.markdown(f"**Technology Stack:** {company_data.get('technology_stack', 'N/A')}")
-    st.markdown(f"**Product Roadmap:** {company_data.get('product_roadmap', 'N/A')}")
+    st.markdown(f"**Product Differentiation:** {company_record.text('product_differentiation')}")
+    st.markdown(f"**Innovative Solution:** {company_record.text('innovative_solution')}")
+    st.markdown(f"**Patents:** {company_record.joined('patents')}")
+    st.markdown(f"**Product Validation:** {company_record.text('product_validation')}")
+    st.markdown(f"**Technology Stack:** {company_record.text('technology_stack')}")
+    st.markdown(f"**Product Roadmap:** {company_record.text('product_roadmap')}")
 
     st.subheader("Team")
-    st.markdown(f"**Key Hires:** {', '.join(company_data.get('key_hires', [])) if company_data.get('key_hires') else 'N/A'}")
-    st.markdown(f"**Employee Growth Rate:** {company_data.get('employee_growth_rate', 'N/A')}")
-    st.markdown(f"**Glassdoor Rating:** {company_data.get('glassdoor_rating', 'N/A')}")
+    st.markdown(f"**Key Hires:** {company_record.joined('key_hires')}")
+    st.markdown(f"**Employee Growth Rate:** {company_record.text('employee_growth_rate')}")
+    st.markdown(f"**Glassdoor Rating:** {company_record.text('glassdoor_rating')}")
 
     st.subheader("AI-Generated Analysis")
     if llm_analysis and not llm_analysis.get('error'):
@@ -145,16 +314,9 @@ def display_report_ui(report_data):
                 st.info(item['text'])
 
     st.subheader("Download Report")
-    pdf = PDFReport()
-    pdf_output = pdf.generate(startup_name, company_data, llm_analysis, rules_feedback, investment_thesis, founders_analysis, product_analysis)
-    st.download_button(
-        label="Download as PDF",
-        data=pdf_output,
-        file_name=f"Investment_Fit_Report_{startup_name.replace(' ', '_')}.pdf",
-        mime="application/pdf"
-    )
-    
-    markdown_report_string = generate_markdown_report(startup_name, company_data, llm_analysis, rules_feedback, investment_thesis, founders_analysis, product_analysis)
+    _pdf_download(report_data, f"Investment_Fit_Report_{startup_name.replace(' ', '_')}.pdf")
+
+    markdown_report_string = render_markdown_file(report_key(report_data), report_data)
     st.download_button(
         label="Download as Markdown (.md)",
         data=markdown_report_string,
@@ -162,160 +324,6 @@ def display_report_ui(report_data):
         mime="text/markdown"
     )
 
-# --- The Markdown generation function ---
-def generate_markdown_report(startup_name, company_data, llm_analysis, rules_feedback, investment_thesis, founders_analysis, product_analysis):
-    name = company_data.get('name', startup_name)
-    geo = company_data.get('geo', {})
-    category = company_data.get('category', {})
-    social_media = company_data.get('social_media', {})
-    domain = company_data.get('domain', 'N/A')
-    website_url = f"https://{domain}" if domain != 'N/A' else '#'
-    
-    report = f'''
-# Preliminary Investment Fit Report: {name}
-
----
-
-## Company Details
-- **Year Founded:** {company_data.get('foundedYear', 'N/A')}
-- **HQ Location:** {geo.get('city', 'N/A')}, {geo.get('country', 'N/A')}
-- **Address:** {geo.get('address', 'N/A')}
-- **Website:** [{domain}]({website_url})
-- **Team Strength:** {company_data.get('metrics', {}).get('employees', 'N/A')} employees
-
-## Social Media
-'''
-    if social_media:
-        for platform, link in social_media.items():
-            report += f"- **{platform.capitalize()}:** [{link}]({link})\n"
-    else:
-        report += "- N/A\n"
-
-    report += '''
-## Founders
-'''
-    report += f"**Founder(s):** {', '.join(company_data.get('founders_analysis', {}).get('names_of_founders', []))}\n"
-    report += f"**Complementarity:** {company_data.get('founders_analysis', {}).get('complementarity', 'N/A')}\n"
-    report += f"**Key Competency:** {company_data.get('founders_analysis', {}).get('key_competency', 'N/A')}\n"
-    report += f"**Prior Experience:** {company_data.get('founders_analysis', {}).get('prior_startup_experience', 'N/A')}\n"
-    report += f"**Red Flags:** {company_data.get('founders_analysis', {}).get('red_flags', 'N/A')}\n"
-
-    report += '''
-## Key Investors
-'''
-    key_investors = company_data.get('key_investors', [])
-    if key_investors:
-        for investor in key_investors:
-            report += f"- **{investor}**\n"
-    else:
-        report += "- N/A\n"
-        
-    report += f'''
----
-
-## Sector & Activity
-- **Sector:** {category.get('sector', 'N/A')}
-- **Sub-sector:** {category.get('sub_sector', 'N/A')}
-- **Industry:** {category.get('industry', 'N/A')}
-- **Activity:** {category.get('activity', 'N/A')}
-
-## Business & Revenue
-- **Business Model:** {company_data.get('business_model', 'N/A')}
-- **Revenue Model:** {company_data.get('revenue_model', 'N/A')}
-- **Pricing Model:** {company_data.get('pricing_model', 'N/A')}
-- **Revenue Stream Diversified:** {company_data.get('revenue_stream_diversified', 'N/A')}
-
-## Financials
-- **Total Funding:** {company_data.get('total_funding', 'N/A')}
-- **Last Funding Round:** {company_data.get('last_funding_round', 'N/A')}
-- **Valuation:** {company_data.get('valuation', 'N/A')}
-- **Revenue:** {company_data.get('revenue', 'N/A')}
-- **Profitability:** {company_data.get('profitability', 'N/A')}
-
----
-
-## Market & Competition
-- **Market Size:** {company_data.get('market_size', 'N/A')}
-- **Market Growth Rate:** {company_data.get('market_growth_rate', 'N/A')}
-- **Competitive Advantage:** {company_data.get('competitive_advantage', 'N/A')}
-- **Competitors:** {', '.join(company_data.get('competitors', [])) if company_data.get('competitors') else 'N/A'}
-
-## Product & Technology
-- **Product Differentiation:** {company_data.get('product_differentiation', 'N/A')}
-- **Innovative Solution:** {company_data.get('innovative_solution', 'N/A')}
-- **Patents:** {', '.join(company_data.get('patents', [])) if company_data.get('patents') else 'N/A'}
-- **Product Validation:** {company_data.get('product_validation', 'N/A')}
-- **Technology Stack:** {company_data.get('technology_stack', 'N/A')}
-- **Product Roadmap:** {company_data.get('product_roadmap', 'N/A')}
-
-## Team
-- **Key Hires:** {', '.join(company_data.get('key_hires', [])) if company_data.get('key_hires') else 'N/A'}
-- **Employee Growth Rate:** {company_data.get('employee_growth_rate', 'N/A')}
-- **Glassdoor Rating:** {company_data.get('glassdoor_rating', 'N/A')}
-
----
-
-## AI-Generated Analysis
-
-### SWOT Analysis
-{llm_analysis.get('swot_analysis', 'N/A')}
-
-### Competitive Landscape
-{llm_analysis.get('competitive_landscape', 'N/A')}
-
-### TAM Analysis
-{llm_analysis.get('tam_analysis', 'N/A')}
-
-### Highlights
-'''
-    highlights = llm_analysis.get('key_highlights', [])
-    if highlights:
-        for item in highlights:
-            report += f"- {item}\n"
-    else:
-        report += "- N/A\n"
-
-    report += '''
----
-
-## Founder Analysis
-'''
-    if founders_analysis and not founders_analysis.get('error'):
-        for key, value in founders_analysis.items():
-            report += f"### {key.replace('_', ' ').title()}\n{value}\n\n"
-
-    report += '''
----
-
-## Product Analysis
-'''
-    if product_analysis and not product_analysis.get('error'):
-        for key, value in product_analysis.items():
-            report += f"### {key.replace('_', ' ').title()}\n{value}\n\n"
-
-    report += f'''
----
-
-## Investment Thesis
-
-### Investment Summary
-{investment_thesis.get('investment_summary', 'N/A')}
-
-### Key Risks
-{investment_thesis.get('key_risks', 'N/A')}
-
-### Investment Recommendation
-{investment_thesis.get('investment_recommendation', 'N/A')}
-
----
-
-## Investment Fit (Our Rules)
-'''
-    for item in rules_feedback:
-        report += f"- {item['text']}\n"
-        
-    return report 
-
 # --- MAIN APP LOGIC ---
 load_dotenv()
 
@@ -331,11 +339,16 @@ if 'report_data' not in st.session_state:
     st.session_state.report_data = None
 if 'debug_mode' not in st.session_state:
     st.session_state.debug_mode = False
+if 'rules_state' not in st.session_state:
+    st.session_state.rules_state = IncrementalRules()
 
 st.sidebar.header("Inputs")
-startup_name_input = st.sidebar.text_input("Startup Name", placeholder="e.g., Cred, Figma, Stripe")
-sector_input = st.sidebar.text_input("Target Sector", placeholder="e.g., Healthtech, Crypto")
+startup_name_input = st.sidebar.text_input("Startup Name", key="startup_name_input", placeholder="e.g., Cred, Figma, Stripe")
+sector_input = st.sidebar.text_input("Target Sector", key="sector_input", placeholder="e.g., Healthtech, Crypto")
 debug_mode = st.sidebar.checkbox("Enable Debug Mode", value=st.session_state.debug_mode)
+stream_layers = st.sidebar.checkbox("Stream layers as data arrives", value=True,
+                                    help="Start each AI layer as soon as the Perplexity fields it needs are available, "
+                                         "and show each layer's output as it is generated.")
 
 
 if st.sidebar.button("Generate Report", type="primary"):
@@ -350,45 +363,95 @@ if st.sidebar.button("Generate Report", type="primary"):
         founders_analysis = {}
         product_analysis = {}
         rules_feedback = []
-
-        with st.spinner("Layer 1: Gathering data from Perplexity..."):
-            company_data = get_company_data(startup_name_input, sector_input)
-            if company_data.get("error"):
-                st.error(f"Layer 1 (Perplexity) Error: {company_data['error']}")
-
-        if not company_data.get("error"):
-            with st.spinner("ðŸ§  Layer 2: Generating qualitative analysis..."):
-                llm_analysis = generate_qualitative_analysis(company_data)
-                if llm_analysis.get("error"):
-                    st.error(f"Layer 2 (Groq) Error: {llm_analysis['error']}")
-            
-            with st.spinner("ðŸ¤” Layer 3: Forming investment thesis..."):
-                investment_thesis = generate_investment_thesis(company_data, llm_analysis)
-                if investment_thesis.get("error"):
-                    st.error(f"Layer 3 (Groq) Error: {investment_thesis['error']}")
-
-            with st.spinner("ðŸ§  Layer 4: Analyzing founders..."):
-                founders_analysis = generate_founders_analysis(company_data)
-                if founders_analysis.get("error"):
-                    st.error(f"Layer 4 (Groq) Error: {founders_analysis['error']}")
-
-            with st.spinner("ðŸ’¡ Layer 5: Analyzing product..."):
-                product_analysis = generate_product_analysis(company_data)
-                if product_analysis.get("error"):
-                    st.error(f"Layer 5 (Groq) Error: {product_analysis['error']}")
-
-            with st.spinner("âœ… Applying investment rules..."):
-                rules_feedback = apply_investment_rules(company_data, sector_input)
-        
+        pipeline_result = None
+        first_content_at = {}
+        gap_fill = {}
+
+        if stream_layers:
+            # Streaming mode: each Groq layer starts as soon as the Perplexity fields it reads arrive,
+            # and every provider response is shown token by token until the final report replaces it.
+            start = time.perf_counter()
+            with st.status("Layers 1-5: Streaming Perplexity data into the analysis layers...") as status:
+                live_preview = st.empty()
+                pipeline_result = generate_report(
+                    startup_name_input, sector_input,
+                    on_node_done=lambda name, result: status.write(f"{NODE_LABELS.get(name, name)} finished in {result.timings[name]:.1f}s"),
+                    on_partial=_live_preview(live_preview.container(), first_content_at, start),
+                )
+                live_preview.empty()
+                status.update(label="Report data ready", state="complete", expanded=False)
+            company_data = merge_company_sections(pipeline_result)
+            gap_fill = pipeline_result.results.get("gap_fill") or {}
+            for section in COMPANY_DATA_SECTIONS:
+                if section_error(pipeline_result, section):
+                    st.error(f"{NODE_LABELS[section]} Error: {section_error(pipeline_result, section)}")
+            section_fetched_at = section_fetch_times(pipeline_result)
+        else:
+            with st.spinner("Layer 1: Gathering data from Perplexity..."):
+                section_fetched_at = {}
+                company_data = get_company_data(startup_name_input, sector_input, fetched_at=section_fetched_at)
+                if company_data.get("error"):
+                    st.error(f"Layer 1 (Perplexity) Error: {company_data['error']}")
+                    section_fetched_at = {}
+
+            if not company_data.get("error"):
+                with st.spinner("Layer 1: Following up on missing fields..."):
+                    # As in the streaming pipeline, a failed follow-up must not cost the report its analysis.
+                    try:
+                        gap_fill = fill_gaps(company_data, startup_name_input, sector_input)
+                    except Exception as e:
+                        print(f"!!! GAP FILL ERROR: {e}")
+                        gap_fill = {"fields": {}, "error": f"Could not fill the missing fields: {e}"}
+                        st.error(f"{NODE_LABELS['gap_fill']} Error: {gap_fill['error']}")
+                    company_data = {**company_data, **gap_fill['fields']}
+                with st.spinner("ðŸ§  Layers 2-5: Running analysis, thesis, founders and product layers..."):
+                    pipeline = build_analysis_pipeline(initializer=_attach_script_run_ctx(get_script_run_ctx()))
+                    pipeline.add("rules_feedback", apply_investment_rules, inputs=["company_record", "user_sector_input"])
+                    pipeline_result = pipeline.run({
+                        "company_data": company_data,
+                        "company_record": CompanyRecord.from_dict(company_data),
+                        "user_sector_input": sector_input,
+                    })
+
+        if pipeline_result:
+            for node_name, node_label in NODE_LABELS.items():
+                if node_name in pipeline_result.errors:
+                    st.error(f"{node_label} Error: {pipeline_result.errors[node_name]}")
+                elif isinstance(pipeline_result.results.get(node_name), dict) and pipeline_result.results[node_name].get("error"):
+                    st.error(f"{node_label} Error: {pipeline_result.results[node_name]['error']}")
+
+            llm_analysis = pipeline_result.results.get("llm_analysis", {})
+            investment_thesis = pipeline_result.results.get("investment_thesis", {})
+            founders_analysis = pipeline_result.results.get("founders_analysis", {})
+            product_analysis = pipeline_result.results.get("product_analysis", {})
+            rules_feedback = pipeline_result.results.get("rules_feedback", [])
+
+        # Parsed once here; rules, the report UI, Markdown and PDF all read this record.
+        company_record = CompanyRecord.from_dict(company_data)
         st.session_state.report_data = {
             'company_data': company_data,
+            'company_record': company_record,
             'llm_analysis': llm_analysis,
             'investment_thesis': investment_thesis,
             'founders_analysis': founders_analysis,
             'product_analysis': product_analysis,
             'rules_feedback': rules_feedback,
-            'startup_name': startup_name_input
+            'startup_name': startup_name_input,
+            'user_sector_input': sector_input,
+            'gap_filled': gap_fill.get('filled', []),
+            'section_fetched_at': section_fetched_at
         }
+        # Remember each rule's feedback so what-if changes only re-run the rules they touch.
+        st.session_state.rules_state.update(company_record, sector_input)
+        # The report is final: start the PDF now so it is ready by the time anyone clicks Download.
+        submit_pdf(st.session_state.report_data, log=debug_mode)
+        # Keep the finished report so it can be reopened later from the sidebar without any API calls.
+        report_store = get_report_store()
+        if report_store and not company_data.get("error"):
+            try:
+                report_store.save(st.session_state.report_data)
+            except sqlite3.Error as e:
+                print(f"!!! Could not save the report: {e}")
 
         if debug_mode:
             print("--- DEBUG MODE ENABLED ---")
@@ -402,9 +465,53 @@ if st.sidebar.button("Generate Report", type="primary"):
             print(json.dumps(founders_analysis, indent=2))
             print("\n--- RAW PRODUCT ANALYSIS RESPONSE ---")
             print(json.dumps(product_analysis, indent=2))
+            if gap_fill:
+                print("\n--- MISSING FIELDS ---")
+                print(json.dumps({key: value for key, value in gap_fill.items() if key != 'fields'}, indent=2))
             print("\n--- RULES FEEDBACK ---")
             print(json.dumps(rules_feedback, indent=2))
+            if pipeline_result:
+                print("\n--- PIPELINE TIMINGS (seconds) ---")
+                for node_name, elapsed in pipeline_result.timings.items():
+                    print(f"{node_name}: {elapsed:.2f}")
+                print(f"wall clock: {pipeline_result.elapsed:.2f}")
+                if pipeline_result.skipped:
+                    print(f"skipped: {', '.join(pipeline_result.skipped)}")
+            if first_content_at:
+                print("\n--- TIME TO FIRST CONTENT (seconds) ---")
+                for node_name, elapsed in sorted(first_content_at.items(), key=lambda item: item[1]):
+                    print(f"{node_name}: {elapsed:.2f}")
+            response_cache = get_response_cache()
+            if response_cache:
+                print("\n--- RESPONSE CACHE ---")
+                print(json.dumps(response_cache.stats(), indent=2))
+            layer_cache = get_layer_cache()
+            if layer_cache:
+                print("\n--- LAYER CACHE ---")
+                print(json.dumps(layer_cache.stats(), indent=2))
+            print("\n--- PROVIDER CONNECTIONS ---")
+            print(json.dumps(connection_stats(), indent=2))
+            print("\n--- RATE LIMITERS ---")
+            print(json.dumps(limiter_stats(), indent=2))
+            print("\n--- PROVIDER LATENCY (seconds) ---")
+            print(json.dumps(latency_stats(), indent=2))
             print("\n--- END OF DEBUG INFORMATION ---")
 
-if st.session_state.report_data:
-    display_report_ui(st.session_state.report_data)
\ No newline at end of file
+report_store = get_report_store()
+if report_store:
+    _stored_reports_sidebar(report_store)
+
+report_data = st.session_state.report_data
+if report_data and sector_input != report_data.get('user_sector_input', sector_input):
+    # Target Sector changed since the report was generated: re-score only the rules that read it.
+    report_data['rules_feedback'] = st.session_state.rules_state.update(
+        report_data['company_record'], sector_input, changed={SECTOR_INPUT}
+    )
+    report_data['user_sector_input'] = sector_input
+    submit_pdf(report_data, log=st.session_state.debug_mode)
+    st.info(f"Investment rules re-scored for target sector '{sector_input}'. "
+            "Click Generate Report to refresh the company data for it.")
+
+if report_data:
+    report_data = _refresh_controls(report_data)
+    display_report_ui(report_data)
\ No newline at end of file
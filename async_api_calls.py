@@ -0,0 +1,378 @@
+# async_api_calls.py
+# Asyncio versions of the api_calls.py surface. All coroutines run on one
+# process-wide event loop (started lazily in a daemon thread), so many reports
+# can be in flight at once without a thread per request. The sync wrappers at
+# the bottom are what Streamlit and other blocking callers use.
+import os
+import queue
+import asyncio
+import threading
+from groq import RateLimitError
+from api_calls import (
+    _extract_json_from_response,
+    _merge_json_objects,
+    _with_fetched_at,
+    _perplexity_messages,
+    _qualitative_analysis_prompt,
+    _investment_thesis_prompt,
+    _founders_analysis_prompt,
+    _product_analysis_prompt,
+    PERPLEXITY_MODEL,
+    PERPLEXITY_URL,
+    GROQ_MODEL,
+    COMPANY_DATA_SECTIONS,
+    COMPANY_DATA_FIELDS,
+    LAYER_FIELDS,
+    LAYER_CACHE_KEYS,
+    section_ttl,
+    pop_fetched_at,
+    company_field,
+    with_company_fields
+)
+from pipeline import AsyncPipeline
+from providers import get_async_perplexity_client, get_async_groq_client
+from response_cache import get_response_cache
+from layer_cache import cached_layer
+from gap_fill import plan_gap_fill, gap_fill_limits, gap_prompt, apply_gap_answers
+from rate_limit import Throttled
+from resilience import resilient_call_async
+from rules import apply_investment_rules
+from company_record import CompanyRecord
+from streaming import stream_sink, emit, with_stream_sink, parse_sse_line
+
+
+async def _make_perplexity_request_async(prompt_template, startup_name, sector, ttl=None, fresh=False):
+    """
+    Makes a single request to the Perplexity API. `ttl` limits the age of a
+    cached response that may be reused; `fresh` skips the cache lookup.
+    """
+    api_key = os.getenv("PERPLEXITY_API_KEY")
+    if not api_key:
+        return {"error": "Critical: PERPLEXITY_API_KEY environment variable not found."}
+
+    headers = {"authorization": f"Bearer {api_key}"}
+    payload = {
+        "model": PERPLEXITY_MODEL,
+        "messages": _perplexity_messages(prompt_template, startup_name, sector)
+    }
+
+    cache = get_response_cache()
+    cache_key = cache.make_key("perplexity", PERPLEXITY_MODEL, payload["messages"]) if cache else None
+    cached, cached_at = cache.get("perplexity", cache_key, ttl) if cache and not fresh else (None, None)
+    if cached is not None:
+        emit(cached)
+        return _with_fetched_at(_extract_json_from_response(cached), cached_at)
+
+    async def post():
+        response = await get_async_perplexity_client().post(PERPLEXITY_URL, headers=headers, json=payload)
+        if response.status_code == 429:
+            raise Throttled(response.headers)
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content'], response.headers
+
+    async def post_streaming():
+        # Server-Sent Events: the partial text goes to the stream sink as it
+        # arrives, JSON is extracted once the message is complete.
+        async with get_async_perplexity_client().stream(
+            "POST", PERPLEXITY_URL, headers=headers, json=dict(payload, stream=True)
+        ) as response:
+            if response.status_code == 429:
+                raise Throttled(response.headers)
+            response.raise_for_status()
+            text = ""
+            async for line in response.aiter_lines():
+                updated, finished = parse_sse_line(line, text)
+                if updated != text:
+                    text = updated
+                    emit(text)
+                if finished:
+                    break
+            return text, response.headers
+
+    streaming = stream_sink.get() is not None
+    try:
+        raw_content = await resilient_call_async(
+            "perplexity", PERPLEXITY_MODEL, post_streaming if streaming else post, hedge=not streaming
+        )
+        data = _extract_json_from_response(raw_content)
+        # An answer without JSON would otherwise keep failing until its TTL; only cache usable ones.
+        if cache and "error" not in data:
+            cache.set("perplexity", cache_key, raw_content)
+        return data
+    except Exception as e:
+        print(f"!!! PERPLEXITY API ERROR: {e}")
+        return {"error": f"An unexpected error occurred with Perplexity: {e}"}
+
+
+async def _groq_chat_completion_async(system_prompt, user_prompt, temperature):
+    """Runs a single Groq chat completion and returns the raw message content."""
+    messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+
+    cache = get_response_cache()
+    cache_key = cache.make_key("groq", GROQ_MODEL, messages, temperature) if cache else None
+    cached, _ = cache.get("groq", cache_key) if cache else (None, None)
+    if cached is not None:
+        emit(cached)
+        return cached
+
+    async def create():
+        try:
+            response = await get_async_groq_client().chat.completions.with_raw_response.create(
+                model=GROQ_MODEL,
+                messages=messages,
+                temperature=temperature,
+            )
+        except RateLimitError as e:
+            raise Throttled(e.response.headers)
+        completion = await response.parse()
+        return completion.choices[0].message.content, response.headers
+
+    async def create_streaming():
+        try:
+            response = await get_async_groq_client().chat.completions.with_raw_response.create(
+                model=GROQ_MODEL,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+            )
+        except RateLimitError as e:
+            raise Throttled(e.response.headers)
+        text = ""
+        async for chunk in await response.parse():
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                text += delta
+                emit(text)
+        return text, response.headers
+
+    streaming = stream_sink.get() is not None
+    raw_content = await resilient_call_async(
+        "groq", GROQ_MODEL, create_streaming if streaming else create, hedge=not streaming
+    )
+    if cache and _merge_json_objects(raw_content):
+        cache.set("groq", cache_key, raw_content)
+    return raw_content
+
+
+# --- KNOWLEDGE LAYER 1 ---
+async def fetch_company_section_async(section, startup_name, sector, fresh=False):
+    template, _ = COMPANY_DATA_SECTIONS[section]
+    return await _make_perplexity_request_async(template, startup_name, sector, ttl=section_ttl(section), fresh=fresh)
+
+async def get_company_data_async(startup_name, sector):
+    """Fetches all four Layer 1 sections concurrently and merges them."""
+    company_data = {}
+    sections = list(COMPANY_DATA_SECTIONS)
+    results = await asyncio.gather(
+        *(fetch_company_section_async(section, startup_name, sector) for section in sections),
+        return_exceptions=True,
+    )
+    for section, data in zip(sections, results):
+        if isinstance(data, Exception):
+            print(f"{section} generated an exception: {data}")
+            continue
+        pop_fetched_at(data)
+        if data.get("error"):
+            print(f"Error fetching {section} data: {data['error']}")
+        company_data.update(data)
+    return company_data
+
+async def fill_gaps_async(company_data, startup_name, sector, sections=None, fresh=False):
+    """
+    gap_fill.fill_gaps on the event loop: the follow-up prompts for missing
+    keys run concurrently, and those still running at the time budget are
+    cancelled. `fresh` skips the response cache.
+    """
+    requests, summary = plan_gap_fill(company_data, sections=sections)
+    _, _, timeout = gap_fill_limits()
+    answers = {}
+    if requests:
+        tasks = {
+            asyncio.ensure_future(_make_perplexity_request_async(
+                gap_prompt(section, paths), startup_name, sector, ttl=section_ttl(section), fresh=fresh)): section
+            for section, paths in requests
+        }
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            answers[tasks[task]] = task.exception() or task.result()
+    return apply_gap_answers(company_data, requests, answers, summary)
+
+
+# --- KNOWLEDGE LAYERS 2-5 ---
+@cached_layer("llm_analysis", *LAYER_CACHE_KEYS["llm_analysis"])
+async def generate_qualitative_analysis_async(company_data):
+    try:
+        raw_content = await _groq_chat_completion_async(*_qualitative_analysis_prompt(company_data))
+        return _extract_json_from_response(raw_content)
+    except Exception as e:
+        return {"error": f"LLM generation failed with an unexpected error: {e}"}
+
+@cached_layer("investment_thesis", *LAYER_CACHE_KEYS["investment_thesis"])
+async def generate_investment_thesis_async(company_data, llm_analysis):
+    try:
+        raw_content = await _groq_chat_completion_async(*_investment_thesis_prompt(company_data, llm_analysis))
+        return _extract_json_from_response(raw_content)
+    except Exception as e:
+        return {"error": f"LLM generation failed for thesis with an unexpected error: {e}"}
+
+@cached_layer("founders_analysis", *LAYER_CACHE_KEYS["founders_analysis"])
+async def generate_founders_analysis_async(company_data):
+    prompt = _founders_analysis_prompt(company_data)
+    if not prompt:
+        return {"error": "Could not determine stage or sector for founders analysis."}
+    try:
+        raw_content = await _groq_chat_completion_async(*prompt)
+        return _extract_json_from_response(raw_content)
+    except Exception as e:
+        return {"error": f"LLM generation failed for founders analysis with an unexpected error: {e}"}
+
+@cached_layer("product_analysis", *LAYER_CACHE_KEYS["product_analysis"])
+async def generate_product_analysis_async(company_data):
+    prompt = _product_analysis_prompt(company_data)
+    if not prompt:
+        return {"error": "Could not determine stage or sector for product analysis."}
+    try:
+        raw_content = await _groq_chat_completion_async(*prompt)
+        return _extract_json_from_response(raw_content)
+    except Exception as e:
+        return {"error": f"LLM generation failed for product analysis with an unexpected error: {e}"}
+
+
+# --- ORCHESTRATION ---
+def _section_node(section):
+    async def node(startup_name, sector):
+        data = await fetch_company_section_async(section, startup_name, sector)
+        return {company_field(key): value for key, value in data.items()}
+    return node
+
+async def _gap_fill_node(company_data, startup_name, sector):
+    # A failure here must not cost the report its rules, which wait on this node.
+    try:
+        return await fill_gaps_async(company_data, startup_name, sector)
+    except Exception as e:
+        print(f"!!! GAP FILL ERROR: {e}")
+        return {"fields": {}, "error": f"Could not fill the missing fields: {e}"}
+
+def _rules_node(company_data, user_sector_input, gap_fill):
+    return apply_investment_rules(CompanyRecord.from_dict({**company_data, **gap_fill.get("fields", {})}), user_sector_input)
+
+def build_report_pipeline_async(max_concurrency=None, on_partial=None):
+    """
+    The full report as an AsyncPipeline: each Perplexity section publishes its
+    fields, each Groq layer fires as soon as the fields it subscribes to have
+    arrived. Once every section has settled, follow-up prompts ask for the
+    keys that came back missing, and the rules pass scores the filled data;
+    the Groq layers do not wait for the follow-ups. Expects
+    `startup_name`, `sector` and `user_sector_input` as inputs. With
+    `on_partial(name, text)`, provider calls stream and report each node's
+    text so far.
+    """
+    pipeline = AsyncPipeline(max_concurrency=max_concurrency)
+    for section, (_, fields) in COMPANY_DATA_SECTIONS.items():
+        pipeline.add(section, with_stream_sink(section, _section_node(section), on_partial),
+                     inputs=["startup_name", "sector"],
+                     outputs=[company_field(field) for field in fields])
+
+    layers = {
+        "llm_analysis": generate_qualitative_analysis_async,
+        "founders_analysis": generate_founders_analysis_async,
+        "product_analysis": generate_product_analysis_async,
+    }
+    for name, func in layers.items():
+        pipeline.add(name, with_stream_sink(name, with_company_fields(func, LAYER_FIELDS[name]), on_partial),
+                     inputs=[company_field(field) for field in LAYER_FIELDS[name]])
+    thesis = with_company_fields(generate_investment_thesis_async, LAYER_FIELDS["investment_thesis"])
+    pipeline.add("investment_thesis", with_stream_sink("investment_thesis", thesis, on_partial),
+                 inputs=[company_field(field) for field in LAYER_FIELDS["investment_thesis"]] + ["llm_analysis"])
+
+    pipeline.add("gap_fill", with_company_fields(_gap_fill_node, COMPANY_DATA_FIELDS),
+                 inputs=[company_field(field) for field in COMPANY_DATA_FIELDS] + ["startup_name", "sector"])
+    pipeline.add("rules_feedback", with_company_fields(_rules_node, COMPANY_DATA_FIELDS),
+                 inputs=[company_field(field) for field in COMPANY_DATA_FIELDS] + ["user_sector_input", "gap_fill"])
+    return pipeline
+
+async def generate_report_async(startup_name, sector, on_node_done=None, on_partial=None):
+    """Runs the whole report for one company and returns the PipelineResult."""
+    pipeline = build_report_pipeline_async(on_partial=on_partial)
+    return await pipeline.run(
+        {"startup_name": startup_name, "sector": sector, "user_sector_input": sector},
+        on_node_done=on_node_done,
+    )
+
+
+# --- SYNC WRAPPERS (one shared event loop) ---
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-api-calls", daemon=True).start()
+        return _loop
+
+def run_sync(coro):
+    """Runs a coroutine on the shared event loop and blocks until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+def _drain(events, timeout):
+    """
+    Waits for at least one event and returns everything queued, keeping only
+    the latest partial text per node so a fast stream does not flood the UI.
+    """
+    batch = [events.get(timeout=timeout)]
+    while True:
+        try:
+            batch.append(events.get_nowait())
+        except queue.Empty:
+            break
+    latest = {name: index for index, (kind, name, _) in enumerate(batch) if kind == "partial"}
+    return [event for index, event in enumerate(batch) if event[0] != "partial" or latest[event[1]] == index]
+
+def generate_report(startup_name, sector, on_node_done=None, on_partial=None):
+    """
+    Blocking wrapper around generate_report_async. `on_node_done(name, result)`
+    and `on_partial(name, text)` are relayed back to the calling thread, so
+    Streamlit can update the page as text streams in and each node finishes.
+    """
+    events = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(
+        generate_report_async(
+            startup_name, sector,
+            on_node_done=lambda name, result: events.put(("done", name, result)),
+            on_partial=(lambda name, text: events.put(("partial", name, text))) if on_partial else None,
+        ),
+        _get_loop(),
+    )
+    while True:
+        try:
+            batch = _drain(events, timeout=0.1)
+        except queue.Empty:
+            if future.done() and events.empty():
+                break
+            continue
+        for kind, name, value in batch:
+            if kind == "partial":
+                on_partial(name, value)
+            elif on_node_done:
+                on_node_done(name, value)
+    return future.result()
+
+def generate_reports(companies, max_concurrency=20):
+    """
+    Runs reports for many (startup_name, sector) pairs on the shared loop, at
+    most `max_concurrency` at a time, and returns their PipelineResults in order.
+    """
+    async def run_all():
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(startup_name, sector):
+            async with semaphore:
+                return await generate_report_async(startup_name, sector)
+
+        return await asyncio.gather(*(run_one(name, sector) for name, sector in companies))
+
+    return run_sync(run_all())
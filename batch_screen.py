@@ -0,0 +1,171 @@
+# batch_screen.py
+# Headless batch screening: runs the full report pipeline for every company in
+# a CSV or JSONL file and appends one JSON line per company to the output file
+# as soon as it finishes. Re-running with the same output file resumes where a
+# previous run stopped. Finished reports are also saved to the report store,
+# where screening.py can query them.
+#
+#   python batch_screen.py companies.csv -o screening.jsonl --workers 10
+import os
+import csv
+import sys
+import json
+import time
+import asyncio
+import argparse
+from dotenv import load_dotenv
+from api_calls import build_report_data, LAYER_FIELDS
+from async_api_calls import generate_report_async, run_sync
+from report_store import get_report_store
+
+
+def read_companies(path):
+    """Reads (startup_name, sector) rows from a .csv or .jsonl file."""
+    companies = []
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            name = (row.get('startup_name') or '').strip()
+            if name:
+                companies.append((name, (row.get('sector') or '').strip()))
+    return companies
+
+
+def _company_key(startup_name, sector):
+    return (startup_name.strip().lower(), sector.strip().lower())
+
+
+def _succeeded(record):
+    """
+    Whether a record holds a full report. Provider failures do not raise: a
+    failed section leaves company_data without its fields (or with an
+    'error'), and a failed AI layer returns an {"error": ...} dict.
+    """
+    company_data = record.get('company_data')
+    if record.get('error') or record.get('errors') or not company_data or company_data.get('error'):
+        return False
+    return not any(isinstance(record.get(layer), dict) and 'error' in record[layer] for layer in LAYER_FIELDS)
+
+
+def completed_keys(output_path):
+    """
+    Returns the companies already screened successfully in an output file.
+    Failed companies are left out so a resumed run retries them; a torn last
+    line is ignored.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if _succeeded(record):
+                done.add(_company_key(record.get('startup_name', ''), record.get('sector', '')))
+    return done
+
+
+def _end_with_newline(output_path):
+    """
+    Makes sure the next appended record starts on a line of its own. A torn
+    last line from an interrupted run is cut off; a complete record that only
+    lacks its newline gets one.
+    """
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        start = end
+        while start > 0:
+            block = max(0, start - 65536)
+            f.seek(block)
+            index = f.read(start - block).rfind(b'\n')
+            if index != -1:
+                start = block + index + 1
+                break
+            start = block
+        if start == end:
+            return
+        f.seek(start)
+        try:
+            json.loads(f.read(end - start))
+        except ValueError:
+            f.truncate(start)
+        else:
+            f.write(b'\n')
+
+
+async def screen(companies, output_path, workers):
+    """Screens companies concurrently, streaming each finished report to `output_path`."""
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run_one(startup_name, sector):
+        async with semaphore:
+            try:
+                result = await generate_report_async(startup_name, sector)
+            except Exception as exc:
+                return {'startup_name': startup_name, 'sector': sector, 'error': str(exc)}
+        record = build_report_data(result, startup_name)
+        record.update({
+            'sector': sector,
+            'errors': result.errors,
+            'skipped': result.skipped,
+            'timings': result.timings,
+            'elapsed': result.elapsed,
+        })
+        return record
+
+    tasks = [asyncio.ensure_future(run_one(name, sector)) for name, sector in companies]
+    report_store = get_report_store()
+    finished = 0
+    _end_with_newline(output_path)
+    with open(output_path, 'a', encoding='utf-8') as out:
+        for task in asyncio.as_completed(tasks):
+            record = await task
+            out.write(json.dumps(record, default=str) + '\n')
+            out.flush()
+            if report_store and record.get('company_data') and not record['company_data'].get('error'):
+                report_store.save(record)
+            finished += 1
+            status = 'ok' if _succeeded(record) else 'ERROR'
+            print(f"[{finished}/{len(companies)}] {record['startup_name']}: {status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen many startups without the Streamlit UI.")
+    parser.add_argument("input", help="CSV or JSONL file with startup_name and sector columns")
+    parser.add_argument("-o", "--output", default="screening_results.jsonl", help="JSONL file to append results to")
+    parser.add_argument("-w", "--workers", type=int, default=10, help="number of companies screened concurrently")
+    parser.add_argument("--no-resume", action="store_true", help="re-screen companies already in the output file")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if not os.getenv("PERPLEXITY_API_KEY") or not os.getenv("GROQ_API_KEY"):
+        print("Missing API Keys! Please check your .env file for PERPLEXITY_API_KEY and GROQ_API_KEY.")
+        return 1
+
+    companies = read_companies(args.input)
+    if not args.no_resume:
+        done = completed_keys(args.output)
+        remaining = [(name, sector) for name, sector in companies if _company_key(name, sector) not in done]
+        if len(remaining) < len(companies):
+            print(f"Resuming: {len(companies) - len(remaining)} of {len(companies)} companies already screened.")
+        companies = remaining
+
+    if not companies:
+        print("Nothing to screen.")
+        return 0
+
+    start = time.perf_counter()
+    run_sync(screen(companies, args.output, max(1, args.workers)))
+    print(f"Screened {len(companies)} companies in {time.perf_counter() - start:.1f}s -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# benchmarks/bench_json_extract.py
+# Throughput of _extract_json_from_response on large multi-object model
+# outputs, against the previous regex + brace-counting implementation.
+#
+#   python benchmarks/bench_json_extract.py
+import sys
+import os
+import re
+import json
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api_calls import _extract_json_from_response
+
+
+def legacy_extract(raw_content):
+    """The three-pass extractor this module replaced (minus its logging)."""
+    merged_json = {}
+    json_blocks = re.findall(r'```json\s*(\{.*?\})\s*```', raw_content, re.DOTALL)
+    for block in json_blocks:
+        try:
+            merged_json.update(json.loads(block))
+        except json.JSONDecodeError:
+            pass
+    content_without_blocks = re.sub(r'```json\s*(\{.*?\})\s*```', '', raw_content, flags=re.DOTALL)
+    brace_level = 0
+    start_index = -1
+    for i, char in enumerate(content_without_blocks):
+        if char == '{':
+            if brace_level == 0:
+                start_index = i
+            brace_level += 1
+        elif char == '}':
+            if brace_level > 0:
+                brace_level -= 1
+                if brace_level == 0 and start_index != -1:
+                    try:
+                        merged_json.update(json.loads(content_without_blocks[start_index:i+1]))
+                        start_index = -1
+                    except json.JSONDecodeError:
+                        pass
+    return merged_json
+
+
+def make_response(objects):
+    """A model-style answer: prose, fenced and bare JSON objects with nested data."""
+    parts = []
+    for n in range(objects):
+        obj = {
+            f"field_{n}": f"Value {n} with prose, commas and a long explanation " * 4,
+            f"nested_{n}": {"items": list(range(20)), "notes": {"source": "https://example.com", "score": n / 7}},
+        }
+        text = json.dumps(obj, indent=2)
+        parts.append(f"Section {n} analysis follows.\n" + (f"```json\n{text}\n```" if n % 2 else text))
+    return "\n\n".join(parts)
+
+
+def bench(func, raw, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(raw)
+    return time.perf_counter() - start
+
+
+def main():
+    for objects in (10, 100, 1000):
+        raw = make_response(objects)
+        repeat = max(3, 2000 // objects)
+        assert _extract_json_from_response(raw) == legacy_extract(raw)
+        new = bench(_extract_json_from_response, raw, repeat)
+        old = bench(legacy_extract, raw, repeat)
+        megabytes = len(raw) * repeat / 1e6
+        print(f"{objects:>5} objects, {len(raw) / 1024:8.1f} KiB: "
+              f"single-pass {megabytes / new:7.1f} MB/s, legacy {megabytes / old:7.1f} MB/s, {old / new:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
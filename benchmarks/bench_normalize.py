@@ -0,0 +1,96 @@
+# benchmarks/bench_normalize.py
+# Throughput of normalize.parse_numerical_value over financial strings in the
+# shape Perplexity returns them, against the previous findall-based parser,
+# with a cold and a warm memo. Also lists the strings the two parsers read
+# differently.
+#
+#   python benchmarks/bench_normalize.py [values]
+import sys
+import os
+import re
+import time
+import random
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from normalize import parse_numerical_value, parse_amount
+
+# total_funding / valuation / market_size / revenue values as they come back from sonar-pro.
+CORPUS = [
+    "$12.5M", "$12.5 million", "USD 12.5 million", "$1.2 billion", "$1.2B", "US$ 850 million",
+    "$3.4 bn (2023)", "~$500K", "$45k", "45k", "$1-2B", "$1M – $3M", "$500 million to $1 billion",
+    "₹300 crore", "₹1,250 Cr", "INR 45 crore (~$5.4M)", "Rs. 10 lakh", "₹2.5 lakh crore",
+    "€20 million", "£4.5m", "$2.5 trillion (global, 2030)", "$1.2T by 2032",
+    "$150 million (Series C, 2022)", "Undisclosed", "Not publicly disclosed", "N/A",
+    "$7.8 billion, growing at 14% CAGR", "$60 billion global fintech market", "$5,000,000",
+    "Approximately $25 million across 3 rounds", "Estimated $10-15M ARR", "12%", "",
+]
+
+
+def legacy_parse(value_string):
+    """The parser normalize.py replaced: billion/million only, regex compiled per call."""
+    if not isinstance(value_string, str):
+        return value_string
+    value_string = value_string.lower().replace(",", "").strip()
+    if "n/a" in value_string or not value_string:
+        return None
+    multiplier = 1
+    if "billion" in value_string:
+        multiplier = 1_000_000_000
+        value_string = value_string.replace("billion", "")
+    elif "million" in value_string:
+        multiplier = 1_000_000
+        value_string = value_string.replace("million", "")
+    numbers = re.findall(r'\d+\.?\d*', value_string)
+    if numbers:
+        try:
+            return float(numbers[0]) * multiplier
+        except ValueError:
+            return None
+    return None
+
+
+def make_values(count, rng):
+    """Corpus strings, repeated as they are across a portfolio, with some per-company variants."""
+    values = []
+    for _ in range(count):
+        if rng.random() < 0.8:
+            values.append(rng.choice(CORPUS))
+        else:
+            values.append(f"${rng.randint(1, 999)}.{rng.randint(0, 9)} {rng.choice(['million', 'M', 'billion', 'B', 'crore'])}")
+    return values
+
+
+def bench(func, values, passes=1):
+    start = time.perf_counter()
+    for _ in range(passes):
+        for value in values:
+            func(value)
+    return time.perf_counter() - start
+
+
+def main(count=10_000, passes=10):
+    # One portfolio's funding/valuation/market-size strings, re-read on every rules pass.
+    values = make_values(count, random.Random(0))
+    old = bench(legacy_parse, values, passes)
+    uncached = bench(parse_amount.__wrapped__, values, passes)
+    parse_amount.cache_clear()
+    first = bench(parse_numerical_value, values)
+    parse_amount.cache_clear()
+    memo = bench(parse_numerical_value, values, passes)
+    total = count * passes
+    print(f"{count} values ({len(set(values))} distinct), {passes} passes")
+    for label, seconds, n in (("legacy", old, total), ("no memo", uncached, total),
+                              ("first pass", first, count), ("memoized", memo, total)):
+        per_value = seconds / n
+        print(f"  {label:<10} {per_value * 1e9:7.0f} ns/value  {old / total / per_value:5.1f}x")
+
+    print("\nValues read differently:")
+    for value in CORPUS:
+        if legacy_parse(value) != parse_numerical_value(value):
+            print(f"  {value!r:<45} legacy {legacy_parse(value)!r:<16} now {parse_numerical_value(value)!r}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,90 @@
+# benchmarks/bench_pdf.py
+# Per-document overhead of PDFReport when rendering many memos: the shared
+# style registry against the previous per-instance getSampleStyleSheet()
+# setup, for construction alone and for full renders.
+#
+#   python benchmarks/bench_pdf.py [memos]
+import sys
+import os
+import io
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reportlab.platypus import SimpleDocTemplate
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.colors import navy
+from reportlab.lib.units import inch
+from pdf_generator import PDFReport
+from report_document import build_report_document
+
+
+class LegacyPDFReport(PDFReport):
+    """PDFReport with the constructor it had before the style registry."""
+    def __init__(self, buffer=None):
+        self.buffer = buffer if buffer else io.BytesIO()
+        self.doc = SimpleDocTemplate(self.buffer, pagesize=(8.5*inch, 11*inch),
+                                     leftMargin=0.75*inch, rightMargin=0.75*inch,
+                                     topMargin=0.75*inch, bottomMargin=0.75*inch)
+        self.styles = getSampleStyleSheet()
+        self.styles['Title'].fontName = 'Helvetica-Bold'
+        self.styles['Title'].fontSize = 24
+        self.styles['Title'].leading = 28
+        self.styles['Title'].textColor = navy
+        self.styles['Title'].alignment = TA_CENTER
+        for name, size, leading in (('h2', 16, 20), ('h3', 12, 16)):
+            self.styles[name].fontName = 'Helvetica-Bold'
+            self.styles[name].fontSize = size
+            self.styles[name].leading = leading
+            self.styles[name].textColor = navy
+        for name in ('BodyText', 'Bullet'):
+            self.styles[name].fontName = 'Helvetica'
+            self.styles[name].fontSize = 10
+            self.styles[name].leading = 14
+        self.styles['Bullet'].leftIndent = 18
+        self.styles.add(ParagraphStyle(name='Key', fontName='Helvetica-Bold', fontSize=10, leading=12))
+        self.styles.add(ParagraphStyle(name='Value', fontName='Helvetica', fontSize=10, leading=12))
+
+
+def make_report(n):
+    """A short one-company memo, the common case in batch runs."""
+    return {
+        "company_data": {
+            "name": f"Company {n}", "foundedYear": 2015 + n % 8, "domain": f"company{n}.com",
+            "geo": {"city": "Bengaluru", "country": "India"}, "metrics": {"employees": 20 + n % 300},
+            "category": {"sector": "Fintech", "sub_sector": "Payments"},
+            "total_funding": f"${n % 90 + 1}M", "competitors": ["Alpha", "Beta"],
+            "founders_analysis": {"names_of_founders": ["A. Founder", "B. Founder"]},
+            "key_investors": ["Sequoia", "Accel"],
+        },
+        "llm_analysis": {"swot_analysis": "Strengths and weaknesses.", "key_highlights": ["Growing fast"]},
+        "investment_thesis": {"investment_summary": "Promising.", "key_risks": "Competition."},
+        "founders_analysis": {}, "product_analysis": {},
+        "rules_feedback": [{"text": f"Rule {i}: detail", "type": "positive" if i % 2 else "negative"} for i in range(8)],
+        "startup_name": f"Company {n}",
+    }
+
+
+def per_document(func, count):
+    start = time.perf_counter()
+    for n in range(count):
+        func(n)
+    return (time.perf_counter() - start) / count
+
+
+def main(memos=1000):
+    documents = [build_report_document(make_report(n)) for n in range(memos)]
+    construct = {cls.__name__: per_document(lambda n: cls(), memos) for cls in (LegacyPDFReport, PDFReport)}
+    render = {cls.__name__: per_document(lambda n: cls().render(documents[n]), memos) for cls in (LegacyPDFReport, PDFReport)}
+
+    print(f"{memos} memos")
+    for label, timings in (("constructor", construct), ("full render", render)):
+        legacy, shared = timings["LegacyPDFReport"], timings["PDFReport"]
+        print(f"  {label:<12} per-instance styles {legacy * 1e3:7.2f} ms/doc, shared registry {shared * 1e3:7.2f} ms/doc, "
+              f"saved {(legacy - shared) * 1e3:5.2f} ms/doc ({(legacy - shared) * memos:.1f}s per {memos})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,44 @@
+# benchmarks/bench_portfolio_book.py
+# Wall time and peak memory of portfolio_book.build_book as the number of
+# memos grows. Each size runs in a fresh process so the parent's peak RSS is
+# measured on its own; it should stay roughly flat from 50 to 200 memos.
+#
+#   python benchmarks/bench_portfolio_book.py [workers]
+import sys
+import os
+import json
+import resource
+import tempfile
+import subprocess
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SIZES = (50, 100, 200)
+
+
+def run_one(memos, workers):
+    from bench_pdf import make_report
+    from portfolio_book import build_book
+    with tempfile.TemporaryDirectory() as directory:
+        summary = build_book((make_report(n) for n in range(memos)), os.path.join(directory, "book.pdf"), workers)
+    summary['peak_rss_mib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(summary))
+
+
+def main(workers):
+    print(f"{workers} worker processes")
+    for memos in SIZES:
+        output = subprocess.run([sys.executable, __file__, "--one", str(memos), str(workers)],
+                                capture_output=True, text=True, check=True).stdout
+        summary = json.loads(output.strip().splitlines()[-1])
+        print(f"  {memos:>4} memos: {summary['pages']:>5} pages, {summary['bytes'] / 1024:7.0f} KiB, "
+              f"{summary['elapsed']:6.1f}s, parent peak RSS {summary['peak_rss_mib']:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--one":
+        run_one(int(sys.argv[2]), int(sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1)
@@ -0,0 +1,188 @@
+# benchmarks/bench_rules.py
+# Compiled rule evaluation against the previous interpreter, which re-read
+# rules.json and walked the if/elif operator chain on every call, plus the
+# vectorized batch engine over the whole portfolio.
+#
+#   python benchmarks/bench_rules.py [number_of_companies]
+import sys
+import os
+import json
+import time
+import random
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.chdir(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime
+from rules import apply_investment_rules, _get_nested_value, _parse_numerical_value
+from rules import load_ruleset, load_multi_ruleset, apply_investment_rules_multi
+from rules_batch import apply_investment_rules_batch, outcome_matrix
+
+
+def legacy_apply_investment_rules(company_data, user_sector_input):
+    """The interpreted engine this module replaced."""
+    feedback = []
+    try:
+        with open('rules.json', 'r') as f:
+            rules = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        feedback.append({'text': "Critical Error: Could not load or parse rules.json.", 'type': 'negative'})
+        return feedback
+
+    calculated_values = {}
+    founded_year = company_data.get('foundedYear')
+    if founded_year and isinstance(founded_year, int):
+        calculated_values['age'] = datetime.now().year - founded_year
+    market_size_str = _get_nested_value(company_data, 'market_size')
+    if market_size_str:
+        calculated_values['parsed_market_size'] = _parse_numerical_value(market_size_str)
+    total_funding_str = _get_nested_value(company_data, 'total_funding')
+    if total_funding_str:
+        calculated_values['parsed_total_funding'] = _parse_numerical_value(total_funding_str)
+
+    for rule in rules.get('global_rules', []):
+        field = rule['field_to_check']
+        operator = rule['operator']
+        rule_value = rule['value']
+        condition_met = True
+        if "condition" in rule:
+            condition = rule["condition"]
+            actual_condition_value = _get_nested_value(company_data, condition["field"])
+            if actual_condition_value is None:
+                condition_met = False
+            if condition["operator"] == "contains_any":
+                if isinstance(actual_condition_value, str) and isinstance(condition["value"], list):
+                    condition_met = any(val.lower() in actual_condition_value.lower() for val in condition["value"])
+                else:
+                    condition_met = False
+        if not condition_met:
+            continue
+        if field.startswith('calculated.'):
+            actual_value = calculated_values.get(field.split('.')[1])
+        else:
+            actual_value = _get_nested_value(company_data, field)
+        if actual_value is None:
+            continue
+        result = False
+        if operator == 'contains':
+            if rule_value == '{user_sector_input}':
+                rule_value = user_sector_input
+            if isinstance(actual_value, str):
+                result = rule_value.lower() in actual_value.lower()
+        elif operator == 'between':
+            if isinstance(actual_value, (int, float)) and len(rule_value) == 2:
+                result = rule_value[0] <= actual_value <= rule_value[1]
+        elif operator == 'equals':
+            result = actual_value == rule_value
+        elif operator == 'is_empty_or_na':
+            result = not actual_value or (isinstance(actual_value, str) and ('none' in actual_value.lower() or 'n/a' in actual_value.lower()))
+        elif operator == 'is_not_empty':
+            result = bool(actual_value)
+        elif operator == 'length_gt':
+            if isinstance(actual_value, str):
+                result = len(actual_value) > rule_value
+        elif operator == 'gt':
+            if isinstance(actual_value, (int, float)):
+                result = actual_value > rule_value
+        elif operator == 'le':
+            if isinstance(actual_value, (int, float)):
+                result = actual_value <= rule_value
+        elif operator == 'lt':
+            if isinstance(actual_value, (int, float)):
+                result = actual_value < rule_value
+        elif operator == 'list_length_between':
+            if isinstance(actual_value, list) and len(rule_value) == 2:
+                result = rule_value[0] <= len(actual_value) <= rule_value[1]
+        template = rule['result_if_true'] if result else rule['result_if_false']
+        display_value = actual_value
+        if operator == 'list_length_between' and isinstance(actual_value, list):
+            display_value = len(actual_value)
+        feedback.append({'text': template['text'].format(value=display_value), 'type': template['type']})
+    return feedback
+
+
+def make_company(rng):
+    """A random company record shaped like merged Layer 1 output, with the usual gaps."""
+    def maybe(value):
+        return value if rng.random() > 0.15 else None
+    company = {
+        'name': f"Company {rng.randrange(10**6)}",
+        'description': maybe("An AI platform " * rng.randint(1, 8)),
+        'category': maybe({'sector': rng.choice(['Fintech', 'Healthtech', 'SaaS', 'Crypto'])}),
+        'metrics': {'employees': maybe(rng.choice([rng.randint(1, 500), 'N/A']))},
+        'foundedYear': maybe(rng.randint(2005, 2025)),
+        'stage': maybe(rng.choice(['Pre-seed', 'Seed', 'Series A', 'Series B'])),
+        'founders_analysis': maybe({'number_of_founders': rng.randint(1, 4),
+                                    'red_flags': rng.choice(['None', 'N/A', 'Prior litigation'])}),
+        'key_investors': maybe([f"VC {i}" for i in range(rng.randint(0, 4))]),
+        'market_size': maybe(rng.choice(['$12 billion', '$800 million', 'N/A'])),
+        'total_funding': maybe(rng.choice(['$5 million', '$120 million', 'N/A'])),
+        'glassdoor_rating': maybe(rng.choice([3.1, 4.2, 'N/A'])),
+        'competitors': maybe([f"Rival {i}" for i in range(rng.randint(0, 14))]),
+        'aggregate_founder_shareholding': maybe(rng.choice([12, 45, 70])),
+    }
+    return {key: value for key, value in company.items() if value is not None}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(42)
+    companies = [(make_company(rng), rng.choice(['fintech', 'saas'])) for _ in range(count)]
+
+    for company, sector in companies[:500]:
+        assert apply_investment_rules(company, sector) == legacy_apply_investment_rules(company, sector)
+    records = [company for company, _ in companies]
+    assert apply_investment_rules_batch(records, 'fintech') == [apply_investment_rules(company, 'fintech') for company in records]
+
+    def run_each(func):
+        return lambda: [func(company, 'fintech') for company in records]
+
+    timings = {}
+    for label, run in (("interpreted", run_each(legacy_apply_investment_rules)),
+                       ("compiled", run_each(apply_investment_rules)),
+                       ("vectorized", lambda: apply_investment_rules_batch(records, 'fintech')),
+                       ("matrix only", lambda: outcome_matrix(load_ruleset(), records, 'fintech'))):
+        start = time.perf_counter()
+        run()
+        timings[label] = time.perf_counter() - start
+        print(f"{label:>11}: {count / timings[label]:10.0f} companies/s ({timings[label] * 1e6 / count:6.1f} us each)")
+    print(f"    speedup: compiled {timings['interpreted'] / timings['compiled']:.1f}x, "
+          f"vectorized {timings['interpreted'] / timings['vectorized']:.1f}x, "
+          f"matrix only {timings['interpreted'] / timings['matrix only']:.1f}x")
+
+
+    # Several fund mandates that differ in one threshold each: one pass over the
+    # distinct predicates against evaluating every fund's ruleset separately.
+    with open('rules.json') as f:
+        base_rules = json.load(f)
+    sample = records[:2000]
+    with tempfile.TemporaryDirectory() as directory:
+        for funds in (1, 4, 16):
+            paths = {}
+            for fund in range(funds):
+                rules = json.loads(json.dumps(base_rules))
+                rules['global_rules'][1]['value'] = [6, 199 + fund * 25]
+                path = os.path.join(directory, f"fund_{funds}_{fund}.json")
+                with open(path, 'w') as f:
+                    json.dump(rules, f)
+                paths[f"fund_{fund}"] = path
+            rulesets = {name: load_ruleset(path) for name, path in paths.items()}
+            multi = load_multi_ruleset(rulesets)
+            assert multi.evaluate(sample[0], 'fintech') == apply_investment_rules_multi(sample[0], 'fintech', paths)
+
+            start = time.perf_counter()
+            for company in sample:
+                for ruleset in rulesets.values():
+                    ruleset.evaluate(company, 'fintech')
+            separate = time.perf_counter() - start
+            start = time.perf_counter()
+            for company in sample:
+                multi.evaluate(company, 'fintech')
+            together = time.perf_counter() - start
+            print(f"{funds:>3} funds ({len(multi.predicates)} distinct predicates): "
+                  f"separate {separate * 1e6 / len(sample):7.1f} us/company, one pass {together * 1e6 / len(sample):7.1f} us/company")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_screening.py
+# Screening queries over a large report store: fills a throwaway store with
+# synthetic companies (through ReportStore.save_many, so the screening columns
+# are derived as in production) and times typical screens.
+#
+#   python benchmarks/bench_screening.py [companies]
+import sys
+import os
+import time
+import random
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from report_store import ReportStore
+from screening import screen
+
+SECTORS = ["Fintech", "Healthtech", "SaaS", "Edtech", "Climate", "Crypto", "D2C", "Logistics"]
+STAGES = ["Pre-seed", "Seed", "Series A", "Series B", "Series C"]
+
+QUERIES = {
+    "fintech, $5M-$50M, >=2 founders, no red flags": dict(
+        sector="fintech", ranges={"total_funding": (5e6, 50e6), "founders": (2, None), "red_flags": (None, 0)}),
+    "all companies by positive rules": dict(),
+    "seed, 10-200 employees, by funding": dict(stage="seed", ranges={"employees": (10, 200)}, sort_by="total_funding"),
+    "valuation >= $1B": dict(ranges={"valuation": (1e9, None)}, sort_by="valuation"),
+    "page 100 of all companies": dict(offset=100 * 50),
+}
+
+
+def make_report(n, rng):
+    funding = rng.choice([f"${rng.randint(1, 500)}M", f"₹{rng.randint(5, 900)} crore", f"${rng.randint(1, 20)}-{rng.randint(21, 60)}M", "N/A"])
+    founders = rng.randint(1, 4)
+    return {
+        "company_data": {
+            "name": f"Company {n}", "stage": rng.choice(STAGES), "foundedYear": rng.randint(2005, 2024),
+            "category": {"sector": rng.choice(SECTORS)}, "metrics": {"employees": rng.randint(2, 5000)},
+            "total_funding": funding, "valuation": rng.choice([f"${rng.randint(10, 5000)}M", "N/A"]),
+            "founders_analysis": {"number_of_founders": founders, "names_of_founders": [f"F{i}" for i in range(founders)],
+                                  "red_flags": rng.choice(["None", "N/A", "Pending litigation"])},
+        },
+        "llm_analysis": {"swot_analysis": "x" * 400},
+        "rules_feedback": [{"text": "rule", "type": rng.choice(["positive", "negative", "neutral"])} for _ in range(12)],
+        "startup_name": f"Company {n}", "user_sector_input": "Fintech",
+    }
+
+
+def main(companies=100_000):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = ReportStore(path=os.path.join(directory, "reports.sqlite3"))
+        start = time.perf_counter()
+        for offset in range(0, companies, 5000):
+            store.save_many(make_report(n, rng) for n in range(offset, min(offset + 5000, companies)))
+        print(f"stored {companies:,} companies in {time.perf_counter() - start:.1f}s")
+
+        for label, criteria in QUERIES.items():
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                rows, total = screen(store, **criteria)
+                timings.append(time.perf_counter() - start)
+            print(f"  {label:<48} {total:>7,} matches, {len(rows):>2} shown, best {min(timings) * 1e3:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
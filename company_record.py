@@ -0,0 +1,192 @@
+# company_record.py
+# A typed, slotted view of the merged Layer 1 data. It is built once when the
+# Perplexity sections have been merged; rules, the Streamlit report, Markdown
+# and PDF then read the same attributes instead of re-walking nested dicts and
+# re-parsing the financial strings.
+from dataclasses import dataclass, field, fields
+from normalize import parse_numerical_value, to_amount
+
+NA = 'N/A'
+
+# company_data paths whose numeric value is parsed once, and the attribute holding it.
+NORMALIZED_FIELDS = {
+    'metrics.employees': 'employee_count',
+    'total_funding': 'total_funding_amount',
+    'valuation': 'valuation_amount',
+    'market_size': 'market_size_amount',
+}
+
+
+def _sub(container, key):
+    """container[key] for dict values, None for anything else (e.g. an 'N/A' string)."""
+    return container.get(key) if isinstance(container, dict) else None
+
+
+@dataclass(slots=True)
+class CompanyRecord:
+    """
+    One company's Layer 1 data. Attribute names match the company_data keys,
+    so rule paths such as `metrics.employees` resolve directly; unknown keys
+    are kept in `extra`.
+    """
+    # Profile
+    name: str = None
+    foundedYear: int = None
+    geo: dict = None
+    domain: str = None
+    description: str = None
+    metrics: dict = None
+    social_media: dict = None
+    category: dict = None
+    business_model: str = None
+    revenue_model: str = None
+    pricing_model: str = None
+    revenue_stream_diversified: str = None
+    # Financials
+    total_funding: str = None
+    last_funding_round: str = None
+    valuation: str = None
+    revenue: str = None
+    profitability: str = None
+    key_investors: list = None
+    stage: str = None
+    aggregate_founder_shareholding: float = None
+    # Market
+    market_size: str = None
+    market_growth_rate: str = None
+    competitive_advantage: str = None
+    product_differentiation: str = None
+    innovative_solution: str = None
+    technology_stack: str = None
+    product_roadmap: str = None
+    competitors: list = None
+    patents: list = None
+    product_validation: str = None
+    # Team
+    founders_analysis: dict = None
+    key_hires: list = None
+    employee_growth_rate: str = None
+    glassdoor_rating: float = None
+    extra: dict = field(default_factory=dict)
+    # Normalized at ingestion
+    amounts: dict = field(default_factory=dict)
+    employee_count: float = None
+    total_funding_amount: float = None
+    valuation_amount: float = None
+    market_size_amount: float = None
+
+    @classmethod
+    def from_dict(cls, company_data):
+        """Builds the record from a merged company_data dict and normalizes its numeric fields."""
+        record = cls()
+        for key, value in company_data.items():
+            if key in SCHEMA_FIELDS:
+                setattr(record, key, value)
+            else:
+                record.extra[key] = value
+        record.normalize()
+        return record
+
+    def normalize(self):
+        """
+        Parses the numeric fields once. The `*_amount` attributes hold the value
+        the rules compare (the midpoint for ranges); `amounts` keeps the
+        ParsedAmount (low/high) per company_data path.
+        """
+        self.amounts = {}
+        for path, attribute in NORMALIZED_FIELDS.items():
+            value = self.get_path(path)
+            setattr(self, attribute, parse_numerical_value(value) if value else None)
+            amount = to_amount(value)
+            if amount is not None:
+                self.amounts[path] = amount
+
+    def to_dict(self):
+        """The company_data dict this record was built from (minus empty fields)."""
+        data = {key: getattr(self, key) for key in SCHEMA_FIELDS if getattr(self, key) is not None}
+        data.update(self.extra)
+        return data
+
+    def get(self, key, default=None):
+        """dict-style access by company_data key, so code written for dicts keeps working."""
+        if key in SCHEMA_FIELDS:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key)
+        return default if value is None else value
+
+    def get_path(self, path):
+        """Value at a dot-separated company_data path, or None."""
+        keys = path.split('.')
+        value = self.get(keys[0])
+        for key in keys[1:]:
+            value = _sub(value, key)
+        return value
+
+    # --- Display accessors (missing values read as 'N/A') ---
+    def text(self, key):
+        return self.get(key, NA)
+
+    def joined(self, key):
+        """A list field as 'a, b, c', or 'N/A' when empty."""
+        values = self.get(key)
+        return ', '.join(values) if values and isinstance(values, list) else NA
+
+    def _nested_text(self, container, key):
+        value = _sub(container, key)
+        return NA if value is None else value
+
+    @property
+    def city(self):
+        return self._nested_text(self.geo, 'city')
+
+    @property
+    def country(self):
+        return self._nested_text(self.geo, 'country')
+
+    @property
+    def address(self):
+        return self._nested_text(self.geo, 'address')
+
+    @property
+    def website_url(self):
+        domain = self.text('domain')
+        return f"https://{domain}" if domain != NA else '#'
+
+    @property
+    def employees(self):
+        return self._nested_text(self.metrics, 'employees')
+
+    @property
+    def sector(self):
+        return self._nested_text(self.category, 'sector')
+
+    @property
+    def sub_sector(self):
+        return self._nested_text(self.category, 'sub_sector')
+
+    @property
+    def industry(self):
+        return self._nested_text(self.category, 'industry')
+
+    @property
+    def activity(self):
+        return self._nested_text(self.category, 'activity')
+
+    @property
+    def social_links(self):
+        return self.social_media if isinstance(self.social_media, dict) else {}
+
+    @property
+    def founder_names(self):
+        names = _sub(self.founders_analysis, 'names_of_founders')
+        return names if isinstance(names, list) else []
+
+    def founder_detail(self, key):
+        return self._nested_text(self.founders_analysis, key)
+
+
+SCHEMA_FIELDS = frozenset(
+    f.name for f in fields(CompanyRecord)
+    if f.name not in ('extra', 'amounts') and f.name not in NORMALIZED_FIELDS.values()
+)
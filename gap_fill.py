@@ -0,0 +1,217 @@
+# gap_fill.py
+# Targeted follow-ups for Layer 1 fields that came back missing. The JSON
+# structures in the prompts.py section templates define the expected keys; a
+# validation pass finds those that are absent, "N/A" or malformed, and one
+# small prompt per section asks for just those keys. The fields the rules read
+# go first, and a budget caps the number of follow-ups and the time they may
+# take. async_api_calls.py runs the same plan on the event loop.
+import os
+import re
+import concurrent.futures
+from prompts import GAP_FILL_PROMPT_TEMPLATE
+from api_calls import COMPANY_DATA_SECTIONS, _make_perplexity_request, section_ttl
+from rules import RULES_PATH, CALCULATION_INPUTS, load_ruleset, _get_nested_value
+from normalize import to_amount
+
+DEFAULT_MAX_REQUESTS = 2
+DEFAULT_MAX_FIELDS = 6
+DEFAULT_TIMEOUT_SECONDS = 20
+
+# One key of a template's JSON structure: an object opening, a list, a string
+# or a bare value such as 2 or 20XX; or the end of an object.
+_TEMPLATE_TOKEN = re.compile(r'"(\w+)"\s*:\s*(\{\{|\[[^\]]*\]|"[^"]*"|[^,\n}]+)|(\}\})')
+
+# Answers that mean the model did not find the value.
+_NOT_FOUND = ("n/a", "na", "unknown", "not available", "not disclosed", "undisclosed", "not found", "not publicly")
+
+
+def template_schema(template):
+    """
+    {dotted key path: (kind, example)} for the JSON structure in a section
+    template, where kind is "text", "list" or "number". The example is the
+    template's own text for the value, still escaped for str.format.
+    """
+    schema, path = {}, []
+    for key, value, close in _TEMPLATE_TOKEN.findall(template[template.index("{{") + 2:]):
+        if close:
+            if path:
+                path.pop()
+        elif value == "{{":
+            path.append(key)
+        else:
+            value = " ".join(value.split())
+            kind = "list" if value.startswith("[") else "text" if value.startswith('"') else "number"
+            schema[".".join(path + [key])] = (kind, value)
+    return schema
+
+SECTION_SCHEMAS = {section: template_schema(template) for section, (template, _) in COMPANY_DATA_SECTIONS.items()}
+
+
+def is_missing(value, kind="text"):
+    """True for absent, empty and "N/A"-style values, and for numbers that do not parse."""
+    if value is None or value in ("", [], {}):
+        return True
+    if isinstance(value, list):
+        return all(is_missing(item) for item in value)
+    if isinstance(value, str):
+        text = value.strip().lower().rstrip(".")
+        if any(text == marker or text.startswith(marker + " ") for marker in _NOT_FOUND):
+            return True
+    return kind == "number" and to_amount(value) is None
+
+
+def missing_fields(company_data, rules_path=RULES_PATH):
+    """
+    {section: [dotted key paths]} of the expected keys that are missing from
+    company_data, in template order. A key under a parent that holds
+    something other than an object (e.g. "geo": "Berlin") is left alone, and
+    so is a key for which no answer is itself an answer (na_answer_fields).
+    """
+    answered = na_answer_fields(rules_path)
+    missing = {}
+    for section, schema in SECTION_SCHEMAS.items():
+        for path, (kind, _) in schema.items():
+            if path in answered:
+                continue
+            parents = path.split(".")[:-1]
+            if any(not isinstance(_get_nested_value(company_data, ".".join(parents[:depth + 1])), (dict, type(None)))
+                   for depth in range(len(parents))):
+                continue
+            if is_missing(_get_nested_value(company_data, path), kind):
+                missing.setdefault(section, []).append(path)
+    return missing
+
+
+def rule_fields(rules_path=RULES_PATH):
+    """The company_data key paths the rules read, calculation inputs included."""
+    fields = set()
+    for rule in load_ruleset(rules_path).rules:
+        if rule.field.startswith("calculated."):
+            fields.update(CALCULATION_INPUTS.get(rule.field.split(".")[1], ()))
+        else:
+            fields.add(rule.field)
+    return fields
+
+
+def na_answer_fields(rules_path=RULES_PATH):
+    """
+    Key paths a rule checks with is_empty_or_na. There "N/A" or "None" means
+    nothing was found (no red flags, say) and scores as such, so asking again
+    could only invent a value.
+    """
+    return {rule.field for rule in load_ruleset(rules_path).rules if rule.operator == "is_empty_or_na"}
+
+
+def gap_fill_limits():
+    """(max follow-up requests per report, max keys per request, seconds) from the environment."""
+    return (int(os.getenv("GAP_FILL_MAX_REQUESTS", DEFAULT_MAX_REQUESTS)),
+            int(os.getenv("GAP_FILL_MAX_FIELDS", DEFAULT_MAX_FIELDS)),
+            float(os.getenv("GAP_FILL_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS)))
+
+
+def plan_gap_fill(company_data, max_requests=None, max_fields=None, rules_path=RULES_PATH, sections=None):
+    """
+    Returns (requests, summary). Each request is (section, [key paths]); the
+    keys the rules read come first, and the sections with most of them are
+    asked first. Whatever does not fit `max_requests` x `max_fields` is listed
+    in summary['over_budget']. `sections` limits the plan to those sections.
+    """
+    default_requests, default_fields, _ = gap_fill_limits()
+    max_requests = default_requests if max_requests is None else max_requests
+    max_fields = default_fields if max_fields is None else max_fields
+    by_rules = rule_fields(rules_path)
+
+    missing = missing_fields(company_data, rules_path)
+    if sections is not None:
+        missing = {section: paths for section, paths in missing.items() if section in sections}
+    ranked = {section: sorted(paths, key=lambda path: path not in by_rules) for section, paths in missing.items()}
+    order = sorted(ranked, key=lambda section: (-sum(path in by_rules for path in ranked[section]), -len(ranked[section])))
+    requests = [(section, ranked[section][:max_fields]) for section in order[:max(max_requests, 0)] if max_fields > 0]
+    requested = {path for _, paths in requests for path in paths}
+
+    summary = {
+        'missing': [path for paths in missing.values() for path in paths],
+        'requested': [path for _, paths in requests for path in paths],
+        'over_budget': [path for paths in missing.values() for path in paths if path not in requested],
+        'filled': [],
+        'failed': {},
+    }
+    return requests, summary
+
+
+def gap_prompt(section, paths):
+    """The follow-up prompt template for `paths` of a section, with only those keys of its JSON structure."""
+    tree = {}
+    for path in paths:
+        *parents, leaf = path.split(".")
+        node = tree
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = SECTION_SCHEMAS[section][path][1]
+
+    def render(node, pad):
+        lines = [f'{pad}    "{key}": {render(value, pad + "    ") if isinstance(value, dict) else value}'
+                 for key, value in node.items()]
+        return "{{\n" + ",\n".join(lines) + "\n" + pad + "}}"
+
+    # The examples are already escaped for str.format, so the result is
+    # itself a template for _perplexity_messages to fill in.
+    return GAP_FILL_PROMPT_TEMPLATE.format(startup_name="{startup_name}", sector="{sector}", fields=render(tree, ""))
+
+
+def apply_gap_answers(company_data, requests, answers, summary):
+    """
+    Validates each section's answer against the requested keys and returns
+    summary with 'fields': the top-level company_data values to replace, with
+    the found keys merged in. Keys still missing in the answer are ignored.
+    `answers` maps sections to parsed responses, exceptions or None (timed out).
+    """
+    fields = {}
+    for section, paths in requests:
+        answer = answers.get(section)
+        if answer is None or isinstance(answer, Exception) or answer.get("error"):
+            summary['failed'][section] = ("timed out" if answer is None
+                                          else str(answer) if isinstance(answer, Exception) else answer["error"])
+            continue
+        for path in paths:
+            *parents, leaf = path.split(".")
+            value = _get_nested_value(answer, path)
+            if value is None and parents:
+                value = answer.get(leaf)  # the model flattened the structure
+            if is_missing(value, SECTION_SCHEMAS[section][path][0]):
+                continue
+            if not parents:
+                fields[leaf] = value
+            else:
+                top = parents[0]
+                node = fields.setdefault(top, dict(company_data.get(top) or {}))
+                for parent in parents[1:]:
+                    node[parent] = dict(node.get(parent) or {})
+                    node = node[parent]
+                node[leaf] = value
+            summary['filled'].append(path)
+    summary['fields'] = fields
+    return summary
+
+
+def fill_gaps(company_data, startup_name, sector, sections=None):
+    """
+    Asks Perplexity for the missing keys of company_data (of `sections`, if
+    given) within the budget and returns the summary from apply_gap_answers;
+    merge it with company_data.update(summary['fields']).
+    """
+    requests, summary = plan_gap_fill(company_data, sections=sections)
+    _, _, timeout = gap_fill_limits()
+    answers = {}
+    if requests:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(requests))
+        futures = {
+            executor.submit(_make_perplexity_request, gap_prompt(section, paths), startup_name, sector,
+                            ttl=section_ttl(section)): section
+            for section, paths in requests
+        }
+        done, _ = concurrent.futures.wait(futures, timeout=timeout)
+        for future in done:
+            answers[futures[future]] = future.exception() or future.result()
+        executor.shutdown(wait=False, cancel_futures=True)
+    return apply_gap_answers(company_data, requests, answers, summary)
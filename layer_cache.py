@@ -0,0 +1,170 @@
+# layer_cache.py
+# Reuses the output of a Groq analysis layer when its prompt inputs have not
+# changed. Each layer declares the exact values its prompt_context reads; the
+# key is a hash of those values, the prompt templates and the model, so a
+# change to any other company field, or a re-fetch that returns the same
+# facts, is served from the cache. Outputs are kept in memory and in SQLite,
+# so they survive restarts and are shared between processes.
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import asyncio
+import threading
+import functools
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "layers.sqlite3")
+DEFAULT_MAX_ENTRIES = 100_000
+MEMORY_ENTRIES = 256
+
+
+def layer_key(layer, version, inputs):
+    """A stable hash of a layer's prompt inputs (any JSON-able values) and its prompt version."""
+    payload = json.dumps([layer, version, inputs], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LayerCache:
+    """
+    Layer outputs by layer_key, with a small in-memory LRU in front of an
+    SQLite table. Entries do not expire: the same inputs and prompt give the
+    same analysis. Beyond `max_entries`, the least recently used are evicted.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, clock=time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS layer_outputs ("
+            "key TEXT PRIMARY KEY, layer TEXT NOT NULL, output TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_layer_outputs_last_access ON layer_outputs (last_access)")
+        self._conn.commit()
+
+    def _remember(self, key, output):
+        self._memory[key] = output
+        self._memory.move_to_end(key)
+        while len(self._memory) > MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def get(self, layer, key):
+        """A copy of the stored output, or None."""
+        with self._lock:
+            output = self._memory.get(key)
+            if output is None:
+                row = self._conn.execute("SELECT output FROM layer_outputs WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE layer_outputs SET last_access = ? WHERE key = ?", (self.clock(), key))
+                    self._conn.commit()
+                    output = row[0]
+            if output is None:
+                self.misses[layer] = self.misses.get(layer, 0) + 1
+                return None
+            self._remember(key, output)
+            self.hits[layer] = self.hits.get(layer, 0) + 1
+        return json.loads(output)
+
+    def set(self, layer, key, output):
+        value = json.dumps(output, ensure_ascii=False, default=str)
+        now = self.clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO layer_outputs (key, layer, output, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, layer, value, now, now),
+            )
+            self._remember(key, value)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        excess = self._conn.execute("SELECT COUNT(*) FROM layer_outputs").fetchone()[0] - self.max_entries
+        if excess > 0:
+            for (key,) in self._conn.execute(
+                    "SELECT key FROM layer_outputs ORDER BY last_access ASC LIMIT ?", (excess,)).fetchall():
+                self._conn.execute("DELETE FROM layer_outputs WHERE key = ?", (key,))
+                self._memory.pop(key, None)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM layer_outputs")
+            self._conn.commit()
+            self._memory.clear()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM layer_outputs").fetchone()[0]
+        return {"hits": dict(self.hits), "misses": dict(self.misses), "evictions": self.evictions, "entries": entries}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_layer_cache():
+    """
+    Returns the process-wide layer cache configured from the environment, or
+    None when LAYER_CACHE_DISABLED is set.
+    """
+    global _cache
+    if os.getenv("LAYER_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LayerCache(
+                path=os.getenv("LAYER_CACHE_PATH", DEFAULT_CACHE_PATH),
+                max_entries=int(os.getenv("LAYER_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            )
+        return _cache
+
+
+def cached_layer(layer, version, inputs):
+    """
+    Decorates a layer function (sync or async) so that it is skipped when a
+    stored output exists for `inputs(*args)`, the exact values its prompt
+    reads. Outputs with an "error" key are not stored.
+    """
+    def lookup(args):
+        cache = get_layer_cache()
+        if cache is None:
+            return None, None, None
+        key = layer_key(layer, version, inputs(*args))
+        return cache, key, cache.get(layer, key)
+
+    def store(cache, key, output):
+        if cache is not None and isinstance(output, dict) and "error" not in output:
+            cache.set(layer, key, output)
+
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_layer(*args):
+                cache, key, output = lookup(args)
+                if output is None:
+                    output = await func(*args)
+                    store(cache, key, output)
+                return output
+            return async_layer
+
+        @functools.wraps(func)
+        def sync_layer(*args):
+            cache, key, output = lookup(args)
+            if output is None:
+                output = func(*args)
+                store(cache, key, output)
+            return output
+        return sync_layer
+    return decorate
@@ -0,0 +1,98 @@
+# normalize.py
+# Turns the financial strings the models return ("$12.5M", "₹300 crore",
+# "45k", "$1-2B", "USD 1.2 billion") into numbers. Patterns are compiled once
+# and parsed strings are memoized, since the same values recur across rule
+# passes, re-renders and portfolio screens.
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Multiplier for every unit word or suffix that may follow a number.
+UNITS = {
+    'k': 1e3, 'thousand': 1e3,
+    'lakh': 1e5, 'lakhs': 1e5, 'lac': 1e5, 'lacs': 1e5,
+    'm': 1e6, 'mm': 1e6, 'mn': 1e6, 'million': 1e6, 'millions': 1e6,
+    'cr': 1e7, 'crore': 1e7, 'crores': 1e7,
+    'b': 1e9, 'bn': 1e9, 'billion': 1e9, 'billions': 1e9,
+    't': 1e12, 'tn': 1e12, 'trillion': 1e12, 'trillions': 1e12,
+}
+
+_UNIT = '(?:' + '|'.join(sorted(UNITS, key=len, reverse=True)) + ')(?![a-z])'
+_UNIT_RE = re.compile(_UNIT)
+# A number, optionally followed by unit words ("5 months" has no unit, "2.5 lakh crore" has two).
+_AMOUNT = rf'(\d+(?:\.\d+)?|\.\d+)(?:\s*({_UNIT}(?:\s*{_UNIT})*))?'
+_AMOUNT_RE = re.compile(_AMOUNT)
+# "1-2b", "$1m – $3m", "10 to 20 crore": a separator, then at most a currency marker.
+_RANGE_RE = re.compile(_AMOUNT + r'\s*(?:-|–|—|to)\s*(?:[^\w\s]{1,3}|usd|inr|rs\.?)?\s*' + _AMOUNT)
+_RANGE_SEPARATORS = ('-', '–', '—', ' to ')
+
+
+class ParsedAmount(NamedTuple):
+    """A parsed amount. Single values have low == high."""
+    low: float
+    high: float
+
+    @property
+    def mid(self):
+        return (self.low + self.high) / 2
+
+    @property
+    def is_range(self):
+        return self.low != self.high
+
+
+def _scaled(number, units):
+    if not units:
+        return float(number)
+    multiplier = UNITS.get(units)
+    if multiplier is None:  # stacked units, e.g. "lakh crore"
+        multiplier = 1
+        for unit in _UNIT_RE.findall(units):
+            multiplier *= UNITS[unit]
+    return float(number) * multiplier
+
+
+@lru_cache(maxsize=16384)
+def parse_amount(value_string):
+    """
+    Parses the first amount or range in a string. Returns a ParsedAmount, or
+    None for "N/A", empty strings and strings without a number. A range with
+    a unit only on its upper bound ("$1-2B") applies that unit to both ends.
+    """
+    text = value_string.lower().replace(",", "").strip()
+    if not text or "n/a" in text:
+        return None
+
+    amount = _AMOUNT_RE.search(text)
+    if not amount:
+        return None
+    bounds = None
+    if any(separator in text for separator in _RANGE_SEPARATORS):
+        bounds = _RANGE_RE.match(text, amount.start())
+    if bounds:
+        low_number, low_unit, high_number, high_unit = bounds.groups()
+        low = _scaled(low_number, low_unit or high_unit)
+        high = _scaled(high_number, high_unit)
+        return ParsedAmount(min(low, high), max(low, high))
+    value = _scaled(*amount.groups())
+    return ParsedAmount(value, value)
+
+
+def to_amount(value):
+    """ParsedAmount for a string or a plain number, None for anything else."""
+    if isinstance(value, str):
+        return parse_amount(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return ParsedAmount(value, value)
+    return None
+
+
+def parse_numerical_value(value_string):
+    """
+    Parses a string to extract a numerical value (the midpoint for ranges).
+    Non-strings are returned unchanged; "N/A" and unparseable strings give None.
+    """
+    if not isinstance(value_string, str):
+        return value_string
+    amount = parse_amount(value_string)
+    return amount.mid if amount else None
@@ -0,0 +1,55 @@
+# pages/1_Screening.py
+# Screening page: filters and sorts every company in the report store by its
+# numeric screening columns. Reads the store only; no API keys are needed.
+import time
+import streamlit as st
+from dotenv import load_dotenv
+from report_store import get_report_store, SCREENING_COLUMNS
+from screening import screen, parse_range
+
+PAGE_SIZE = 50
+
+load_dotenv()
+st.set_page_config(layout="wide", page_title="Screening")
+st.title("Portfolio Screening")
+
+report_store = get_report_store()
+if report_store is None:
+    st.info("The report store is disabled (REPORT_STORE_DISABLED), so there is nothing to screen.")
+    st.stop()
+
+st.sidebar.header("Filters")
+sector = st.sidebar.text_input("Sector", placeholder="e.g., Fintech")
+stage = st.sidebar.text_input("Stage", placeholder="e.g., Seed")
+name = st.sidebar.text_input("Company", placeholder="Company name starts with...")
+ranges = {}
+with st.sidebar.expander("Ranges", expanded=True):
+    st.caption("A range such as 5M-50M, an open range such as 2- or -0, or one value.")
+    for column, label in SCREENING_COLUMNS.items():
+        text = st.text_input(label, key=f"screening_{column}")
+        if text:
+            try:
+                ranges[column] = parse_range(text)
+            except ValueError as e:
+                st.error(f"{label}: {e}")
+sort_by = st.sidebar.selectbox("Sort by", list(SCREENING_COLUMNS), index=list(SCREENING_COLUMNS).index("positive_rules"),
+                               format_func=SCREENING_COLUMNS.get)
+descending = st.sidebar.checkbox("Highest first", value=True)
+
+start = time.perf_counter()
+total = screen(report_store, sector=sector, stage=stage, name=name, ranges=ranges, limit=0)[1]
+pages = max(1, -(-total // PAGE_SIZE))
+page = st.number_input("Page", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+rows, total = screen(report_store, sector=sector, stage=stage, name=name, ranges=ranges, sort_by=sort_by,
+                     descending=descending, limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE)
+elapsed = time.perf_counter() - start
+
+st.caption(f"{total:,} matching companies, page {page} of {pages} ({elapsed * 1e3:.0f} ms)")
+if rows:
+    st.dataframe(
+        [{"Company": row["startup_name"], "Sector": row["sector"], "Stage": row["stage"],
+          **{label: row[column] for column, label in SCREENING_COLUMNS.items()}} for row in rows],
+        hide_index=True, width="stretch",
+    )
+else:
+    st.info("No stored company matches these filters. Generate reports in the main app or with batch_screen.py.")
@@ -1,9 +1,12 @@
 import io
+from types import MappingProxyType
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
 from reportlab.lib.colors import navy, white, black, gray, red, green, orange
 from reportlab.lib.units import inch
+from company_record import CompanyRecord
+from report_document import build_report_document, FACT_SECTIONS
 
 class Line(Flowable):
     """Draws a horizontal line."""
@@ -14,47 +17,78 @@ class Line(Flowable):
     def draw(self):
         self.canv.line(0, self.height, self.width, self.height)
 
+def _build_styles():
+    """The report's paragraph styles, derived from ReportLab's sample sheet."""
+    styles = getSampleStyleSheet()
+
+    # Modify Title style
+    styles['Title'].fontName = 'Helvetica-Bold'
+    styles['Title'].fontSize = 24
+    styles['Title'].leading = 28
+    styles['Title'].textColor = navy
+    styles['Title'].alignment = TA_CENTER
+
+    # Modify Heading2 for MainSection
+    styles['h2'].fontName = 'Helvetica-Bold'
+    styles['h2'].fontSize = 16
+    styles['h2'].leading = 20
+    styles['h2'].textColor = navy
+
+    # Modify Heading3 for SubSection
+    styles['h3'].fontName = 'Helvetica-Bold'
+    styles['h3'].fontSize = 12
+    styles['h3'].leading = 16
+    styles['h3'].textColor = navy
+
+    # Modify BodyText
+    styles['BodyText'].fontName = 'Helvetica'
+    styles['BodyText'].fontSize = 10
+    styles['BodyText'].leading = 14
+
+    # Modify Bullet
+    styles['Bullet'].fontName = 'Helvetica'
+    styles['Bullet'].fontSize = 10
+    styles['Bullet'].leading = 14
+    styles['Bullet'].leftIndent = 18
+
+    # Add Key and Value styles
+    styles.add(ParagraphStyle(name='Key', fontName='Helvetica-Bold', fontSize=10, leading=12))
+    styles.add(ParagraphStyle(name='Value', fontName='Helvetica', fontSize=10, leading=12))
+
+    # Read-only name/alias -> style map shared by every PDFReport in the process.
+    registry = {name: styles[name] for name in styles.byName}
+    registry.update({alias: styles[alias] for alias in styles.byAlias})
+    return MappingProxyType(registry)
+
+# Built once per process: PDFReport instances only create their own document and story.
+STYLES = _build_styles()
+PAGE_SETUP = dict(pagesize=(8.5*inch, 11*inch), leftMargin=0.75*inch, rightMargin=0.75*inch,
+                  topMargin=0.75*inch, bottomMargin=0.75*inch)
+FACT_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ('LEFTPADDING', (0,0), (-1,-1), 0),
+    ('RIGHTPADDING', (0,0), (-1,-1), 0),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 2),
+    ('TOPPADDING', (0,0), (-1,-1), 2),
+])
+COLUMNS_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+])
+SCORECARD_STYLE_COMMANDS = (
+    ('BACKGROUND', (0,0), (-1,0), navy),
+    ('TEXTCOLOR', (0,0), (-1,0), white),
+    ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0,0), (-1,0), 12),
+    ('BACKGROUND', (0,1), (-1,-1), white),
+    ('GRID', (0,0), (-1,-1), 1, gray),
+)
+
 class PDFReport:
     def __init__(self, buffer=None):
         self.buffer = buffer if buffer else io.BytesIO()
-        self.doc = SimpleDocTemplate(self.buffer, pagesize=(8.5*inch, 11*inch),
-                                     leftMargin=0.75*inch, rightMargin=0.75*inch,
-                                     topMargin=0.75*inch, bottomMargin=0.75*inch)
-        self.styles = getSampleStyleSheet()
-        
-        # Modify Title style
-        self.styles['Title'].fontName = 'Helvetica-Bold'
-        self.styles['Title'].fontSize = 24
-        self.styles['Title'].leading = 28
-        self.styles['Title'].textColor = navy
-        self.styles['Title'].alignment = TA_CENTER
-
-        # Modify Heading2 for MainSection
-        self.styles['h2'].fontName = 'Helvetica-Bold'
-        self.styles['h2'].fontSize = 16
-        self.styles['h2'].leading = 20
-        self.styles['h2'].textColor = navy
-
-        # Modify Heading3 for SubSection
-        self.styles['h3'].fontName = 'Helvetica-Bold'
-        self.styles['h3'].fontSize = 12
-        self.styles['h3'].leading = 16
-        self.styles['h3'].textColor = navy
-
-        # Modify BodyText
-        self.styles['BodyText'].fontName = 'Helvetica'
-        self.styles['BodyText'].fontSize = 10
-        self.styles['BodyText'].leading = 14
-
-        # Modify Bullet
-        self.styles['Bullet'].fontName = 'Helvetica'
-        self.styles['Bullet'].fontSize = 10
-        self.styles['Bullet'].leading = 14
-        self.styles['Bullet'].leftIndent = 18
-
-        # Add Key and Value styles
-        self.styles.add(ParagraphStyle(name='Key', fontName='Helvetica-Bold', fontSize=10, leading=12))
-        self.styles.add(ParagraphStyle(name='Value', fontName='Helvetica', fontSize=10, leading=12))
+        self.doc = SimpleDocTemplate(self.buffer, **PAGE_SETUP)
+        self.styles = STYLES
 
     def _add_header(self, company_name):
         # Add logo placeholder
@@ -93,13 +127,7 @@ class PDFReport:
                 
                 if table_data:
                     table = Table(table_data, colWidths=[2*inch, 5*inch])
-                    table.setStyle(TableStyle([
-                        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                        ('LEFTPADDING', (0,0), (-1,-1), 0),
-                        ('RIGHTPADDING', (0,0), (-1,-1), 0),
-                        ('BOTTOMPADDING', (0,0), (-1,-1), 2),
-                        ('TOPPADDING', (0,0), (-1,-1), 2),
-                    ]))
+                    table.setStyle(FACT_TABLE_STYLE)
                     self.story.append(table)
             self.story.append(Spacer(1, 0.1*inch))
 
@@ -123,15 +151,7 @@ class PDFReport:
 
         table = Table(data, colWidths=[1.75*inch, 0.75*inch, 4.5*inch])
         
-        style = TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), navy),
-            ('TEXTCOLOR', (0,0), (-1,0), white),
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0,0), (-1,0), 12),
-            ('BACKGROUND', (0,1), (-1,-1), white),
-            ('GRID', (0,0), (-1,-1), 1, gray)
-        ])
+        style = TableStyle(SCORECARD_STYLE_COMMANDS)  # extended per row below, so not shared
         table.setStyle(style)
 
         for i, item in enumerate(rules_feedback, start=1):
@@ -177,178 +197,98 @@ class PDFReport:
             for key, value in product_analysis.items():
                 self._add_section(key.replace('_', ' ').title(), value, is_sub_section=True)
 
-    def _add_company_details(self, company_data):
+    def _fact_table(self, rows, col_widths):
+        table = Table(
+            [[Paragraph(f"<b>{label}:</b>", self.styles['Key']), Paragraph(value, self.styles['Value'])] for label, value in rows],
+            colWidths=col_widths,
+        )
+        table.setStyle(FACT_TABLE_STYLE)
+        return table
+
+    def _add_company_details(self, document):
         self._add_section("Company Overview")
 
         # Left column content
         left_column = []
-        geo = company_data.get('geo', {})
-        domain = company_data.get('domain', 'N/A')
-        website_url = f"https://{domain}" if domain != 'N/A' else '#'
-        
         left_column.append(Paragraph("<b>Company Details</b>", self.styles['h3']))
         left_column.append(Spacer(1, 0.1*inch))
-        company_details_data = [
-            [Paragraph("<b>Year Founded:</b>", self.styles['Key']), Paragraph(str(company_data.get('foundedYear', 'N/A')), self.styles['Value'])],
-            [Paragraph("<b>HQ Location:</b>", self.styles['Key']), Paragraph(f"{geo.get('city', 'N/A')}, {geo.get('country', 'N/A')}", self.styles['Value'])],
-            [Paragraph("<b>Website:</b>", self.styles['Key']), Paragraph(f"<link href='{website_url}'>{domain}</link>", self.styles['Value'])],
-            [Paragraph("<b>Team Strength:</b>", self.styles['Key']), Paragraph(f"{company_data.get('metrics', {}).get('employees', 'N/A')} employees", self.styles['Value'])],
-        ]
-        table = Table(company_details_data, colWidths=[1.5*inch, 2*inch])
-        table.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 2),
-            ('TOPPADDING', (0,0), (-1,-1), 2),
-        ]))
-        left_column.append(table)
-
+        left_column.append(self._fact_table([
+            ("Year Founded", str(document.year_founded)),
+            ("HQ Location", f"{document.city}, {document.country}"),
+            # ReportLab cannot resolve the '#' placeholder used when there is no domain.
+            ("Website", f"<link href='{document.website_url}'>{document.domain}</link>" if document.website_url != '#' else str(document.domain)),
+            ("Team Strength", f"{document.employees} employees"),
+        ], [1.5*inch, 2*inch]))
 
         left_column.append(Spacer(1, 0.2*inch))
-        
-        founders_analysis = company_data.get('founders_analysis', {})
-        if founders_analysis and founders_analysis.get('names_of_founders'):
+
+        if document.founder_names:
             left_column.append(Paragraph("<b>Founders</b>", self.styles['h3']))
             left_column.append(Spacer(1, 0.1*inch))
-            founders_content = [
-                [Paragraph("<b>Founder(s):</b>", self.styles['Key']), Paragraph(', '.join(founders_analysis.get('names_of_founders', [])), self.styles['Value'])],
-                [Paragraph("<b>Complementarity:</b>", self.styles['Key']), Paragraph(founders_analysis.get('complementarity', 'N/A'), self.styles['Value'])],
-                [Paragraph("<b>Key Competency:</b>", self.styles['Key']), Paragraph(founders_analysis.get('key_competency', 'N/A'), self.styles['Value'])],
-                [Paragraph("<b>Prior Experience:</b>", self.styles['Key']), Paragraph(founders_analysis.get('prior_startup_experience', 'N/A'), self.styles['Value'])],
-                [Paragraph("<b>Red Flags:</b>", self.styles['Key']), Paragraph(founders_analysis.get('red_flags', 'N/A'), self.styles['Value'])],
-            ]
-            table = Table(founders_content, colWidths=[1.5*inch, 2*inch])
-            table.setStyle(TableStyle([
-                ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                ('LEFTPADDING', (0,0), (-1,-1), 0),
-                ('RIGHTPADDING', (0,0), (-1,-1), 0),
-                ('BOTTOMPADDING', (0,0), (-1,-1), 2),
-                ('TOPPADDING', (0,0), (-1,-1), 2),
-            ]))
-            left_column.append(table)
+            founders_content = [("Founder(s)", ', '.join(document.founder_names))] + document.founder_details
+            left_column.append(self._fact_table(founders_content, [1.5*inch, 2*inch]))
 
         # Right column content
         right_column = []
-        key_investors = company_data.get('key_investors', [])
-        if key_investors:
+        if document.key_investors:
             right_column.append(Paragraph("<b>Key Investors</b>", self.styles['h3']))
             right_column.append(Spacer(1, 0.1*inch))
-            for investor in key_investors:
+            for investor in document.key_investors:
                 right_column.append(Paragraph(f"• {investor}", self.styles['Bullet']))
                 right_column.append(Spacer(1, 0.05*inch))
 
         # Create table with two columns
         table_data = [[left_column, right_column]]
         table = Table(table_data, colWidths=[4*inch, 3*inch])
-        table.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ]))
-        self.story.append(table)
-
-    def _add_business_details(self, company_data):
-        # Sector & Activity
-        category = company_data.get('category', {})
-        sector_activity_data = {
-            "Sector": category.get('sector', 'N/A'),
-            "Sub-sector": category.get('sub_sector', 'N/A'),
-            "Industry": category.get('industry', 'N/A'),
-            "Activity": category.get('activity', 'N/A'),
-        }
-        self._add_section("Sector & Activity", sector_activity_data, is_sub_section=True)
-
-        # Business & Revenue
-        business_revenue_data = {
-            "Business Model": company_data.get('business_model', 'N/A'),
-            "Revenue Model": company_data.get('revenue_model', 'N/A'),
-            "Pricing Model": company_data.get('pricing_model', 'N/A'),
-            "Revenue Stream Diversified": company_data.get('revenue_stream_diversified', 'N/A'),
-        }
-        self._add_section("Business & Revenue", business_revenue_data, is_sub_section=True)
-
-    def _add_financial_details(self, company_data):
-        self._add_section("Financials", is_sub_section=True)
-        financials_data = [
-            [Paragraph("<b>Total Funding:</b>", self.styles['Key']), Paragraph(company_data.get('total_funding', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Last Funding Round:</b>", self.styles['Key']), Paragraph(company_data.get('last_funding_round', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Valuation:</b>", self.styles['Key']), Paragraph(company_data.get('valuation', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Revenue:</b>", self.styles['Key']), Paragraph(company_data.get('revenue', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Profitability:</b>", self.styles['Key']), Paragraph(company_data.get('profitability', 'N/A'), self.styles['Value'])],
-        ]
-        table = Table(financials_data, colWidths=[2*inch, 5*inch])
-        table.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 2),
-            ('TOPPADDING', (0,0), (-1,-1), 2),
-        ]))
+        table.setStyle(COLUMNS_TABLE_STYLE)
         self.story.append(table)
 
-    def _add_market_and_product_details(self, company_data):
-        self._add_section("Market & Competition", is_sub_section=True)
-        market_competition_data = [
-            [Paragraph("<b>Market Size:</b>", self.styles['Key']), Paragraph(company_data.get('market_size', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Market Growth Rate:</b>", self.styles['Key']), Paragraph(company_data.get('market_growth_rate', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Competitive Advantage:</b>", self.styles['Key']), Paragraph(company_data.get('competitive_advantage', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Competitors:</b>", self.styles['Key']), Paragraph(", ".join(company_data.get('competitors', []) if company_data.get('competitors') else ['N/A']), self.styles['Value'])],
-        ]
-        table = Table(market_competition_data, colWidths=[2*inch, 5*inch])
-        table.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 2),
-            ('TOPPADDING', (0,0), (-1,-1), 2),
-        ]))
-        self.story.append(table)
+    def _add_business_details(self, document):
+        self._add_section("Sector & Activity", dict(document.sector_activity), is_sub_section=True)
+        self._add_section(FACT_SECTIONS['business_revenue'][0], dict(document.facts['business_revenue']), is_sub_section=True)
 
-        self._add_section("Product & Technology", is_sub_section=True)
-        product_technology_data = [
-            [Paragraph("<b>Product Differentiation:</b>", self.styles['Key']), Paragraph(company_data.get('product_differentiation', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Innovative Solution:</b>", self.styles['Key']), Paragraph(company_data.get('innovative_solution', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Patents:</b>", self.styles['Key']), Paragraph(", ".join(company_data.get('patents', []) if company_data.get('patents') else ['N/A']), self.styles['Value'])],
-            [Paragraph("<b>Product Validation:</b>", self.styles['Key']), Paragraph(company_data.get('product_validation', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Technology Stack:</b>", self.styles['Key']), Paragraph(company_data.get('technology_stack', 'N/A'), self.styles['Value'])],
-            [Paragraph("<b>Product Roadmap:</b>", self.styles['Key']), Paragraph(company_data.get('product_roadmap', 'N/A'), self.styles['Value'])],
-        ]
-        table = Table(product_technology_data, colWidths=[2*inch, 5*inch])
-        table.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 2),
-            ('TOPPADDING', (0,0), (-1,-1), 2),
-        ]))
-        self.story.append(table)
+    def _add_financial_and_market_details(self, document):
+        for section in ('financials', 'market_competition', 'product_technology'):
+            self._add_section(FACT_SECTIONS[section][0], is_sub_section=True)
+            self.story.append(self._fact_table(document.facts[section], [2*inch, 5*inch]))
 
     def generate(self, startup_name, company_data, llm_analysis, rules_feedback, investment_thesis, founders_analysis, product_analysis):
+        """Builds the PDF for one company; see render() to reuse an already built ReportDocument."""
+        document = build_report_document({
+            'company_record': company_data if isinstance(company_data, CompanyRecord) else None,
+            'company_data': company_data, 'startup_name': startup_name, 'llm_analysis': llm_analysis,
+            'rules_feedback': rules_feedback, 'investment_thesis': investment_thesis,
+            'founders_analysis': founders_analysis, 'product_analysis': product_analysis,
+        })
+        return self.render(document)
+
+    def render(self, document):
+        """Renders a ReportDocument and returns the PDF bytes."""
         self.story = []
-        self._add_header(company_data.get('name', startup_name))
+        self._add_header(document.name)
 
         # Page 1: Company Overview
-        self._add_company_details(company_data)
-        self._add_business_details(company_data)
-        self._add_financial_details(company_data)
-        self._add_market_and_product_details(company_data)
+        self._add_company_details(document)
+        self._add_business_details(document)
+        self._add_financial_and_market_details(document)
 
         # Page 2: Founder Analysis
-        self._add_founder_analysis(founders_analysis)
+        self._add_founder_analysis(document.founders_analysis)
 
         # Page 3: Product Analysis
-        self._add_product_analysis(product_analysis)
+        self._add_product_analysis(document.product_analysis)
 
         # Page 4: AI Analysis
-        self._add_llm_analysis(llm_analysis)
+        self._add_llm_analysis(document.llm_analysis)
 
         # Page 5: Investment Thesis and Scorecard
-        self._add_investment_thesis(investment_thesis)
-        if rules_feedback:
+        self._add_investment_thesis(document.investment_thesis)
+        if document.rules_feedback:
             self._add_section("Investment Fit Scorecard")
-            self._create_scorecard_table(rules_feedback)
+            self._create_scorecard_table(document.rules_feedback)
 
         # Build the PDF
         self.doc.build(self.story)
         pdf_value = self.buffer.getvalue()
         self.buffer.close()
-        return pdf_value
\ No newline at end of file
+        return pdf_value
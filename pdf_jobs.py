@@ -0,0 +1,90 @@
+# pdf_jobs.py
+# Renders report PDFs on a background thread. A job is started as soon as a
+# report's data is final and is keyed by the report's content hash, so the
+# interactive report never waits on ReportLab and every rerun, session or
+# sector change that lands on the same content reuses the same bytes.
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pdf_generator import PDFReport
+from report_document import build_report_document, report_key
+
+MAX_WORKERS = 2
+MAX_JOBS = 32  # finished PDFs kept in memory, oldest dropped first
+WAIT_SECONDS = 120  # how long the download fragment waits for a render
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="pdf-render")
+_jobs = OrderedDict()
+_lock = threading.Lock()
+
+
+class PDFJob:
+    """One background render. `pdf` is None until it has finished."""
+    def __init__(self, key):
+        self.key = key
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.pdf = None
+        self.error = None
+        self.future = None
+        self._finished = threading.Event()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    @property
+    def render_seconds(self):
+        return self.finished_at - self.started_at if self.done and self.started_at else None
+
+    @property
+    def size(self):
+        return len(self.pdf) if self.pdf is not None else None
+
+    def wait(self, timeout=None):
+        """Blocks until the render has finished or `timeout` seconds have passed; returns whether it finished."""
+        self._finished.wait(timeout)
+        return self.done
+
+    def run(self, report_data, log):
+        self.started_at = time.perf_counter()
+        try:
+            self.pdf = PDFReport().render(build_report_document(report_data))
+        except Exception as e:
+            self.error = f"PDF rendering failed: {e}"
+            print(f"!!! {self.error}")
+        finally:
+            self.finished_at = time.perf_counter()
+            self._finished.set()
+        if log and self.pdf is not None:
+            print(f"\n--- PDF RENDER ---\n{report_data.get('startup_name', 'N/A')}: "
+                  f"{self.render_seconds:.2f}s, {self.size / 1024:.1f} KiB "
+                  f"(queued {self.started_at - self.submitted_at:.2f}s)")
+
+
+def submit_pdf(report_data, log=False):
+    """
+    Starts rendering the PDF for report_data in the background (once per
+    content hash) and returns its PDFJob. The report is copied, so later
+    changes to the session's report_data do not leak into the render.
+    """
+    key = report_key(report_data)
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None and job.error is None:
+            _jobs.move_to_end(key)
+            return job
+        job = PDFJob(key)
+        _jobs[key] = job
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+    job.future = _executor.submit(job.run, dict(report_data), log)
+    return job
+
+
+def get_pdf_job(report_data):
+    """The PDFJob for report_data's current content, or None if none was started."""
+    with _lock:
+        return _jobs.get(report_key(report_data))
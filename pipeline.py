@@ -0,0 +1,237 @@
+# pipeline.py
+import time
+import asyncio
+import inspect
+import concurrent.futures
+
+
+class Node:
+    """A single pipeline step: a callable plus the context keys it reads and writes."""
+    def __init__(self, name, func, inputs=(), outputs=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs) if outputs else (name,)
+
+
+class PipelineResult:
+    """Everything a pipeline run produced, including partial results after failures."""
+    def __init__(self):
+        self.context = {}
+        self.results = {}
+        self.timings = {}
+        self.errors = {}
+        self.skipped = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return not self.errors and not self.skipped
+
+
+class _GraphBase:
+    """Node registration, validation and bookkeeping shared by both executors."""
+    def __init__(self):
+        self.nodes = {}
+
+    def add(self, name, func, inputs=(), outputs=None):
+        if name in self.nodes:
+            raise ValueError(f"Duplicate pipeline node: {name}")
+        self.nodes[name] = Node(name, func, inputs, outputs)
+        return self
+
+    def _producers(self):
+        producers = {}
+        for node in self.nodes.values():
+            for key in node.outputs:
+                if key in producers:
+                    raise ValueError(f"Key '{key}' is produced by both '{producers[key]}' and '{node.name}'.")
+                producers[key] = node.name
+        return producers
+
+    def _validate(self, initial_keys):
+        """Checks that every input can be satisfied and that the graph has no cycles."""
+        producers = self._producers()
+        for node in self.nodes.values():
+            for key in node.inputs:
+                if key not in producers and key not in initial_keys:
+                    raise ValueError(f"Node '{node.name}' needs '{key}', which nothing produces.")
+
+        # Kahn's algorithm over node -> node edges
+        in_degree = {name: 0 for name in self.nodes}
+        dependents = {name: set() for name in self.nodes}
+        for node in self.nodes.values():
+            upstream = {producers[key] for key in node.inputs if key in producers and key not in initial_keys}
+            in_degree[node.name] = len(upstream)
+            for parent in upstream:
+                dependents[parent].add(node.name)
+
+        ready = [name for name, degree in in_degree.items() if degree == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for child in dependents[name]:
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    ready.append(child)
+        if visited != len(self.nodes):
+            raise ValueError("Pipeline contains a dependency cycle.")
+        return producers
+
+    def _store_outputs(self, node, value, result):
+        result.results[node.name] = value
+        if len(node.outputs) == 1:
+            result.context[node.outputs[0]] = value
+        elif isinstance(value, dict):
+            for key in node.outputs:
+                if key in value:
+                    result.context[key] = value[key]
+
+    def _next_ready(self, pending, result, settled, failed_keys):
+        """
+        Pops every pending node that can start now. Nodes downstream of a failure
+        are marked as skipped instead, and their outputs count as failed too.
+        """
+        ready = []
+        for name, node in list(pending.items()):
+            if any(key in failed_keys for key in node.inputs):
+                del pending[name]
+                result.skipped.append(name)
+                failed_keys.update(node.outputs)
+                settled.update(node.outputs)
+            elif all(key in settled for key in node.inputs):
+                del pending[name]
+                ready.append((node, [result.context.get(key) for key in node.inputs]))
+        return ready
+
+    def _finish(self, node, value, elapsed, exc, result, settled, failed_keys):
+        result.timings[node.name] = elapsed
+        if exc is not None:
+            print(f"!!! Pipeline node '{node.name}' failed: {exc}")
+            result.errors[node.name] = str(exc)
+            failed_keys.update(node.outputs)
+        else:
+            self._store_outputs(node, value, result)
+        settled.update(node.outputs)
+
+
+class Pipeline(_GraphBase):
+    """
+    A small dependency-graph executor. Each node declares the context keys it
+    needs and the keys it produces; nodes whose inputs are ready run concurrently
+    on a thread pool, so wall-clock time follows the longest dependency path.
+    """
+    def __init__(self, max_workers=None, initializer=None):
+        super().__init__()
+        self.max_workers = max_workers
+        self.initializer = initializer
+
+    @staticmethod
+    def _timed_call(func, args):
+        start = time.perf_counter()
+        try:
+            return func(*args), time.perf_counter() - start, None
+        except Exception as exc:
+            return None, time.perf_counter() - start, exc
+
+    def run(self, initial=None, on_node_done=None):
+        """
+        Runs every node once and returns a PipelineResult. A node that raises is
+        recorded in `errors`; nodes downstream of it are listed in `skipped`, and
+        everything else still completes. `on_node_done(name, result)` is called
+        from the calling thread as each node finishes.
+        """
+        initial = dict(initial or {})
+        self._validate(set(initial))
+
+        result = PipelineResult()
+        result.context.update(initial)
+        settled = set(initial)
+        failed_keys = set()
+        pending = dict(self.nodes)
+        start = time.perf_counter()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, initializer=self.initializer) as executor:
+            running = {}
+            while pending or running:
+                for node, args in self._next_ready(pending, result, settled, failed_keys):
+                    running[executor.submit(self._timed_call, node.func, args)] = node
+
+                if not running:
+                    # Only skipped nodes remained; loop again to drain them.
+                    continue
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    value, elapsed, exc = future.result()
+                    self._finish(node, value, elapsed, exc, result, settled, failed_keys)
+                    if on_node_done:
+                        on_node_done(node.name, result)
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
+
+class AsyncPipeline(_GraphBase):
+    """
+    The asyncio counterpart of Pipeline: same nodes and results, but node
+    functions may be coroutines and everything runs as tasks on the current
+    event loop instead of on a thread pool. Plain functions run inline, so they
+    should be cheap (e.g. the rules pass).
+    """
+    def __init__(self, max_concurrency=None):
+        super().__init__()
+        self.max_concurrency = max_concurrency
+
+    @staticmethod
+    async def _call(func, args):
+        value = func(*args)
+        if inspect.isawaitable(value):
+            value = await value
+        return value
+
+    async def _timed_call(self, func, args, semaphore):
+        start = time.perf_counter()
+        try:
+            if semaphore:
+                async with semaphore:
+                    value = await self._call(func, args)
+            else:
+                value = await self._call(func, args)
+            return value, time.perf_counter() - start, None
+        except Exception as exc:
+            return None, time.perf_counter() - start, exc
+
+    async def run(self, initial=None, on_node_done=None):
+        """Coroutine version of Pipeline.run with the same failure semantics."""
+        initial = dict(initial or {})
+        self._validate(set(initial))
+
+        result = PipelineResult()
+        result.context.update(initial)
+        settled = set(initial)
+        failed_keys = set()
+        pending = dict(self.nodes)
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        start = time.perf_counter()
+
+        running = {}
+        while pending or running:
+            for node, args in self._next_ready(pending, result, settled, failed_keys):
+                running[asyncio.ensure_future(self._timed_call(node.func, args, semaphore))] = node
+
+            if not running:
+                continue
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = running.pop(task)
+                value, elapsed, exc = task.result()
+                self._finish(node, value, elapsed, exc, result, settled, failed_keys)
+                if on_node_done:
+                    on_node_done(node.name, result)
+
+        result.elapsed = time.perf_counter() - start
+        return result
@@ -0,0 +1,279 @@
+# portfolio_book.py
+# One combined PDF ("portfolio book") of many investment memos, e.g. for an IC
+# meeting. Memos are laid out in a process pool, each written to its own
+# temporary file; the parent copies them into the output file one at a time,
+# in input order, and finishes with a table of contents, bookmarks and the
+# page tree. Only one memo is held in memory at a time, so memory stays flat
+# however many companies the book holds.
+#
+#   python portfolio_book.py screening_results.jsonl -o portfolio_book.pdf --workers 4
+import io
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+from reportlab.lib.units import inch
+from pdf_generator import PDFReport, STYLES, PAGE_SETUP, FACT_TABLE_STYLE
+from report_document import build_report_document
+from batch_screen import _succeeded
+
+
+def read_reports(path):
+    """Yields the report_data dicts of a batch_screen.py output file, skipping failed companies."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                report = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if _succeeded(report):
+                yield report
+
+
+# --- Rendering (runs in the worker processes) ---
+def _render_part(task):
+    """Renders one memo to a file in `directory`. Returns (name, path, error)."""
+    index, report_data, directory = task
+    name = report_data.get('company_data', {}).get('name') or report_data.get('startup_name', 'N/A')
+    try:
+        pdf = PDFReport().render(build_report_document(report_data))
+    except Exception as e:
+        return name, None, str(e)
+    path = os.path.join(directory, f"{index:06d}.pdf")
+    with open(path, 'wb') as f:
+        f.write(pdf)
+    return name, path, None
+
+
+def _ordered(executor, func, tasks, window):
+    """executor.map with at most `window` tasks in flight, so inputs are read lazily."""
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(func, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# --- Stitching ReportLab PDFs ---
+# The parts are our own ReportLab output: one xref section, no object streams,
+# direct /Length values and parenthesised strings with escaped parentheses.
+_XREF = re.compile(rb'xref\s+0 (\d+)\s+')
+_XREF_ENTRY = re.compile(rb'(\d{10}) \d{5} ([nf])')
+_OBJECT = re.compile(rb'\d+ 0 obj\s*(.*?)\s*endobj\s*\Z', re.S)
+_STREAM = re.compile(rb'>>\s*stream\r?\n')
+_STRING_OR_REF = re.compile(rb'\((?:\\.|[^\\()])*\)|(\d+) 0 R')
+_REF = re.compile(rb'(\d+) 0 R')
+
+
+def _trailer_ref(trailer, key):
+    match = re.search(rb'/' + key + rb' (\d+) 0 R', trailer)
+    return int(match.group(1)) if match else None
+
+
+def read_pdf_part(data):
+    """
+    Splits a ReportLab PDF into its objects. Returns (objects, skipped, pages)
+    where `objects` maps object numbers to their bodies, `skipped` holds the
+    catalog, info and page-tree nodes a book replaces with its own, and
+    `pages` lists the page objects in reading order.
+    """
+    xref_at = data.rindex(b'\nxref') + 1
+    header = _XREF.match(data, xref_at)
+    entries = _XREF_ENTRY.findall(data, header.end())[:int(header.group(1))]
+    located = sorted((int(offset), number) for number, (offset, kind) in enumerate(entries) if kind == b'n')
+    objects = {}
+    for i, (offset, number) in enumerate(located):
+        end = located[i + 1][0] if i + 1 < len(located) else xref_at
+        objects[number] = _OBJECT.match(data, offset, end).group(1)
+
+    trailer = data[xref_at:]
+    catalog = _trailer_ref(trailer, b'Root')
+    skipped = {catalog, _trailer_ref(trailer, b'Info')}
+    pages = []
+
+    def walk(number):
+        body = objects[number]
+        if re.search(rb'/Type /Pages\b', body):
+            skipped.add(number)
+            kids = re.search(rb'/Kids\s*\[([^\]]*)\]', body).group(1)
+            for kid in _REF.findall(kids):
+                walk(int(kid))
+        else:
+            pages.append(number)
+
+    walk(int(re.search(rb'/Pages (\d+) 0 R', objects[catalog]).group(1)))
+    return objects, skipped, pages
+
+
+def _pdf_text(text):
+    """A PDF text string for any unicode text (UTF-16BE with a byte-order mark)."""
+    return b'<FEFF' + text.encode('utf-16-be').hex().upper().encode('ascii') + b'>'
+
+
+class BookWriter:
+    """Streams parts into one PDF file; the page tree and outline are written by finish()."""
+    CATALOG, PAGES, OUTLINES, INFO = 1, 2, 3, 4
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = {}
+        self.next_number = 5
+        f.write(b'%PDF-1.4\n%\x93\x8c\x8b\x9e\n')
+
+    def _allocate(self):
+        number = self.next_number
+        self.next_number += 1
+        return number
+
+    def _write_object(self, number, body):
+        self.offsets[number] = self.f.tell()
+        self.f.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+
+    def add_part(self, data):
+        """Copies a ReportLab PDF's objects into the book. Returns its page object numbers."""
+        objects, skipped, pages = read_pdf_part(data)
+        mapping = {number: self.PAGES for number in skipped}
+        for number in objects:
+            if number not in skipped:
+                mapping[number] = self._allocate()
+
+        def renumber(match):
+            if match.group(1) is None:
+                return match.group(0)
+            return b'%d 0 R' % mapping[int(match.group(1))]
+
+        for number, body in objects.items():
+            if number in skipped:
+                continue
+            stream = _STREAM.search(body)
+            head, tail = (body[:stream.end()], body[stream.end():]) if stream else (body, b'')
+            self._write_object(mapping[number], _STRING_OR_REF.sub(renumber, head) + tail)
+        return [mapping[number] for number in pages]
+
+    def finish(self, pages, bookmarks, title):
+        """Writes the page tree, the (title, page object) bookmarks, catalog, info and xref."""
+        kids = b' '.join(b'%d 0 R' % page for page in pages)
+        self._write_object(self.PAGES, b'<< /Type /Pages /Count %d /Kids [ %s ] >>' % (len(pages), kids))
+
+        items = [self._allocate() for _ in bookmarks]
+        for i, ((text, page), number) in enumerate(zip(bookmarks, items)):
+            links = b''
+            if i > 0:
+                links += b' /Prev %d 0 R' % items[i - 1]
+            if i + 1 < len(items):
+                links += b' /Next %d 0 R' % items[i + 1]
+            self._write_object(number, b'<< /Title %s /Parent %d 0 R /Dest [ %d 0 R /Fit ]%s >>'
+                               % (_pdf_text(text), self.OUTLINES, page, links))
+        if items:
+            self._write_object(self.OUTLINES, b'<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>'
+                               % (items[0], items[-1], len(items)))
+        else:
+            self._write_object(self.OUTLINES, b'<< /Type /Outlines /Count 0 >>')
+        self._write_object(self.CATALOG, b'<< /Type /Catalog /Pages %d 0 R /Outlines %d 0 R /PageMode /UseOutlines >>'
+                           % (self.PAGES, self.OUTLINES))
+        self._write_object(self.INFO, b'<< /Title %s /Producer (portfolio_book.py) >>' % _pdf_text(title))
+
+        xref_at = self.f.tell()
+        self.f.write(b'xref\n0 %d\n0000000000 65535 f \n' % self.next_number)
+        for number in range(1, self.next_number):
+            self.f.write(b'%010d 00000 n \n' % self.offsets[number])
+        self.f.write(b'trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                     % (self.next_number, self.CATALOG, self.INFO, xref_at))
+
+
+def render_table_of_contents(title, entries, first_page):
+    """The contents pages: one row per (company, page offset in the memos), numbered from `first_page`."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, **PAGE_SETUP)
+    rows = [[Paragraph("<b>Company</b>", STYLES['Key']), Paragraph("<b>Page</b>", STYLES['Key'])]]
+    for name, offset in entries:
+        rows.append([Paragraph(str(name), STYLES['Value']), Paragraph(str(first_page + offset), STYLES['Value'])])
+    table = Table(rows, colWidths=[6*inch, 1*inch], repeatRows=1)
+    table.setStyle(FACT_TABLE_STYLE)
+    story = [
+        Paragraph(title, STYLES['Title']),
+        Spacer(1, 0.2*inch),
+        Paragraph(f"{len(entries)} companies", STYLES['BodyText']),
+        Spacer(1, 0.2*inch),
+        Paragraph("Contents", STYLES['h2']),
+        Spacer(1, 0.1*inch),
+        table,
+    ]
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def build_book(reports, output_path, workers=None, title="Portfolio Book"):
+    """
+    Renders every report_data in `reports` (any iterable, read lazily) into one
+    PDF at `output_path`. Memos that fail to render are left out and reported.
+    Returns a summary dict.
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    entries, bookmarks, body_pages, failed = [], [], [], []
+
+    with tempfile.TemporaryDirectory(prefix="portfolio_book_") as directory, \
+            open(output_path, 'wb') as f, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = BookWriter(f)
+        tasks = ((index, report, directory) for index, report in enumerate(reports))
+        for name, path, error in _ordered(executor, _render_part, tasks, window=workers * 2):
+            if error:
+                print(f"!!! Skipping {name}: {error}")
+                failed.append((name, error))
+                continue
+            with open(path, 'rb') as part:
+                pages = writer.add_part(part.read())
+            os.remove(path)
+            entries.append((name, len(body_pages)))
+            bookmarks.append((name, pages[0]))
+            body_pages.extend(pages)
+
+        # The contents' own length decides the memos' page numbers: re-render until it is stable.
+        toc_pages = 1
+        while True:
+            toc = render_table_of_contents(title, entries, toc_pages + 1)
+            rendered_pages = len(read_pdf_part(toc)[2])
+            if rendered_pages == toc_pages:
+                break
+            toc_pages = rendered_pages
+        contents = writer.add_part(toc)
+        writer.finish(contents + body_pages, [("Contents", contents[0])] + bookmarks, title)
+        size = f.tell()
+
+    return {
+        'companies': len(entries),
+        'failed': failed,
+        'pages': len(contents) + len(body_pages),
+        'bytes': size,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Combine many investment memos into one PDF with a table of contents.")
+    parser.add_argument("input", help="JSONL file written by batch_screen.py")
+    parser.add_argument("-o", "--output", default="portfolio_book.pdf", help="PDF file to write")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="rendering processes (default: CPU count)")
+    parser.add_argument("--title", default="Portfolio Book", help="title on the contents page")
+    args = parser.parse_args(argv)
+
+    summary = build_book(read_reports(args.input), args.output, args.workers, args.title)
+    print(f"Wrote {summary['companies']} memos ({summary['pages']} pages, {summary['bytes'] / 1024:.0f} KiB) "
+          f"in {summary['elapsed']:.1f}s -> {args.output}")
+    if summary['failed']:
+        print(f"{len(summary['failed'])} memos could not be rendered.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
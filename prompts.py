@@ -113,6 +113,16 @@ Return the data in a JSON object with the following structure:
 }}
 """
 
+# Follow-up for the keys a section prompt above returned as "N/A". {fields} is
+# the matching part of that section's JSON structure (see gap_fill.py).
+GAP_FILL_PROMPT_TEMPLATE = """**CRITICAL:** Your entire response must be a single, valid JSON object. Do not include any text, titles, or markdown before or after the JSON.
+
+An earlier search could not find the details below for the startup "{startup_name}" in the {sector} sector. Search specifically for them in funding announcements, news articles, the company's own pages and review sites.
+
+Return only these keys, in a JSON object with the following structure:
+{fields}
+"""
+
 # Prompts for the second layer of AI analysis (Groq)
 # These prompts are more open-ended and are designed for a more powerful model.
 # They are generally well-structured, so we will keep them as they are.
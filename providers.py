@@ -0,0 +1,140 @@
+# providers.py
+import os
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from groq import Groq, AsyncGroq
+
+DEFAULT_PERPLEXITY_POOL_SIZE = 10
+DEFAULT_GROQ_MAX_CONNECTIONS = 20
+
+_lock = threading.Lock()
+_perplexity_session = None
+_groq_client = None
+_groq_stats = {"requests": 0, "connections_opened": 0, "pool_size": None}
+_perplexity_pool_size = None
+_async_perplexity_client = None
+_async_groq_client = None
+_async_perplexity_stats = {"requests": 0, "connections_opened": 0}
+
+
+def _pool_size(env_var, default):
+    try:
+        return max(1, int(os.getenv(env_var, default)))
+    except ValueError:
+        return default
+
+
+def get_perplexity_session():
+    """
+    Returns the process-wide keep-alive session used for Perplexity requests, so
+    concurrent section prompts reuse pooled TLS connections instead of opening
+    a fresh one per call.
+    """
+    global _perplexity_session, _perplexity_pool_size
+    with _lock:
+        if _perplexity_session is None:
+            pool_size = _pool_size("PERPLEXITY_POOL_SIZE", DEFAULT_PERPLEXITY_POOL_SIZE)
+            _perplexity_pool_size = pool_size
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+            session.mount("https://", adapter)
+            session.headers.update({"accept": "application/json", "content-type": "application/json"})
+            _perplexity_session = session
+        return _perplexity_session
+
+
+def _trace_connections(event_name, info):
+    if event_name == "connection.connect_tcp.started":
+        with _lock:
+            _groq_stats["connections_opened"] += 1
+
+
+def _on_groq_request(request):
+    request.extensions["trace"] = _trace_connections
+    with _lock:
+        _groq_stats["requests"] += 1
+
+
+def get_groq_client():
+    """Returns the process-wide Groq client, backed by a shared keep-alive connection pool."""
+    global _groq_client
+    with _lock:
+        if _groq_client is None:
+            max_connections = _pool_size("GROQ_MAX_CONNECTIONS", DEFAULT_GROQ_MAX_CONNECTIONS)
+            _groq_stats["pool_size"] = max_connections
+            http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                event_hooks={"request": [_on_groq_request]},
+            )
+            # Retries on 429 are handled by rate_limit.py, not by the SDK.
+            _groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"), http_client=http_client, max_retries=0)
+        return _groq_client
+
+
+def _count_request(stats):
+    async def trace(event_name, info):
+        if event_name == "connection.connect_tcp.started":
+            with _lock:
+                stats["connections_opened"] += 1
+
+    async def on_request(request):
+        request.extensions["trace"] = trace
+        with _lock:
+            stats["requests"] += 1
+    return on_request
+
+
+def get_async_perplexity_client():
+    """
+    Returns the shared httpx.AsyncClient used for Perplexity. Like the async Groq
+    client, it belongs to the single event loop run by async_api_calls.
+    """
+    global _async_perplexity_client
+    with _lock:
+        if _async_perplexity_client is None:
+            pool_size = _pool_size("PERPLEXITY_POOL_SIZE", DEFAULT_PERPLEXITY_POOL_SIZE)
+            _async_perplexity_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                headers={"accept": "application/json", "content-type": "application/json"},
+                timeout=60,
+                event_hooks={"request": [_count_request(_async_perplexity_stats)]},
+            )
+        return _async_perplexity_client
+
+
+def get_async_groq_client():
+    """Returns the shared AsyncGroq client for the async_api_calls event loop."""
+    global _async_groq_client
+    with _lock:
+        if _async_groq_client is None:
+            max_connections = _pool_size("GROQ_MAX_CONNECTIONS", DEFAULT_GROQ_MAX_CONNECTIONS)
+            _groq_stats["pool_size"] = max_connections
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                event_hooks={"request": [_count_request(_groq_stats)]},
+            )
+            _async_groq_client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), http_client=http_client, max_retries=0)
+        return _async_groq_client
+
+
+def connection_stats():
+    """Reports how many requests each provider made and how many new connections that took."""
+    perplexity = {"requests": 0, "connections_opened": 0, "pool_size": _perplexity_pool_size}
+    if _perplexity_session is not None:
+        adapter = _perplexity_session.get_adapter("https://")
+        for key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools[key]
+            perplexity["requests"] += pool.num_requests
+            perplexity["connections_opened"] += pool.num_connections
+    with _lock:
+        groq = dict(_groq_stats)
+        perplexity["requests"] += _async_perplexity_stats["requests"]
+        perplexity["connections_opened"] += _async_perplexity_stats["connections_opened"]
+        if perplexity["pool_size"] is None and _async_perplexity_client is not None:
+            perplexity["pool_size"] = _pool_size("PERPLEXITY_POOL_SIZE", DEFAULT_PERPLEXITY_POOL_SIZE)
+
+    for stats in (perplexity, groq):
+        stats["reused"] = max(0, stats["requests"] - stats["connections_opened"])
+    return {"perplexity": perplexity, "groq": groq}
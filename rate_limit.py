@@ -0,0 +1,201 @@
+# rate_limit.py
+import os
+import re
+import time
+import asyncio
+import threading
+
+DEFAULT_LIMITS = {
+    # provider: (requests per minute, max concurrency)
+    "perplexity": (50, 8),
+    "groq": (30, 8),
+}
+DEFAULT_MAX_WAIT_SECONDS = 300
+_POLL_SECONDS = 0.05
+
+
+class Throttled(Exception):
+    """Raised by a provider call that got HTTP 429, carrying the response headers."""
+    def __init__(self, headers=None, message="rate limited"):
+        super().__init__(message)
+        self.headers = headers or {}
+
+
+class Abandoned(Exception):
+    """Raised while waiting for a slot once the caller no longer needs the call (e.g. a lost hedge)."""
+
+
+def _parse_duration(value):
+    """Parses '7.66s', '2m59.56s', '1h2m', '250ms' or a bare number of seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def _header(headers, name):
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class ProviderLimiter:
+    """
+    Token bucket plus AIMD concurrency control for one provider/model. Calls
+    wait for a slot instead of failing: the bucket paces requests to the quota,
+    the concurrency limit grows by ~1 per window of successes and halves on
+    every 429, and rate-limit headers pause the bucket until the quota resets.
+    """
+    def __init__(self, name, requests_per_minute, max_concurrency, min_concurrency=1, clock=time.monotonic):
+        self.name = name
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, float(max_concurrency))
+        self.tokens = self.capacity
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.clock = clock
+        self.stats = {"requests": 0, "throttled": 0, "waited_seconds": 0.0}
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _try_acquire(self):
+        """Takes a slot and returns 0, or returns how long to wait before trying again."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if now < self.blocked_until:
+                wait = self.blocked_until - now
+            elif self.in_flight >= int(self.concurrency_limit):
+                wait = _POLL_SECONDS
+            elif self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+            else:
+                self.tokens -= 1
+                self.in_flight += 1
+                self.stats["requests"] += 1
+                return 0
+            self.stats["waited_seconds"] += wait
+            return wait
+
+    def acquire(self, abandoned=None):
+        """Waits for a slot; raises Abandoned if the `abandoned` event is set first."""
+        while True:
+            if abandoned is not None and abandoned.is_set():
+                raise Abandoned()
+            wait = self._try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, headers=None, throttled=False, failed=False):
+        """Frees the slot and adapts to the outcome of the call."""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            now = self.clock()
+            if throttled:
+                self.stats["throttled"] += 1
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+                self.tokens = 0
+                retry_after = _parse_duration(_header(headers or {}, "retry-after"))
+                self.blocked_until = max(self.blocked_until, now + (retry_after if retry_after is not None else 1.0))
+            elif not failed:
+                self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+
+            if headers:
+                remaining = _header(headers, "x-ratelimit-remaining-requests")
+                reset = _parse_duration(_header(headers, "x-ratelimit-reset-requests"))
+                try:
+                    if remaining is not None and int(remaining) <= 0 and reset:
+                        self.blocked_until = max(self.blocked_until, now + reset)
+                except ValueError:
+                    pass
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, concurrency_limit=round(self.concurrency_limit, 2), in_flight=self.in_flight)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(provider, model):
+    """Returns the process-wide limiter for a provider/model pair, configured from the environment."""
+    key = (provider, model)
+    with _limiters_lock:
+        if key not in _limiters:
+            rpm, concurrency = DEFAULT_LIMITS.get(provider, (60, 4))
+            rpm = float(os.getenv(f"{provider.upper()}_RPM", rpm))
+            concurrency = int(os.getenv(f"{provider.upper()}_MAX_CONCURRENCY", concurrency))
+            _limiters[key] = ProviderLimiter(f"{provider}:{model}", rpm, concurrency)
+        return _limiters[key]
+
+def limiter_stats():
+    with _limiters_lock:
+        return {limiter.name: limiter.snapshot() for limiter in _limiters.values()}
+
+def _max_wait():
+    return float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", DEFAULT_MAX_WAIT_SECONDS))
+
+def call_with_limiter(limiter, func, abandoned=None):
+    """
+    Runs `func()` inside a limiter slot. `func` returns (value, headers) or raises
+    Throttled on a 429, in which case the call is queued and retried until
+    RATE_LIMIT_MAX_WAIT_SECONDS have passed. Setting the `abandoned` event
+    gives up on a call that is still queued.
+    """
+    deadline = time.monotonic() + _max_wait()
+    while True:
+        limiter.acquire(abandoned)
+        try:
+            value, headers = func()
+        except Throttled as exc:
+            limiter.release(exc.headers, throttled=True)
+            if time.monotonic() >= deadline:
+                raise
+            continue
+        except Exception:
+            limiter.release(failed=True)
+            raise
+        limiter.release(headers)
+        return value
+
+async def call_with_limiter_async(limiter, func):
+    """Async version of call_with_limiter; `func()` returns an awaitable."""
+    deadline = time.monotonic() + _max_wait()
+    while True:
+        await limiter.acquire_async()
+        try:
+            value, headers = await func()
+        except Throttled as exc:
+            limiter.release(exc.headers, throttled=True)
+            if time.monotonic() >= deadline:
+                raise
+            continue
+        except Exception:
+            limiter.release(failed=True)
+            raise
+        limiter.release(headers)
+        return value
@@ -0,0 +1,124 @@
+# refresh.py
+# Delta refresh of a finished report. Each Layer 1 section (profile,
+# financials, market, team) carries its own fetch time and TTL; a refresh
+# re-queries only the sections that are stale, merges them into the report,
+# follows up on the keys they came back without, and re-runs only the Groq
+# layers whose input fields actually changed. The rules are re-scored for the
+# changed fields alone.
+import time
+import asyncio
+from api_calls import COMPANY_DATA_SECTIONS, LAYER_FIELDS, section_ttl, pop_fetched_at
+from async_api_calls import (
+    fetch_company_section_async,
+    fill_gaps_async,
+    generate_qualitative_analysis_async,
+    generate_investment_thesis_async,
+    generate_founders_analysis_async,
+    generate_product_analysis_async,
+    run_sync
+)
+from gap_fill import SECTION_SCHEMAS
+from rules import IncrementalRules, apply_investment_rules
+from company_record import CompanyRecord
+
+# Layers that only read company fields; the thesis also reads llm_analysis.
+_INDEPENDENT_LAYERS = {
+    "llm_analysis": generate_qualitative_analysis_async,
+    "founders_analysis": generate_founders_analysis_async,
+    "product_analysis": generate_product_analysis_async,
+}
+
+
+def section_ages(report_data, now=None):
+    """Seconds since each section was fetched, or None for sections with no recorded fetch time."""
+    now = time.time() if now is None else now
+    fetched_at = report_data.get('section_fetched_at') or {}
+    return {section: now - fetched_at[section] if section in fetched_at else None for section in COMPANY_DATA_SECTIONS}
+
+
+def stale_sections(report_data, now=None):
+    """Sections older than their TTL, in COMPANY_DATA_SECTIONS order. Sections never timestamped count as stale."""
+    return [section for section, age in section_ages(report_data, now).items() if age is None or age > section_ttl(section)]
+
+
+def _needs_rerun(layer, changed, report_data):
+    output = report_data.get(layer)
+    failed = not isinstance(output, dict) or not output or 'error' in output
+    return failed or not changed.isdisjoint(LAYER_FIELDS[layer])
+
+
+async def refresh_report_async(report_data, sections=None, fresh=False, rules_state=None):
+    """
+    Re-fetches `sections` (default: the stale ones) and returns (report_data,
+    summary). A section that fails keeps its previous data and fetch time;
+    the keys a refreshed section lacks are followed up as in a new report. A
+    Groq layer re-runs when one of its LAYER_FIELDS changed (the thesis also
+    when the qualitative analysis changed) or when its previous run failed.
+    `fresh` bypasses the response cache. With an IncrementalRules
+    `rules_state` that last scored this report, only the rules reading a
+    changed field are re-run.
+    """
+    sections = stale_sections(report_data) if sections is None else list(sections)
+    startup_name = report_data.get('startup_name', '')
+    sector = report_data.get('user_sector_input', report_data.get('sector', ''))
+    old_company_data = report_data.get('company_data') or {}
+    summary = {'refreshed': [], 'failed': {}, 'gap_filled': [], 'changed_fields': [], 'rerun_layers': []}
+
+    results = await asyncio.gather(
+        *(fetch_company_section_async(section, startup_name, sector, fresh=fresh) for section in sections),
+        return_exceptions=True,
+    )
+    company_data = dict(old_company_data)
+    fetched_at = {}
+    for section, data in zip(sections, results):
+        if isinstance(data, Exception) or data.get("error"):
+            summary['failed'][section] = str(data) if isinstance(data, Exception) else data["error"]
+            continue
+        fetched_at[section] = pop_fetched_at(data)
+        for field in COMPANY_DATA_SECTIONS[section][1]:
+            company_data.pop(field, None)
+        company_data.update(data)
+        summary['refreshed'].append(section)
+
+    # The refreshed sections replaced any fields gap fill found for them, so they are followed up again.
+    gap_filled = [path for path in report_data.get('gap_filled') or []
+                  if not any(path in SECTION_SCHEMAS[section] for section in summary['refreshed'])]
+    if summary['refreshed']:
+        try:
+            gap_fill = await fill_gaps_async(company_data, startup_name, sector, sections=summary['refreshed'], fresh=fresh)
+        except Exception as e:
+            print(f"!!! GAP FILL ERROR: {e}")
+            gap_fill = {"fields": {}, "filled": [], "error": f"Could not fill the missing fields: {e}"}
+        company_data.update(gap_fill['fields'])
+        summary['gap_filled'] = gap_fill['filled']
+        gap_filled += gap_fill['filled']
+
+    refreshed = {key: value for key, value in report_data.items() if key != 'company_record'}
+    refreshed['company_data'] = company_data
+    refreshed['gap_filled'] = gap_filled
+    refreshed['section_fetched_at'] = {**(report_data.get('section_fetched_at') or {}), **fetched_at}
+    changed = IncrementalRules.changed_fields(old_company_data, company_data)
+    summary['changed_fields'] = sorted(changed)
+
+    layers = [layer for layer in _INDEPENDENT_LAYERS if _needs_rerun(layer, changed, report_data)]
+    outputs = await asyncio.gather(*(_INDEPENDENT_LAYERS[layer](company_data) for layer in layers))
+    refreshed.update(zip(layers, outputs))
+    llm_analysis_changed = refreshed.get('llm_analysis') != report_data.get('llm_analysis')
+    if llm_analysis_changed or _needs_rerun('investment_thesis', changed, report_data):
+        refreshed['investment_thesis'] = await generate_investment_thesis_async(company_data, refreshed.get('llm_analysis', {}))
+        layers.append('investment_thesis')
+    summary['rerun_layers'] = layers
+
+    company_record = CompanyRecord.from_dict(company_data)
+    refreshed['company_record'] = company_record
+    if rules_state is not None:
+        # The state diffs against the record it last scored, so only rules reading a changed field re-run.
+        refreshed['rules_feedback'] = rules_state.update(company_record, sector)
+    elif changed or 'rules_feedback' not in report_data:
+        refreshed['rules_feedback'] = apply_investment_rules(company_record, sector)
+    return refreshed, summary
+
+
+def refresh_report(report_data, sections=None, fresh=False, rules_state=None):
+    """Blocking wrapper around refresh_report_async, on the shared event loop."""
+    return run_sync(refresh_report_async(report_data, sections, fresh, rules_state))
@@ -0,0 +1,194 @@
+# report_document.py
+# The report as plain data, built once from report_data. The Markdown and PDF
+# renderers (and anything else that exports a report) read this document
+# instead of each walking company_data and the layer outputs on their own.
+import json
+import hashlib
+from dataclasses import dataclass, field
+from company_record import CompanyRecord
+
+# Fact tables shared by the Markdown and PDF renderers: (heading, [(label, company_data key)]).
+FACT_SECTIONS = {
+    'business_revenue': ("Business & Revenue", [
+        ("Business Model", 'business_model'),
+        ("Revenue Model", 'revenue_model'),
+        ("Pricing Model", 'pricing_model'),
+        ("Revenue Stream Diversified", 'revenue_stream_diversified'),
+    ]),
+    'financials': ("Financials", [
+        ("Total Funding", 'total_funding'),
+        ("Last Funding Round", 'last_funding_round'),
+        ("Valuation", 'valuation'),
+        ("Revenue", 'revenue'),
+        ("Profitability", 'profitability'),
+    ]),
+    'market_competition': ("Market & Competition", [
+        ("Market Size", 'market_size'),
+        ("Market Growth Rate", 'market_growth_rate'),
+        ("Competitive Advantage", 'competitive_advantage'),
+        ("Competitors", 'competitors'),
+    ]),
+    'product_technology': ("Product & Technology", [
+        ("Product Differentiation", 'product_differentiation'),
+        ("Innovative Solution", 'innovative_solution'),
+        ("Patents", 'patents'),
+        ("Product Validation", 'product_validation'),
+        ("Technology Stack", 'technology_stack'),
+        ("Product Roadmap", 'product_roadmap'),
+    ]),
+    'team': ("Team", [
+        ("Key Hires", 'key_hires'),
+        ("Employee Growth Rate", 'employee_growth_rate'),
+        ("Glassdoor Rating", 'glassdoor_rating'),
+    ]),
+}
+LIST_FIELDS = {'competitors', 'patents', 'key_hires'}
+
+FOUNDER_DETAILS = [
+    ("Complementarity", 'complementarity'),
+    ("Key Competency", 'key_competency'),
+    ("Prior Experience", 'prior_startup_experience'),
+    ("Red Flags", 'red_flags'),
+]
+
+
+@dataclass
+class ReportDocument:
+    """Everything a rendered report shows, with display values ('N/A' for missing) resolved."""
+    startup_name: str
+    name: str
+    year_founded: object
+    city: object
+    country: object
+    address: object
+    domain: object
+    website_url: str
+    employees: object
+    social_links: list = field(default_factory=list)
+    founder_names: list = field(default_factory=list)
+    founder_details: list = field(default_factory=list)
+    key_investors: list = field(default_factory=list)
+    sector_activity: list = field(default_factory=list)
+    facts: dict = field(default_factory=dict)
+    llm_analysis: dict = field(default_factory=dict)
+    investment_thesis: dict = field(default_factory=dict)
+    founders_analysis: dict = field(default_factory=dict)
+    product_analysis: dict = field(default_factory=dict)
+    rules_feedback: list = field(default_factory=list)
+
+
+def build_report_document(report_data):
+    """Builds the ReportDocument for a report_data dict (as stored in session state)."""
+    record = report_data.get('company_record')
+    if record is None:
+        record = CompanyRecord.from_dict(report_data.get('company_data', {}))
+    startup_name = report_data.get('startup_name', 'N/A')
+
+    facts = {}
+    for section, (_, rows) in FACT_SECTIONS.items():
+        facts[section] = [(label, record.joined(key) if key in LIST_FIELDS else record.text(key)) for label, key in rows]
+
+    return ReportDocument(
+        startup_name=startup_name,
+        name=record.get('name', startup_name),
+        year_founded=record.text('foundedYear'),
+        city=record.city,
+        country=record.country,
+        address=record.address,
+        domain=record.text('domain'),
+        website_url=record.website_url,
+        employees=record.employees,
+        social_links=list(record.social_links.items()),
+        founder_names=record.founder_names,
+        founder_details=[(label, record.founder_detail(key)) for label, key in FOUNDER_DETAILS],
+        key_investors=record.get('key_investors', []),
+        sector_activity=[("Sector", record.sector), ("Sub-sector", record.sub_sector),
+                         ("Industry", record.industry), ("Activity", record.activity)],
+        facts=facts,
+        llm_analysis=report_data.get('llm_analysis') or {},
+        investment_thesis=report_data.get('investment_thesis') or {},
+        founders_analysis=report_data.get('founders_analysis') or {},
+        product_analysis=report_data.get('product_analysis') or {},
+        rules_feedback=report_data.get('rules_feedback') or [],
+    )
+
+
+def report_key(report_data):
+    """Content hash of report_data; equal reports get equal keys, so renders can be cached on it."""
+    content = {key: value for key, value in report_data.items() if key != 'company_record'}
+    encoded = json.dumps(content, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _is_usable(layer_output):
+    return bool(layer_output) and not layer_output.get('error')
+
+
+def render_markdown(document):
+    """The Markdown export of a ReportDocument."""
+    out = []
+    write = out.append
+
+    write(f"\n# Preliminary Investment Fit Report: {document.name}\n\n---\n\n## Company Details\n")
+    write(f"- **Year Founded:** {document.year_founded}\n")
+    write(f"- **HQ Location:** {document.city}, {document.country}\n")
+    write(f"- **Address:** {document.address}\n")
+    write(f"- **Website:** [{document.domain}]({document.website_url})\n")
+    write(f"- **Team Strength:** {document.employees} employees\n")
+
+    write("\n## Social Media\n")
+    if document.social_links:
+        for platform, link in document.social_links:
+            write(f"- **{platform.capitalize()}:** [{link}]({link})\n")
+    else:
+        write("- N/A\n")
+
+    write("\n## Founders\n")
+    write(f"**Founder(s):** {', '.join(document.founder_names)}\n")
+    for label, value in document.founder_details:
+        write(f"**{label}:** {value}\n")
+
+    write("\n## Key Investors\n")
+    if document.key_investors:
+        for investor in document.key_investors:
+            write(f"- **{investor}**\n")
+    else:
+        write("- N/A\n")
+
+    write("\n---\n\n## Sector & Activity\n")
+    for label, value in document.sector_activity:
+        write(f"- **{label}:** {value}\n")
+    for section, separator in (('business_revenue', ""), ('financials', ""), ('market_competition', "---\n\n"),
+                               ('product_technology', ""), ('team', "")):
+        write(f"\n{separator}## {FACT_SECTIONS[section][0]}\n")
+        for label, value in document.facts[section]:
+            write(f"- **{label}:** {value}\n")
+
+    llm_analysis = document.llm_analysis
+    write("\n---\n\n## AI-Generated Analysis\n\n")
+    write(f"### SWOT Analysis\n{llm_analysis.get('swot_analysis', 'N/A')}\n\n")
+    write(f"### Competitive Landscape\n{llm_analysis.get('competitive_landscape', 'N/A')}\n\n")
+    write(f"### TAM Analysis\n{llm_analysis.get('tam_analysis', 'N/A')}\n\n")
+    write("### Highlights\n")
+    highlights = llm_analysis.get('key_highlights', [])
+    if highlights:
+        for item in highlights:
+            write(f"- {item}\n")
+    else:
+        write("- N/A\n")
+
+    for title, analysis in (("Founder Analysis", document.founders_analysis), ("Product Analysis", document.product_analysis)):
+        write(f"\n---\n\n## {title}\n")
+        if _is_usable(analysis):
+            for key, value in analysis.items():
+                write(f"### {key.replace('_', ' ').title()}\n{value}\n\n")
+
+    thesis = document.investment_thesis
+    write("\n---\n\n## Investment Thesis\n\n")
+    write(f"### Investment Summary\n{thesis.get('investment_summary', 'N/A')}\n\n")
+    write(f"### Key Risks\n{thesis.get('key_risks', 'N/A')}\n\n")
+    write(f"### Investment Recommendation\n{thesis.get('investment_recommendation', 'N/A')}\n\n")
+    write("---\n\n## Investment Fit (Our Rules)\n")
+    for item in document.rules_feedback:
+        write(f"- {item['text']}\n")
+    return ''.join(out)
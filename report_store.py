@@ -0,0 +1,271 @@
+# report_store.py
+# Finished reports, kept on disk so a memo generated earlier (in any session
+# or process) can be reopened without calling the providers again. Lookups by
+# company, sector, stage and time are served by indexes; the report body is
+# only read for the report being opened.
+#
+# Alongside the reports, a `screening` table keeps one row per company (its
+# latest report) with numeric columns taken from the normalized company data
+# and the rules feedback, so portfolios can be filtered and sorted in SQL
+# (see screening.py) without re-reading the reports or re-running the rules.
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from company_record import CompanyRecord
+from normalize import to_amount
+
+DEFAULT_STORE_PATH = os.path.join(".cache", "reports.sqlite3")
+DEFAULT_PAGE_SIZE = 20
+
+# Legal-form suffixes dropped when matching company names ("Acme Inc." == "acme").
+_LEGAL_SUFFIXES = {"inc", "incorporated", "ltd", "limited", "llc", "llp", "plc", "pvt", "private", "corp",
+                   "corporation", "co", "gmbh", "ag", "sa", "bv", "pte"}
+_NON_WORD = re.compile(r'[^\w]+')
+_INTEGER_COLUMNS = {"year_founded", "founders", "red_flags", "positive_rules", "negative_rules"}
+
+
+def normalize_name(name):
+    """Lower-cased company name without punctuation or legal suffixes, for lookups."""
+    words = _NON_WORD.sub(' ', str(name or '').casefold()).split()
+    while len(words) > 1 and words[-1] in _LEGAL_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def normalize_label(value):
+    """Sector and stage labels as stored: lower-cased with single spaces."""
+    return ' '.join(str(value).casefold().split()) if isinstance(value, str) else ''
+
+
+# Numeric screening columns, each indexed. Amounts are the midpoint of a parsed range.
+SCREENING_COLUMNS = {
+    "total_funding": "Total funding",
+    "valuation": "Valuation",
+    "market_size": "Market size",
+    "employees": "Employees",
+    "year_founded": "Year founded",
+    "founders": "Founders",
+    "red_flags": "Founder red flags",
+    "positive_rules": "Positive rules",
+    "negative_rules": "Negative rules",
+}
+
+
+def _mid(amount):
+    return amount.mid if amount is not None else None
+
+
+def _has_content(value):
+    """Not empty and not "N/A"/"None", as the rules' is_empty_or_na reads it."""
+    return bool(value) and not (isinstance(value, str) and ('none' in value.lower() or 'n/a' in value.lower()))
+
+
+def _company_sector(report_data):
+    """The company's own sector (category.sector), normalized; '' if unknown."""
+    category = (report_data.get('company_data') or {}).get('category')
+    sector = normalize_label(category.get('sector')) if isinstance(category, dict) else ''
+    return sector if _has_content(sector) else ''
+
+
+def screening_values(report_data):
+    """The SCREENING_COLUMNS values of a report (None where the data is missing)."""
+    record = report_data.get('company_record') or CompanyRecord.from_dict(report_data.get('company_data') or {})
+    founders = to_amount(record.get_path('founders_analysis.number_of_founders'))
+    names = record.founder_names
+    red_flags = record.get_path('founders_analysis.red_flags')
+    if isinstance(red_flags, list):
+        red_flags = sum(1 for flag in red_flags if _has_content(flag))
+    else:
+        red_flags = 1 if _has_content(red_flags) else 0
+    feedback_types = [item.get('type') for item in report_data.get('rules_feedback') or [] if isinstance(item, dict)]
+    year_founded = to_amount(record.get('foundedYear'))
+    return {
+        "total_funding": _mid(record.amounts.get('total_funding')),
+        "valuation": _mid(record.amounts.get('valuation')),
+        "market_size": _mid(record.amounts.get('market_size')),
+        "employees": _mid(record.amounts.get('metrics.employees')),
+        "year_founded": int(year_founded.low) if year_founded is not None else None,
+        "founders": int(founders.low) if founders is not None else (len(names) or None),
+        "red_flags": red_flags,
+        "positive_rules": feedback_types.count('positive'),
+        "negative_rules": feedback_types.count('negative'),
+    }
+
+
+class ReportStore:
+    """
+    An SQLite table of report_data dicts. Each save adds a row, so earlier
+    versions of a company's report stay available; `latest()` returns the
+    newest. Listing uses keyset pagination on (generated_at, id), so paging
+    through a long history costs the same on every page.
+    """
+    def __init__(self, path=DEFAULT_STORE_PATH, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            "id INTEGER PRIMARY KEY, name_key TEXT NOT NULL, startup_name TEXT NOT NULL, "
+            "sector TEXT NOT NULL, stage TEXT NOT NULL, generated_at REAL NOT NULL, report TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_name ON reports (name_key, sector, generated_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_sector ON reports (sector, generated_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_stage ON reports (stage, generated_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_generated_at ON reports (generated_at, id)")
+
+        backfill = self._conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'screening'").fetchone() is None
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS screening ("
+            "name_key TEXT PRIMARY KEY, report_id INTEGER NOT NULL, startup_name TEXT NOT NULL, "
+            "sector TEXT NOT NULL, stage TEXT NOT NULL, generated_at REAL NOT NULL, "
+            + ", ".join(f"{column} {'INTEGER' if column in _INTEGER_COLUMNS else 'REAL'}" for column in SCREENING_COLUMNS)
+            + ")"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_screening_sector ON screening (sector, total_funding)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_screening_stage ON screening (stage)")
+        for column in SCREENING_COLUMNS:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_screening_{column} ON screening ({column})")
+        if backfill:
+            # Stores created before the screening table: index the latest report of every company.
+            for report_id, report, generated_at in self._conn.execute(
+                    "SELECT id, report, generated_at FROM reports ORDER BY generated_at, id").fetchall():
+                self._upsert_screening(report_id, json.loads(report), generated_at)
+        self._conn.commit()
+
+    def save(self, report_data):
+        """Stores a finished report and returns its id. `company_record` is rebuilt on load, not stored."""
+        return self.save_many([report_data])[0]
+
+    def save_many(self, reports):
+        """Stores several reports in one transaction and returns their ids."""
+        ids = []
+        with self._lock:
+            for report_data in reports:
+                report = {key: value for key, value in report_data.items() if key != 'company_record'}
+                generated_at = self.clock()
+                cursor = self._conn.execute(
+                    "INSERT INTO reports (name_key, startup_name, sector, stage, generated_at, report) VALUES (?, ?, ?, ?, ?, ?)",
+                    self._report_columns(report) + (generated_at, json.dumps(report, default=str, ensure_ascii=False)),
+                )
+                self._upsert_screening(cursor.lastrowid, report_data, generated_at)
+                ids.append(cursor.lastrowid)
+            self._conn.commit()
+        return ids
+
+    @staticmethod
+    def _report_columns(report):
+        """(name_key, startup_name, sector, stage) of a report. batch_screen.py records carry `sector`."""
+        company_data = report.get('company_data') or {}
+        startup_name = report.get('startup_name') or company_data.get('name') or ''
+        sector = report.get('user_sector_input', report.get('sector'))
+        return normalize_name(startup_name), startup_name, normalize_label(sector), normalize_label(company_data.get('stage'))
+
+    def _upsert_screening(self, report_id, report_data, generated_at):
+        """Makes this report the company's screening row, unless a newer one is already there."""
+        name_key, startup_name, target_sector, stage = self._report_columns(report_data)
+        values = screening_values(report_data)
+        columns = ("name_key", "report_id", "startup_name", "sector", "stage", "generated_at") + tuple(SCREENING_COLUMNS)
+        self._conn.execute(
+            f"INSERT INTO screening ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT (name_key) DO UPDATE SET "
+            + ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+            + " WHERE excluded.generated_at >= screening.generated_at",
+            (name_key, report_id, startup_name, _company_sector(report_data) or target_sector, stage, generated_at)
+            + tuple(values[column] for column in SCREENING_COLUMNS),
+        )
+
+    def get(self, report_id):
+        """The stored report_data for an id, exactly as saved, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT report FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def latest(self, startup_name, sector=None, max_age=None):
+        """The newest stored report for a company (and sector, if given), optionally no older than `max_age` seconds."""
+        query = "SELECT id FROM reports WHERE name_key = ?"
+        params = [normalize_name(startup_name)]
+        if sector is not None:
+            query += " AND sector = ?"
+            params.append(normalize_label(sector))
+        if max_age is not None:
+            query += " AND generated_at >= ?"
+            params.append(self.clock() - max_age)
+        query += " ORDER BY generated_at DESC, id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return self.get(row[0]) if row else None
+
+    def _filters(self, name=None, sector=None, stage=None):
+        clauses, params = [], []
+        name_key = normalize_name(name) if name else None
+        if name_key:
+            # A prefix match that can still use the name index.
+            clauses.append("name_key >= ? AND name_key < ?")
+            params.extend((name_key, name_key + "\U0010ffff"))
+        for column, value in (("sector", normalize_label(sector) if sector else None),
+                              ("stage", normalize_label(stage) if stage else None)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return clauses, params
+
+    def list_reports(self, limit=DEFAULT_PAGE_SIZE, before=None, name=None, sector=None, stage=None):
+        """
+        One page of stored reports, newest first, as dicts with id,
+        startup_name, sector, stage and generated_at (the bodies are not read).
+        `name` matches company names starting with it; sector and stage match
+        exactly, ignoring case.
+        Pass the returned cursor as `before` to get the next page; it is None
+        on the last page.
+        """
+        clauses, params = self._filters(name, sector, stage)
+        if before is not None:
+            clauses.append("(generated_at, id) < (?, ?)")
+            params.extend(before)
+        query = "SELECT id, startup_name, sector, stage, generated_at FROM reports"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY generated_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        page = [dict(zip(("id", "startup_name", "sector", "stage", "generated_at"), row)) for row in rows[:limit]]
+        cursor = (page[-1]["generated_at"], page[-1]["id"]) if len(rows) > limit else None
+        return page, cursor
+
+    def count(self, name=None, sector=None, stage=None):
+        clauses, params = self._filters(name, sector, stage)
+        query = "SELECT COUNT(*) FROM reports" + (" WHERE " + " AND ".join(clauses) if clauses else "")
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    def query(self, sql, params=()):
+        """Runs a read-only query (e.g. from screening.py) and returns all rows."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_report_store():
+    """
+    Returns the process-wide report store configured from the environment, or
+    None when REPORT_STORE_DISABLED is set.
+    """
+    global _store
+    if os.getenv("REPORT_STORE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ReportStore(path=os.getenv("REPORT_STORE_PATH", DEFAULT_STORE_PATH))
+        return _store
@@ -0,0 +1,327 @@
+# resilience.py
+import os
+import math
+import time
+import random
+import asyncio
+import threading
+import concurrent.futures
+import httpx
+import requests
+import groq
+from rate_limit import get_limiter, call_with_limiter, call_with_limiter_async
+
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 8.0
+DEFAULT_HEDGE_QUANTILE = 0.95
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_MAX_FRACTION = 0.1
+_SLOT_POLL_SECONDS = 0.05
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def is_transient(exc):
+    """True for failures worth retrying: timeouts, dropped connections and 5xx responses."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, httpx.TransportError, groq.APIConnectionError)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    if isinstance(exc, groq.APIStatusError):
+        return exc.status_code >= 500
+    return False
+
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class LatencyHistogram:
+    """
+    Log-spaced latency buckets (50ms to ~2min) for one provider/model, used to
+    pick the hedging threshold and reported in Debug Mode.
+    """
+    MIN_SECONDS = 0.05
+    GROWTH = 1.25
+    BUCKETS = 36
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, seconds):
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        index = int(math.log(seconds / self.MIN_SECONDS, self.GROWTH)) + 1
+        return min(index, self.BUCKETS - 1)
+
+    def _upper_bound(self, index):
+        return self.MIN_SECONDS * (self.GROWTH ** index)
+
+    def record(self, seconds):
+        with self._lock:
+            self.counts[self._bucket(seconds)] += 1
+            self.total += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile, or None with no samples."""
+        with self._lock:
+            if not self.total:
+                return None
+            target = q * self.total
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return self._upper_bound(index)
+            return self._upper_bound(self.BUCKETS - 1)
+
+    def snapshot(self):
+        return {
+            "count": self.total,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class _Hedger:
+    """Decides when to send a duplicate request and keeps hedges within a budget."""
+    def __init__(self):
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def threshold(self, histogram):
+        if os.getenv("HEDGE_REQUESTS", "").lower() not in ("1", "true", "yes"):
+            return None
+        if histogram.total < _env_float("HEDGE_MIN_SAMPLES", DEFAULT_HEDGE_MIN_SAMPLES):
+            return None
+        return histogram.quantile(_env_float("HEDGE_QUANTILE", DEFAULT_HEDGE_QUANTILE))
+
+    def start_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def try_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.calls * _env_float("HEDGE_MAX_FRACTION", DEFAULT_HEDGE_MAX_FRACTION):
+                return False
+            self.hedges += 1
+            return True
+
+    def record_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+
+_histograms = {}
+_hedgers = {}
+_registry_lock = threading.Lock()
+_hedge_executor = concurrent.futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+
+def _get(provider, model):
+    key = (provider, model)
+    with _registry_lock:
+        if key not in _histograms:
+            _histograms[key] = LatencyHistogram()
+            _hedgers[key] = _Hedger()
+        return _histograms[key], _hedgers[key]
+
+
+def latency_stats():
+    with _registry_lock:
+        return {
+            f"{provider}:{model}": dict(
+                _histograms[(provider, model)].snapshot(),
+                hedges=_hedgers[(provider, model)].hedges,
+                hedge_wins=_hedgers[(provider, model)].hedge_wins,
+            )
+            for provider, model in _histograms
+        }
+
+
+class _SlotTimer:
+    """When an attempt got its limiter slot; None while it is queued."""
+    def __init__(self):
+        self.started = None
+
+    def time_left(self, threshold):
+        """Seconds until the attempt has run for `threshold` in its slot, or None while it is queued."""
+        started = self.started
+        return None if started is None else started + threshold - time.perf_counter()
+
+
+def _timed(func, histogram, timer=None):
+    def call():
+        start = time.perf_counter()
+        if timer:
+            timer.started = start
+        try:
+            result = func()
+        finally:
+            if timer:
+                timer.started = None
+        histogram.record(time.perf_counter() - start)
+        return result
+    return call
+
+
+def _timed_async(func, histogram, timer=None):
+    async def call():
+        start = time.perf_counter()
+        if timer:
+            timer.started = start
+        try:
+            result = await func()
+        finally:
+            if timer:
+                timer.started = None
+        histogram.record(time.perf_counter() - start)
+        return result
+    return call
+
+
+# The hedging threshold counts from when a call got its limiter slot. Time
+# queued behind the limiter is not provider latency, and hedging it would add
+# load exactly when the provider is pushing back.
+
+def _hedged(attempt, histogram, hedger):
+    threshold = hedger.threshold(histogram)
+    hedger.start_call()
+    if threshold is None:
+        return attempt()
+
+    abandoned = threading.Event()
+    timer = _SlotTimer()
+    primary = _hedge_executor.submit(attempt, timer, abandoned)
+    while True:
+        left = timer.time_left(threshold)
+        if left is not None and left <= 0:
+            break
+        try:
+            return primary.result(timeout=_SLOT_POLL_SECONDS if left is None else left)
+        except concurrent.futures.TimeoutError:
+            pass
+    if not hedger.try_hedge():
+        return primary.result()
+
+    backup = _hedge_executor.submit(attempt, _SlotTimer(), abandoned)
+    pending = {primary, backup}
+    error = None
+    try:
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        hedger.record_win()
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        # A loser still queued for a slot gives up; one already sending its
+        # request cannot be interrupted and frees its slot when it returns.
+        abandoned.set()
+        for future in pending:
+            future.cancel()
+
+
+async def _hedged_async(attempt, histogram, hedger):
+    threshold = hedger.threshold(histogram)
+    hedger.start_call()
+    if threshold is None:
+        return await attempt()
+
+    timer = _SlotTimer()
+    primary = asyncio.ensure_future(attempt(timer))
+    while True:
+        left = timer.time_left(threshold)
+        if left is not None and left <= 0:
+            break
+        done, _ = await asyncio.wait({primary}, timeout=_SLOT_POLL_SECONDS if left is None else left)
+        if done:
+            return await primary
+    if not hedger.try_hedge():
+        return await primary
+
+    backup = asyncio.ensure_future(attempt(_SlotTimer()))
+    pending = {primary, backup}
+    error = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                for other in pending:
+                    other.cancel()
+                if task is backup:
+                    hedger.record_win()
+                return task.result()
+            error = task.exception()
+    raise error
+
+
+def resilient_call(provider, model, func):
+    """
+    Runs a provider call with rate limiting, optional hedging and retries on
+    transient failures. `func()` returns (value, headers) or raises Throttled,
+    exactly as for rate_limit.call_with_limiter.
+    """
+    limiter = get_limiter(provider, model)
+    histogram, hedger = _get(provider, model)
+    max_retries = int(_env_float("PROVIDER_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+    base_delay = _env_float("RETRY_BASE_DELAY", DEFAULT_RETRY_BASE_DELAY)
+    max_delay = _env_float("RETRY_MAX_DELAY", DEFAULT_RETRY_MAX_DELAY)
+
+    def attempt(timer=None, abandoned=None):
+        return call_with_limiter(limiter, _timed(func, histogram, timer), abandoned)
+
+    for retry in range(max_retries + 1):
+        try:
+            return _hedged(attempt, histogram, hedger)
+        except Exception as exc:
+            if retry == max_retries or not is_transient(exc):
+                raise
+            delay = backoff_delay(retry, base_delay, max_delay)
+            print(f"!!! {provider} call failed ({exc}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+
+async def resilient_call_async(provider, model, func, hedge=True):
+    """
+    Async version of resilient_call; `func()` returns an awaitable. Pass
+    hedge=False for streaming calls, whose partial output must come from a
+    single request.
+    """
+    limiter = get_limiter(provider, model)
+    histogram, hedger = _get(provider, model)
+    max_retries = int(_env_float("PROVIDER_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+    base_delay = _env_float("RETRY_BASE_DELAY", DEFAULT_RETRY_BASE_DELAY)
+    max_delay = _env_float("RETRY_MAX_DELAY", DEFAULT_RETRY_MAX_DELAY)
+
+    async def attempt(timer=None):
+        return await call_with_limiter_async(limiter, _timed_async(func, histogram, timer))
+
+    for retry in range(max_retries + 1):
+        try:
+            if not hedge:
+                return await attempt()
+            return await _hedged_async(attempt, histogram, hedger)
+        except Exception as exc:
+            if retry == max_retries or not is_transient(exc):
+                raise
+            delay = backoff_delay(retry, base_delay, max_delay)
+            print(f"!!! {provider} call failed ({exc}); retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
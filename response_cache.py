@@ -0,0 +1,138 @@
+# response_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "responses.sqlite3")
+DEFAULT_MAX_MB = 256
+DEFAULT_TTL_HOURS = {
+    "perplexity": 24,
+    "groq": 24 * 7,
+}
+
+
+class ResponseCache:
+    """
+    A content-addressed, on-disk cache for raw provider responses. Entries are
+    keyed by provider, model, rendered messages and temperature, expire after a
+    per-provider TTL, and the least recently used entries are evicted once the
+    total payload size exceeds `max_bytes`.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, max_bytes=DEFAULT_MAX_MB * 1024 * 1024, clock=time.time):
+        self.path = path
+        self.ttls = {provider: hours * 3600 for provider, hours in DEFAULT_TTL_HOURS.items()}
+        self.ttls.update(ttls or {})
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, provider TEXT NOT NULL, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider, model, messages, temperature=None):
+        """Hashes everything that determines a provider's answer into a stable key."""
+        payload = json.dumps([provider, model, messages, temperature], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, provider, key, ttl=None):
+        """
+        Returns (value, created_at), or (None, None) on a miss or an expired
+        entry. `ttl` (seconds) can shorten the provider's TTL for this lookup,
+        never extend it.
+        """
+        now = self.clock()
+        max_age = self.ttls.get(provider, 0) if ttl is None else min(ttl, self.ttls.get(provider, 0))
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= max_age:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits[provider] = self.hits.get(provider, 0) + 1
+                return row[0], row[1]
+            if row and now - row[1] > self.ttls.get(provider, 0):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+            self.misses[provider] = self.misses.get(provider, 0) + 1
+            return None, None
+
+    def set(self, provider, key, value):
+        now = self.clock()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, value, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drops least recently used entries until the cache fits in `max_bytes`."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Returns the process-wide cache configured from the environment, or None when
+    RESPONSE_CACHE_DISABLED is set.
+    """
+    global _cache
+    if os.getenv("RESPONSE_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            ttls = {}
+            for provider in DEFAULT_TTL_HOURS:
+                hours = os.getenv(f"{provider.upper()}_CACHE_TTL_HOURS")
+                if hours:
+                    ttls[provider] = float(hours) * 3600
+            _cache = ResponseCache(
+                path=os.getenv("RESPONSE_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttls=ttls,
+                max_bytes=int(float(os.getenv("RESPONSE_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+            )
+        return _cache
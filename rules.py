@@ -1,7 +1,13 @@
 # rules.py
+import os
+import copy
 import json
+import string
+import hashlib
+import threading
 from datetime import datetime
-import re
+from normalize import parse_numerical_value as _parse_numerical_value
+from company_record import CompanyRecord, NORMALIZED_FIELDS
 
 def _get_nested_value(data_dict, key_string):
     """Safely retrieves a value from a nested dictionary using a dot-separated string."""
@@ -14,157 +20,359 @@ def _get_nested_value(data_dict, key_string):
             return None
     return value
 
-def _parse_numerical_value(value_string):
+RULES_PATH = 'rules.json'
+
+# --- Pre-calculations ---
+# Values derived from company_data that rules can read as `calculated.<name>`.
+def _calculate_age(company_data):
+    founded_year = company_data.get('foundedYear')
+    if founded_year and isinstance(founded_year, int):
+        return datetime.now().year - founded_year
+    return None
+
+def _calculate_parsed(field):
+    attribute = NORMALIZED_FIELDS[field]
+
+    def calculate(company_data):
+        if isinstance(company_data, CompanyRecord):
+            return getattr(company_data, attribute)  # parsed once at ingestion
+        value = _get_nested_value(company_data, field)
+        return _parse_numerical_value(value) if value else None
+    return calculate
+
+CALCULATIONS = {
+    'age': _calculate_age,
+    'parsed_market_size': _calculate_parsed('market_size'),
+    'parsed_total_funding': _calculate_parsed('total_funding'),
+}
+
+# The company_data fields each calculation reads.
+CALCULATION_INPUTS = {
+    'age': ('foundedYear',),
+    'parsed_market_size': ('market_size',),
+    'parsed_total_funding': ('total_funding',),
+}
+
+# Dependency name for rules that compare against the user's target sector.
+SECTOR_INPUT = 'user_sector_input'
+
+# --- Operators ---
+# Each takes (actual_value, rule_value) and returns whether the rule's check passed.
+def _is_number(value):
+    return isinstance(value, (int, float))
+
+OPERATORS = {
+    'contains': lambda actual, expected: isinstance(actual, str) and expected.lower() in actual.lower(),
+    'between': lambda actual, expected: _is_number(actual) and len(expected) == 2 and expected[0] <= actual <= expected[1],
+    'equals': lambda actual, expected: actual == expected,
+    'is_empty_or_na': lambda actual, expected: not actual or (isinstance(actual, str) and ('none' in actual.lower() or 'n/a' in actual.lower())),
+    'is_not_empty': lambda actual, expected: bool(actual),
+    'length_gt': lambda actual, expected: isinstance(actual, str) and len(actual) > expected,
+    'gt': lambda actual, expected: _is_number(actual) and actual > expected,
+    'le': lambda actual, expected: _is_number(actual) and actual <= expected,
+    'lt': lambda actual, expected: _is_number(actual) and actual < expected,
+    'list_length_between': lambda actual, expected: isinstance(actual, list) and len(expected) == 2 and expected[0] <= len(actual) <= expected[1],
+}
+
+def _never(actual, expected):
+    return False
+
+# --- Compilation ---
+def _compile_getter(field):
     """
-    Parses a string to extract a numerical value. Handles currency symbols,
-    "billion", "million", and "N/A".
+    Returns getter(company_data, calculated) with the dot path split once.
+    company_data may be a dict or a CompanyRecord.
     """
-    if not isinstance(value_string, str):
-        return value_string
+    if field.startswith('calculated.'):
+        name = field.split('.')[1]
+        return lambda company_data, calculated: calculated.get(name)
+    first, *rest = field.split('.')
+    if not rest:
+        return lambda company_data, calculated: company_data.get(first)
 
-    value_string = value_string.lower().replace(",", "").strip()
+    def getter(company_data, calculated):
+        value = company_data.get(first)
+        for key in rest:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    return getter
 
-    if "n/a" in value_string or not value_string:
+def _compile_condition(condition):
+    """Returns check(company_data) for a rule's condition, or None when the rule is unconditional."""
+    if not condition:
         return None
+    getter = _compile_getter(condition['field'])
+    expected = condition['value']
+    if condition['operator'] == 'contains_any':
+        if not isinstance(expected, list):
+            return lambda company_data: False
+        needles = [value.lower() for value in expected]
 
-    # Handle "billion" and "million"
-    multiplier = 1
-    if "billion" in value_string:
-        multiplier = 1_000_000_000
-        value_string = value_string.replace("billion", "")
-    elif "million" in value_string:
-        multiplier = 1_000_000
-        value_string = value_string.replace("million", "")
-
-    # Extract numbers using regex
-    numbers = re.findall(r'\d+\.?\d*', value_string)
-    if numbers:
-        try:
-            return float(numbers[0]) * multiplier
-        except ValueError:
+        def contains_any(company_data):
+            actual = getter(company_data, None)
+            if not isinstance(actual, str):
+                return False
+            actual = actual.lower()
+            return any(needle in actual for needle in needles)
+        return contains_any
+    return lambda company_data: getter(company_data, None) is not None
+
+def _rule_reads(field, condition, uses_sector_input):
+    """The top-level company_data fields (and SECTOR_INPUT) a rule's outcome depends on."""
+    if field.startswith('calculated.'):
+        reads = set(CALCULATION_INPUTS.get(field.split('.')[1], ()))
+    else:
+        reads = {field.split('.')[0]}
+    if condition:
+        reads.add(condition['field'].split('.')[0])
+    if uses_sector_input:
+        reads.add(SECTOR_INPUT)
+    return frozenset(reads)
+
+def _compile_template(template):
+    """Returns (text, type, preformatted text or None when the text depends on {value})."""
+    text = template['text']
+    constant = all(field is None for _, field, _, _ in string.Formatter().parse(text))
+    return text, template['type'], text.format() if constant else None
+
+class CompiledRule:
+    """One rule from rules.json with its field path, condition, operator and templates resolved up front."""
+    def __init__(self, rule):
+        self.id = rule.get('id')
+        self.field = rule['field_to_check']
+        self.getter = _compile_getter(self.field)
+        self.condition = _compile_condition(rule.get('condition'))
+        self.operator = rule['operator']
+        self.check = OPERATORS.get(self.operator, _never)
+        self.expected = rule['value']
+        self.uses_sector_input = self.operator == 'contains' and self.expected == '{user_sector_input}'
+        self.counts_list = self.operator == 'list_length_between'
+        self.if_true = _compile_template(rule['result_if_true'])
+        self.if_false = _compile_template(rule['result_if_false'])
+        # Rules with equal keys always reach the same outcome, whatever their feedback texts say.
+        self.condition_key = json.dumps(rule.get('condition'), sort_keys=True) if rule.get('condition') else None
+        self.predicate_key = (self.field, self.condition_key, self.operator, json.dumps(self.expected, sort_keys=True))
+        self.reads = _rule_reads(self.field, rule.get('condition'), self.uses_sector_input)
+
+    def feedback(self, result, actual_value):
+        text, feedback_type, preformatted = self.if_true if result else self.if_false
+        if preformatted is None:
+            display_value = len(actual_value) if self.counts_list and isinstance(actual_value, list) else actual_value
+            preformatted = text.format(value=display_value)
+        return {'text': preformatted, 'type': feedback_type}
+
+    def __call__(self, company_data, calculated, user_sector_input):
+        """Returns the feedback item for company_data, or None when the rule does not apply."""
+        if self.condition is not None and not self.condition(company_data):
             return None
-    return None
+        actual_value = self.getter(company_data, calculated)
+        if actual_value is None:
+            return None  # Skip rule if data is missing
+        result = self.check(actual_value, user_sector_input if self.uses_sector_input else self.expected)
+        return self.feedback(result, actual_value)
+
+class CompiledRuleset:
+    """A parsed rules.json turned into a list of predicate closures."""
+    def __init__(self, rules):
+        global_rules = rules.get('global_rules', [])
+        self.rules = [CompiledRule(rule) for rule in global_rules]
+        needed = {rule['field_to_check'].split('.')[1] for rule in global_rules
+                  if rule['field_to_check'].startswith('calculated.')}
+        self.calculations = {name: CALCULATIONS[name] for name in CALCULATIONS if name in needed}
+        self.index = {}
+        for position, rule in enumerate(self.rules):
+            for dependency in rule.reads:
+                self.index.setdefault(dependency, []).append(position)
+
+    def rules_reading(self, fields):
+        """Positions of the rules whose outcome depends on any of `fields`, in rule order."""
+        return sorted({position for field in fields for position in self.index.get(field, ())})
+
+    def evaluate(self, company_data, user_sector_input):
+        calculated = {name: calculate(company_data) for name, calculate in self.calculations.items()}
+        feedback = []
+        for rule in self.rules:
+            item = rule(company_data, calculated, user_sector_input)
+            if item is not None:
+                feedback.append(item)
+        return feedback
 
-def apply_investment_rules(company_data, user_sector_input):
+class MultiRuleset:
     """
-    Applies a custom set of investment rules to the fetched data by loading
-    rules from an external rules.json file.
+    Several named rulesets (e.g. one per fund mandate) evaluated together. Each
+    distinct field, condition and predicate is evaluated once per company, and
+    rules that also share their feedback texts are formatted once.
+    """
+    def __init__(self, rulesets):
+        self.names = list(rulesets)
+        self.calculations = {}
+        self.getters = {}
+        conditions = {}
+        predicates = {}
+        feedback_rules = {}
+        self.members = {}
+        for name, ruleset in rulesets.items():
+            self.calculations.update(ruleset.calculations)
+            members = []
+            for rule in ruleset.rules:
+                self.getters.setdefault(rule.field, rule.getter)
+                if rule.condition_key is not None and rule.condition_key not in conditions:
+                    conditions[rule.condition_key] = (len(conditions), rule.condition)
+                if rule.predicate_key not in predicates:
+                    condition_index = conditions[rule.condition_key][0] if rule.condition_key is not None else None
+                    predicates[rule.predicate_key] = (len(predicates), (rule.field, condition_index, rule.check,
+                                                                        rule.expected, rule.uses_sector_input))
+                feedback_key = (rule.predicate_key, rule.if_true, rule.if_false)
+                if feedback_key not in feedback_rules:
+                    feedback_rules[feedback_key] = (len(feedback_rules), (predicates[rule.predicate_key][0], rule))
+                members.append(feedback_rules[feedback_key][0])
+            self.members[name] = members
+        self.conditions = [condition for _, condition in sorted(conditions.values(), key=lambda item: item[0])]
+        self.predicates = [predicate for _, predicate in sorted(predicates.values(), key=lambda item: item[0])]
+        self.feedback_rules = [entry for _, entry in sorted(feedback_rules.values(), key=lambda item: item[0])]
+
+    def evaluate(self, company_data, user_sector_input):
+        """Returns {ruleset name: feedback list}, each identical to evaluating that ruleset alone."""
+        calculated = {name: calculate(company_data) for name, calculate in self.calculations.items()}
+        values = {field: getter(company_data, calculated) for field, getter in self.getters.items()}
+        conditions_met = [condition(company_data) for condition in self.conditions]
+        outcomes = []
+        for field, condition_index, check, expected, uses_sector_input in self.predicates:
+            actual_value = values[field]
+            if actual_value is None or (condition_index is not None and not conditions_met[condition_index]):
+                outcomes.append(None)
+            else:
+                outcomes.append((check(actual_value, user_sector_input if uses_sector_input else expected), actual_value))
+        items = [rule.feedback(*outcomes[index]) if outcomes[index] is not None else None
+                 for index, rule in self.feedback_rules]
+        # Every ruleset gets its own copies, as if it had been evaluated alone.
+        return {
+            name: [dict(items[index]) for index in members if items[index] is not None]
+            for name, members in self.members.items()
+        }
+
+class IncrementalRules:
+    """
+    The last feedback of every rule for one company. After a change to a few
+    fields of company_data, or to the target sector, only the rules that read
+    them are re-run and the cached feedback is reused for everything else. A
+    new version of the rules file triggers a full evaluation.
+    """
+    def __init__(self, rules_path=RULES_PATH):
+        self.rules_path = rules_path
+        self.ruleset = None
+        self.company_data = None
+        self.user_sector_input = None
+        self.calculated = {}
+        self.items = []
+        self.last_evaluated = 0
+
+    @staticmethod
+    def changed_fields(old, new):
+        """Top-level keys whose values differ between two company_data dicts or records."""
+        old = old.to_dict() if isinstance(old, CompanyRecord) else old
+        new = new.to_dict() if isinstance(new, CompanyRecord) else new
+        return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+    def update(self, company_data, user_sector_input, changed=None):
+        """
+        Returns the feedback list for company_data, identical to
+        apply_investment_rules. Pass `changed` (top-level field names, plus
+        SECTOR_INPUT) to skip diffing against the previous company_data.
+        """
+        try:
+            ruleset = load_ruleset(self.rules_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.ruleset = None
+            return [{'text': "Critical Error: Could not load or parse rules.json.", 'type': 'negative'}]
+
+        if ruleset is not self.ruleset or self.company_data is None:
+            self.ruleset = ruleset
+            self.calculated = {name: calculate(company_data) for name, calculate in ruleset.calculations.items()}
+            positions = range(len(ruleset.rules))
+            self.items = [None] * len(ruleset.rules)
+        else:
+            if changed is None:
+                changed = self.changed_fields(self.company_data, company_data)
+                if user_sector_input != self.user_sector_input:
+                    changed.add(SECTOR_INPUT)
+            changed = set(changed)
+            for name, calculate in ruleset.calculations.items():
+                if not changed.isdisjoint(CALCULATION_INPUTS.get(name, ())):
+                    self.calculated[name] = calculate(company_data)
+            positions = ruleset.rules_reading(changed)
+
+        for position in positions:
+            self.items[position] = ruleset.rules[position](company_data, self.calculated, user_sector_input)
+        self.last_evaluated = len(positions)
+        # A deep copy, so that nested edits made in place are still seen as changes.
+        self.company_data = copy.deepcopy(company_data)
+        self.user_sector_input = user_sector_input
+        return [dict(item) for item in self.items if item is not None]
+
+_compiled_rulesets = {}
+_compiled_rulesets_lock = threading.Lock()
+_multi_rulesets = {}
+
+def load_ruleset(path=RULES_PATH):
+    """
+    Returns the compiled ruleset for `path`. The file is only re-read when its
+    mtime or size changes, and only recompiled when its content hash changes.
+    Raises FileNotFoundError or json.JSONDecodeError like json.load would.
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _compiled_rulesets_lock:
+        cached = _compiled_rulesets.get(key)
+        if cached and cached[0] == signature:
+            return cached[2]
+        with open(key, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        ruleset = cached[2] if cached and cached[1] == digest else CompiledRuleset(json.loads(raw))
+        _compiled_rulesets[key] = (signature, digest, ruleset)
+        return ruleset
+
+def apply_investment_rules(company_data, user_sector_input, rules_path=RULES_PATH):
+    """
+    Applies a custom set of investment rules to the fetched data (a
+    company_data dict or a CompanyRecord). The rules are loaded from an
+    external rules.json file and compiled once per version of it.
     """
-    feedback = []
-    
-    # Load the Knowledge Base
     try:
-        with open('rules.json', 'r') as f:
-            rules = json.load(f)
+        ruleset = load_ruleset(rules_path)
     except (FileNotFoundError, json.JSONDecodeError):
-        feedback.append({'text': "Critical Error: Could not load or parse rules.json.", 'type': 'negative'})
-        return feedback
+        return [{'text': "Critical Error: Could not load or parse rules.json.", 'type': 'negative'}]
+    return ruleset.evaluate(company_data, user_sector_input)
 
-    # --- Pre-calculations ---
-    # Perform any calculations required by the ruleset
-    calculated_values = {}
-    founded_year = company_data.get('foundedYear')
-    if founded_year and isinstance(founded_year, int):
-        calculated_values['age'] = datetime.now().year - founded_year
-
-    # Parse numerical values for market_size and total_funding
-    market_size_str = _get_nested_value(company_data, 'market_size')
-    if market_size_str:
-        calculated_values['parsed_market_size'] = _parse_numerical_value(market_size_str)
-
-    total_funding_str = _get_nested_value(company_data, 'total_funding')
-    if total_funding_str:
-        calculated_values['parsed_total_funding'] = _parse_numerical_value(total_funding_str)
-
-    # --- Rule Engine Logic ---
-    for rule in rules.get('global_rules', []):
-        field = rule['field_to_check']
-        operator = rule['operator']
-        rule_value = rule['value']
-
-        # --- Condition Logic ---
-        condition_met = True
-        if "condition" in rule:
-            condition = rule["condition"]
-            condition_field = condition["field"]
-            condition_operator = condition["operator"]
-            condition_value = condition["value"]
-            
-            actual_condition_value = _get_nested_value(company_data, condition_field)
-            
-            if actual_condition_value is None:
-                condition_met = False
-            
-            if condition_operator == "contains_any":
-                if isinstance(actual_condition_value, str) and isinstance(condition_value, list):
-                    condition_met = any(val.lower() in actual_condition_value.lower() for val in condition_value)
-                else:
-                    condition_met = False
-        
-        if not condition_met:
-            continue
-
-        # Get the actual value from company_data
-        if field.startswith('calculated.'):
-            actual_value = calculated_values.get(field.split('.')[1])
-        else:
-            actual_value = _get_nested_value(company_data, field)
-        
-        if actual_value is None:
-            continue # Skip rule if data is missing
-
-        # --- Operator Logic ---
-        result = False
-        if operator == 'contains':
-            # Special handling for user input placeholder
-            if rule_value == '{user_sector_input}':
-                rule_value = user_sector_input
-            if isinstance(actual_value, str):
-                result = rule_value.lower() in actual_value.lower()
-        
-        elif operator == 'between':
-            if isinstance(actual_value, (int, float)) and len(rule_value) == 2:
-                result = rule_value[0] <= actual_value <= rule_value[1]
-        
-        elif operator == 'equals':
-            result = actual_value == rule_value
-            
-        elif operator == 'is_empty_or_na':
-            result = not actual_value or (isinstance(actual_value, str) and ('none' in actual_value.lower() or 'n/a' in actual_value.lower()))
-        
-        elif operator == 'is_not_empty':
-            result = bool(actual_value)
-
-        elif operator == 'length_gt':
-            if isinstance(actual_value, str):
-                result = len(actual_value) > rule_value
-        
-        elif operator == 'gt':
-            if isinstance(actual_value, (int, float)):
-                result = actual_value > rule_value
-
-        elif operator == 'le':
-            if isinstance(actual_value, (int, float)):
-                result = actual_value <= rule_value
-
-        elif operator == 'lt':
-            if isinstance(actual_value, (int, float)):
-                result = actual_value < rule_value
-        
-        elif operator == 'list_length_between':
-            if isinstance(actual_value, list) and len(rule_value) == 2:
-                result = rule_value[0] <= len(actual_value) <= rule_value[1]
-        
-        # --- Append Feedback ---
-        template = rule['result_if_true'] if result else rule['result_if_false']
-        
-        # Prepare value for formatting
-        display_value = actual_value
-        if operator == 'list_length_between' and isinstance(actual_value, list):
-            display_value = len(actual_value)
-
-        text = template['text'].format(value=display_value)
-        
-        feedback.append({'text': text, 'type': template['type']})
-
-    return feedback
\ No newline at end of file
+def load_multi_ruleset(rulesets):
+    """Returns the MultiRuleset for {name: CompiledRuleset}, rebuilt only when one of them was recompiled."""
+    key = tuple(rulesets)
+    with _compiled_rulesets_lock:
+        cached = _multi_rulesets.get(key)
+        if cached and all(a is b for a, b in zip(cached[0], rulesets.values())):
+            return cached[1]
+        multi = MultiRuleset(rulesets)
+        _multi_rulesets[key] = (tuple(rulesets.values()), multi)
+        return multi
+
+def apply_investment_rules_multi(company_data, user_sector_input, rules_paths):
+    """
+    Applies several rulesets to one company in a single pass. `rules_paths`
+    maps a name (e.g. a fund) to its rules file, or is a list of paths used as
+    their own names. Returns {name: feedback list}.
+    """
+    if not isinstance(rules_paths, dict):
+        rules_paths = {path: path for path in rules_paths}
+    rulesets = {}
+    errors = {}
+    for name, path in rules_paths.items():
+        try:
+            rulesets[name] = load_ruleset(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            errors[name] = [{'text': "Critical Error: Could not load or parse rules.json.", 'type': 'negative'}]
+    feedback = load_multi_ruleset(rulesets).evaluate(company_data, user_sector_input) if rulesets else {}
+    return {name: feedback[name] if name in feedback else errors[name] for name in rules_paths}
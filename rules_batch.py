@@ -0,0 +1,153 @@
+# rules_batch.py
+# Evaluates a compiled ruleset against a whole portfolio at once. Every field a
+# rule reads is pulled out of the company records once, as a column; numeric
+# comparisons run as NumPy array operations. The feedback is identical to
+# calling apply_investment_rules on each company in turn.
+import json
+import numpy as np
+from rules import RULES_PATH, load_ruleset
+
+SKIPPED = -1
+FAILED = 0
+PASSED = 1
+
+_MAX_EXACT_INT = 2 ** 53
+_NUMERIC_COMPARISONS = {'gt': np.greater, 'lt': np.less, 'le': np.less_equal}
+
+
+def _is_exact_number(value):
+    """True for numbers that survive a round trip through float64 unchanged."""
+    return isinstance(value, (int, float)) and not (isinstance(value, int) and abs(value) > _MAX_EXACT_INT)
+
+
+def _float_column(values):
+    """Numbers as float64, everything else as NaN (which fails every comparison, as in the scalar engine)."""
+    floats = [value if isinstance(value, (int, float)) else np.nan for value in values]
+    try:
+        return np.array(floats, dtype=float)
+    except OverflowError:
+        # Ints beyond float64's range become +-inf; like every value above 2**53
+        # they are re-checked one by one against the scalar operator.
+        return np.array([value if _is_exact_number(value) else (np.inf if value > 0 else -np.inf) for value in floats], dtype=float)
+
+
+class _Columns:
+    """Field values for every company, extracted once per distinct field."""
+    def __init__(self, ruleset, companies):
+        self.companies = companies
+        self._values = {
+            'calculated.' + name: [calculate(company) for company in companies]
+            for name, calculate in ruleset.calculations.items()
+        }
+        self._numbers = {}
+        self._lengths = {}
+
+    def values(self, rule):
+        if rule.field not in self._values:
+            if rule.field.startswith('calculated.'):
+                # Unknown calculations read as missing, as in the scalar engine.
+                self._values[rule.field] = [None] * len(self.companies)
+            else:
+                getter = rule.getter
+                self._values[rule.field] = [getter(company, None) for company in self.companies]
+        return self._values[rule.field]
+
+    def numbers(self, rule):
+        """Returns (float array, rows whose magnitude is beyond float64's exact integer range)."""
+        if rule.field not in self._numbers:
+            numbers = _float_column(self.values(rule))
+            with np.errstate(invalid='ignore'):
+                inexact = np.flatnonzero(np.abs(numbers) > _MAX_EXACT_INT).tolist()
+            self._numbers[rule.field] = (numbers, inexact)
+        return self._numbers[rule.field]
+
+    def lengths(self, rule):
+        """Returns list lengths, with -1 for values that are not lists."""
+        if rule.field not in self._lengths:
+            self._lengths[rule.field] = np.array(
+                [len(value) if isinstance(value, list) else -1 for value in self.values(rule)], dtype=np.int64)
+        return self._lengths[rule.field]
+
+
+def _vector_check(rule, columns):
+    """
+    Returns the rule's result for every company as a bool array, or None when
+    the operator or its expected value has no exact array form.
+    """
+    operator, expected = rule.operator, rule.expected
+    is_range = isinstance(expected, list) and len(expected) == 2 and all(_is_exact_number(bound) for bound in expected)
+
+    if operator in _NUMERIC_COMPARISONS and _is_exact_number(expected) or operator == 'between' and is_range \
+            or operator == 'equals' and _is_exact_number(expected):
+        numbers, inexact = columns.numbers(rule)
+        if operator == 'between':
+            result = (numbers >= expected[0]) & (numbers <= expected[1])
+        elif operator == 'equals':
+            result = numbers == expected
+        else:
+            result = _NUMERIC_COMPARISONS[operator](numbers, expected)
+        if inexact:
+            values = columns.values(rule)
+            for row in inexact:
+                result[row] = rule.check(values[row], expected)
+        return result
+
+    if operator == 'list_length_between' and is_range and expected[0] >= 0:
+        lengths = columns.lengths(rule)
+        return (lengths >= expected[0]) & (lengths <= expected[1])
+    return None
+
+
+def _outcomes(ruleset, companies, user_sector_input):
+    columns = _Columns(ruleset, companies)
+    matrix = np.full((len(companies), len(ruleset.rules)), SKIPPED, dtype=np.int8)
+
+    for index, rule in enumerate(ruleset.rules):
+        values = columns.values(rule)
+        applies = np.array([value is not None for value in values], dtype=bool)
+        if rule.condition is not None:
+            applies &= np.array([rule.condition(company) for company in companies], dtype=bool)
+
+        result = _vector_check(rule, columns)
+        if result is None:
+            expected = user_sector_input if rule.uses_sector_input else rule.expected
+            result = np.zeros(len(companies), dtype=bool)
+            for row in np.flatnonzero(applies).tolist():
+                result[row] = rule.check(values[row], expected)
+        matrix[:, index] = np.where(applies, result, SKIPPED)
+    return matrix, columns
+
+
+def outcome_matrix(ruleset, companies, user_sector_input):
+    """
+    Returns an int8 array of shape (companies, rules): PASSED, FAILED, or
+    SKIPPED where the rule's field is missing or its condition is not met.
+    """
+    return _outcomes(ruleset, companies, user_sector_input)[0]
+
+
+def _feedback_column(rule, outcomes, values):
+    """The feedback item (or None when skipped) for one rule across all companies."""
+    feedback = rule.feedback
+    return [None if outcome == SKIPPED else feedback(outcome == PASSED, value)
+            for outcome, value in zip(outcomes, values)]
+
+
+def evaluate_batch(ruleset, companies, user_sector_input):
+    """Returns the feedback list for each company, exactly as CompiledRuleset.evaluate would."""
+    matrix, columns = _outcomes(ruleset, companies, user_sector_input)
+    feedback_columns = [
+        _feedback_column(rule, matrix[:, index].tolist(), columns.values(rule))
+        for index, rule in enumerate(ruleset.rules)
+    ]
+    return [[item for item in row if item is not None] for row in zip(*feedback_columns)] \
+        if feedback_columns else [[] for _ in companies]
+
+
+def apply_investment_rules_batch(companies, user_sector_input, rules_path=RULES_PATH):
+    """Batch version of rules.apply_investment_rules for a list of company_data dicts."""
+    try:
+        ruleset = load_ruleset(rules_path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return [[{'text': "Critical Error: Could not load or parse rules.json.", 'type': 'negative'}] for _ in companies]
+    return evaluate_batch(ruleset, companies, user_sector_input)
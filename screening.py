@@ -0,0 +1,151 @@
+# screening.py
+# Filters and sorts the companies in the report store by their screening
+# columns, e.g. "fintech, total funding $5M-$50M, at least two founders, no
+# founder red flags, most positive rules first". Every company's latest report
+# is one indexed row, so a query is a single SELECT: no API calls, no rules.
+#
+#   python screening.py --sector fintech --total-funding 5M-50M --min-founders 2 --max-red-flags 0
+import sys
+import json
+import argparse
+from dotenv import load_dotenv
+from normalize import parse_amount
+from report_store import ReportStore, SCREENING_COLUMNS, get_report_store, normalize_name, normalize_label
+
+DEFAULT_LIMIT = 50
+RESULT_COLUMNS = ("report_id", "startup_name", "sector", "stage") + tuple(SCREENING_COLUMNS)
+
+
+def build_query(sector=None, stage=None, name=None, ranges=None, sort_by="positive_rules", descending=True,
+                limit=DEFAULT_LIMIT, offset=0):
+    """
+    Returns (query, params, count_query, count_params) for a screen: the page
+    of results and the number of matches. `ranges` maps SCREENING_COLUMNS names
+    to (low, high) bounds, inclusive; either bound may be None. A bounded
+    column excludes companies where that value is unknown.
+    """
+    if sort_by not in SCREENING_COLUMNS and sort_by not in ("startup_name", "generated_at"):
+        raise ValueError(f"Cannot sort by '{sort_by}'.")
+    clauses, params = [], []
+    if sector:
+        clauses.append("sector = ?")
+        params.append(normalize_label(sector))
+    if stage:
+        clauses.append("stage = ?")
+        params.append(normalize_label(stage))
+    if name:
+        clauses.append("name_key >= ? AND name_key < ?")
+        params.extend((normalize_name(name), normalize_name(name) + "\U0010ffff"))
+    for column, (low, high) in (ranges or {}).items():
+        if column not in SCREENING_COLUMNS:
+            raise ValueError(f"Unknown screening column '{column}'.")
+        if low is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(low)
+        if high is not None:
+            clauses.append(f"{column} <= ?")
+            params.append(high)
+
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    # Unknown values sort last either way. SQLite already puts NULLs last when
+    # descending, and the plain ORDER BY lets it walk the column's index.
+    nulls_last = f"{sort_by} IS NULL, " if not descending and sort_by not in (ranges or {}) else ""
+    order = f" ORDER BY {nulls_last}{sort_by} {'DESC' if descending else 'ASC'}, name_key"
+    query = f"SELECT {', '.join(RESULT_COLUMNS)} FROM screening{where}{order} LIMIT ? OFFSET ?"
+    return query, params + [limit, offset], f"SELECT COUNT(*) FROM screening{where}", params
+
+
+def screen(store, **criteria):
+    """
+    Runs a screen (see build_query for the criteria) against a ReportStore.
+    Returns (rows, total) where rows are dicts of RESULT_COLUMNS and total is
+    the number of matching companies across all pages.
+    """
+    query, params, count_query, count_params = build_query(**criteria)
+    rows = [dict(zip(RESULT_COLUMNS, row)) for row in store.query(query, params)]
+    return rows, store.query(count_query, count_params)[0][0]
+
+
+def parse_range(text):
+    """Parses "5M-50M", "5M-", "-50M" or "2" (exact) into (low, high); amounts may use any unit normalize.py reads."""
+    text = text.strip()
+    if "-" in text[1:]:
+        split = text.index("-", 1)
+        low, high = text[:split].strip(), text[split + 1:].strip()
+    elif text.startswith("-"):
+        low, high = "", text[1:].strip()
+    else:
+        low = high = text
+
+    def bound(part):
+        if not part:
+            return None
+        amount = parse_amount(part)
+        if amount is None:
+            raise ValueError(f"'{part}' is not a number")
+        return amount.low
+
+    return bound(low), bound(high)
+
+
+def _format(column, value):
+    if value is None:
+        return "N/A"
+    if column in ("total_funding", "valuation", "market_size"):
+        return f"${value:,.0f}"
+    if isinstance(value, float):
+        return f"{value:,.0f}"
+    return str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Filter and sort the companies in the report store.")
+    parser.add_argument("--store", default=None, help="report store SQLite file (default: REPORT_STORE_PATH)")
+    parser.add_argument("--sector", help="company sector, e.g. fintech")
+    parser.add_argument("--stage", help="funding stage, e.g. seed")
+    parser.add_argument("--name", help="company names starting with this")
+    for column, label in SCREENING_COLUMNS.items():
+        option = column.replace("_", "-")
+        parser.add_argument(f"--{option}", type=parse_range, metavar="RANGE",
+                            help=f"{label.lower()} range, e.g. 5M-50M, 5M- or -50M")
+    parser.add_argument("--min-founders", type=int, help="shorthand for --founders N-")
+    parser.add_argument("--max-red-flags", type=int, help="shorthand for --red-flags -N")
+    parser.add_argument("--sort", default="positive_rules", choices=list(SCREENING_COLUMNS) + ["startup_name", "generated_at"])
+    parser.add_argument("--ascending", action="store_true", help="sort ascending (default: descending)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    store = ReportStore(path=args.store) if args.store else get_report_store()
+    if store is None:
+        print("The report store is disabled (REPORT_STORE_DISABLED).")
+        return 1
+
+    ranges = {column: getattr(args, column) for column in SCREENING_COLUMNS if getattr(args, column)}
+    if args.min_founders is not None:
+        ranges["founders"] = (args.min_founders, ranges.get("founders", (None, None))[1])
+    if args.max_red_flags is not None:
+        ranges["red_flags"] = (ranges.get("red_flags", (None, None))[0], args.max_red_flags)
+
+    rows, total = screen(store, sector=args.sector, stage=args.stage, name=args.name, ranges=ranges,
+                         sort_by=args.sort, descending=not args.ascending, limit=args.limit, offset=args.offset)
+    if args.json:
+        for row in rows:
+            print(json.dumps(row))
+        return 0
+
+    columns = ("startup_name", "sector", "stage") + tuple(SCREENING_COLUMNS)
+    table = [[_format(column, row[column]) for column in columns] for row in rows]
+    headers = ["Company", "Sector", "Stage"] + list(SCREENING_COLUMNS.values())
+    widths = [max([len(header)] + [len(line[i]) for line in table]) for i, header in enumerate(headers)]
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)))
+    for line in table:
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)))
+    print(f"{len(rows)} of {total} matching companies (offset {args.offset}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+# streaming.py
+import json
+import contextvars
+
+# The callback that receives the text generated so far by the provider call
+# running in the current task. Set per pipeline node, so concurrent layers
+# stream into their own sinks without any change to the layer functions.
+stream_sink = contextvars.ContextVar("stream_sink", default=None)
+
+
+def emit(text):
+    sink = stream_sink.get()
+    if sink:
+        sink(text)
+
+
+def with_stream_sink(name, func, on_partial):
+    """Wraps an async pipeline node so its provider calls stream into on_partial(name, text)."""
+    if not on_partial:
+        return func
+
+    async def node(*args):
+        token = stream_sink.set(lambda text: on_partial(name, text))
+        try:
+            return await func(*args)
+        finally:
+            stream_sink.reset(token)
+    return node
+
+
+def parse_sse_line(line, text):
+    """
+    Folds one Server-Sent Events line from Perplexity into the text received so
+    far. Handles both delta chunks and chunks that repeat the full message.
+    Returns (text, finished).
+    """
+    if not line or not line.startswith("data:"):
+        return text, False
+    data = line[len("data:"):].strip()
+    if data == "[DONE]":
+        return text, True
+    try:
+        chunk = json.loads(data)
+    except json.JSONDecodeError:
+        return text, False
+    choice = (chunk.get("choices") or [{}])[0]
+    delta = (choice.get("delta") or {}).get("content")
+    if delta:
+        text += delta
+    else:
+        content = (choice.get("message") or {}).get("content")
+        if content and len(content) >= len(text):
+            text = content
+    return text, choice.get("finish_reason") is not None
@@ -0,0 +1,106 @@
+# tests/test_batch_screen.py
+import sys
+import os
+import json
+import asyncio
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import batch_screen
+from api_calls import company_field
+from pipeline import PipelineResult
+from report_store import ReportStore
+
+def test_read_companies_from_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "companies.csv"
+    csv_path.write_text("startup_name,sector\nCred,Fintech\n,Missing name\nFigma, SaaS \n")
+    assert batch_screen.read_companies(str(csv_path)) == [("Cred", "Fintech"), ("Figma", "SaaS")]
+
+    jsonl_path = tmp_path / "companies.jsonl"
+    jsonl_path.write_text('{"startup_name": "Stripe", "sector": "Fintech"}\n\n{"startup_name": "Notion"}\n')
+    assert batch_screen.read_companies(str(jsonl_path)) == [("Stripe", "Fintech"), ("Notion", "")]
+
+def test_completed_keys_ignores_torn_last_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"startup_name": "Cred", "sector": "Fintech", "company_data": {"name": "Cred"}}\n'
+                      '{"startup_name": "Fig')
+    assert batch_screen.completed_keys(str(output)) == {("cred", "fintech")}
+    assert batch_screen.completed_keys(str(tmp_path / "missing.jsonl")) == set()
+
+def test_screen_streams_one_line_per_company(tmp_path, monkeypatch):
+    async def fake_report(startup_name, sector):
+        result = PipelineResult()
+        result.results["rules_feedback"] = [{"text": f"{startup_name} ok", "type": "positive"}]
+        return result
+
+    monkeypatch.setattr(batch_screen, "generate_report_async", fake_report)
+    monkeypatch.setattr(batch_screen, "get_report_store", lambda: None)
+    output = tmp_path / "results.jsonl"
+    asyncio.run(batch_screen.screen([("Cred", "Fintech"), ("Figma", "SaaS")], str(output), workers=2))
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(record["startup_name"] for record in records) == ["Cred", "Figma"]
+    assert all(record["rules_feedback"][0]["type"] == "positive" for record in records)
+
+def test_screen_saves_reports_with_company_data(tmp_path, monkeypatch):
+    async def fake_report(startup_name, sector):
+        result = PipelineResult()
+        if startup_name == "Cred":
+            result.results["profile"] = {company_field("name"): "Cred", company_field("stage"): "Series A"}
+        result.results["rules_feedback"] = [{"text": f"{startup_name} ok", "type": "positive"}]
+        return result
+
+    store = ReportStore(path=str(tmp_path / "reports.sqlite3"))
+    monkeypatch.setattr(batch_screen, "generate_report_async", fake_report)
+    monkeypatch.setattr(batch_screen, "get_report_store", lambda: store)
+    asyncio.run(batch_screen.screen([("Cred", "Fintech"), ("Figma", "SaaS")], str(tmp_path / "results.jsonl"), workers=2))
+
+    assert store.count() == 1
+    report = store.latest("cred", sector="fintech")
+    assert report["company_data"]["stage"] == "Series A" and report["sector"] == "Fintech"
+
+def test_resume_retries_failures_and_repairs_a_torn_last_line(tmp_path, monkeypatch):
+    async def fake_report(startup_name, sector):
+        result = PipelineResult()
+        result.results["profile"] = {company_field("name"): startup_name}
+        return result
+
+    monkeypatch.setattr(batch_screen, "generate_report_async", fake_report)
+    monkeypatch.setattr(batch_screen, "get_report_store", lambda: None)
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"startup_name": "Cred", "sector": "Fintech", "errors": {}, "company_data": {"name": "Cred"}}\n'
+                      '{"startup_name": "Figma", "sector": "SaaS", "errors": {"profile": "timeout"}}\n'
+                      '{"startup_name": "Stri')
+    assert batch_screen.completed_keys(str(output)) == {("cred", "fintech")}
+
+    asyncio.run(batch_screen.screen([("Figma", "SaaS")], str(output), workers=1))
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [record["startup_name"] for record in records] == ["Cred", "Figma", "Figma"]
+    assert batch_screen.completed_keys(str(output)) == {("cred", "fintech"), ("figma", "saas")}
+
+    # A complete record that only lost its newline is kept.
+    output.write_text('{"startup_name": "Cred", "sector": "Fintech", "company_data": {"name": "Cred"}}')
+    asyncio.run(batch_screen.screen([("Figma", "SaaS")], str(output), workers=1))
+    assert len(output.read_text().splitlines()) == 2
+
+def test_provider_errors_count_as_failures(tmp_path, monkeypatch, capsys):
+    async def fake_report(startup_name, sector):
+        # What a run looks like with Perplexity and Groq down: no exception, only error dicts.
+        result = PipelineResult()
+        for section in ("profile", "financials", "market", "team"):
+            result.results[section] = {company_field("error"): "An unexpected error occurred with Perplexity"}
+        for layer in ("llm_analysis", "investment_thesis", "founders_analysis", "product_analysis"):
+            result.results[layer] = {"error": "LLM generation failed"}
+        if startup_name == "Figma":
+            result.results["profile"] = {company_field("name"): "Figma"}
+        return result
+
+    monkeypatch.setattr(batch_screen, "generate_report_async", fake_report)
+    monkeypatch.setattr(batch_screen, "get_report_store", lambda: None)
+    output = tmp_path / "results.jsonl"
+    asyncio.run(batch_screen.screen([("Acme", "Fintech"), ("Figma", "SaaS")], str(output), workers=2))
+
+    printed = capsys.readouterr().out
+    assert "Acme: ERROR" in printed and "Figma: ERROR" in printed
+    assert batch_screen.completed_keys(str(output)) == set()
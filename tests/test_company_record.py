@@ -0,0 +1,83 @@
+# tests/test_company_record.py
+import sys
+import os
+import pickle
+import random
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from company_record import CompanyRecord, SCHEMA_FIELDS
+from api_calls import COMPANY_DATA_FIELDS
+from rules import apply_investment_rules
+
+COMPANY = {
+    "name": "Acme",
+    "foundedYear": 2019,
+    "geo": {"city": "Berlin", "country": "Germany"},
+    "domain": "acme.io",
+    "metrics": {"employees": 42},
+    "category": {"sector": "Fintech", "sub_sector": "Payments"},
+    "total_funding": "$12.5 million",
+    "valuation": "$1.2 billion",
+    "market_size": "N/A",
+    "competitors": ["Foo", "Bar"],
+    "founders_analysis": {"names_of_founders": ["Ann", "Bob"], "red_flags": "None"},
+    "stage": "Seed",
+    "unexpected_key": "kept",
+}
+
+def test_schema_matches_company_data_fields():
+    assert SCHEMA_FIELDS == set(COMPANY_DATA_FIELDS)
+
+def test_from_dict_round_trip_and_extra():
+    record = CompanyRecord.from_dict(COMPANY)
+    assert record.extra == {"unexpected_key": "kept"}
+    assert record.to_dict() == COMPANY
+    assert record.get("unexpected_key") == "kept"
+    assert record.get("revenue", "N/A") == "N/A"
+    assert record.get_path("metrics.employees") == 42
+
+def test_numeric_fields_are_normalized_once():
+    record = CompanyRecord.from_dict(COMPANY)
+    assert record.employee_count == 42
+    assert record.total_funding_amount == 12_500_000
+    assert record.valuation_amount == 1_200_000_000
+    assert record.market_size_amount is None
+    assert record.amounts["metrics.employees"].mid == 42
+    assert "market_size" not in record.amounts
+    ranged = CompanyRecord.from_dict({"valuation": "$1-2B"})
+    assert ranged.valuation_amount == 1.5e9
+    assert (ranged.amounts["valuation"].low, ranged.amounts["valuation"].high) == (1e9, 2e9)
+
+def test_display_accessors():
+    record = CompanyRecord.from_dict(dict(COMPANY, geo="N/A", social_media="N/A"))
+    assert (record.city, record.country, record.address) == ("N/A", "N/A", "N/A")
+    assert record.social_links == {}
+    assert record.website_url == "https://acme.io"
+    assert record.employees == 42
+    assert record.sector == "Fintech"
+    assert record.industry == "N/A"
+    assert record.joined("competitors") == "Foo, Bar"
+    assert record.joined("patents") == "N/A"
+    assert record.founder_names == ["Ann", "Bob"]
+    assert record.founder_detail("red_flags") == "None"
+    assert record.founder_detail("complementarity") == "N/A"
+    empty = CompanyRecord.from_dict({})
+    assert empty.website_url == "#"
+    assert empty.founder_names == []
+
+def test_rules_give_the_same_feedback_for_dicts_and_records():
+    rng = random.Random(3)
+    values = [None, "N/A", 0, 5, 42, 250, 2010, 2022, "$5 million", "$2 billion", "12", [], ["a", "b"], {}]
+    for _ in range(300):
+        company = {field: rng.choice(values) for field in rng.sample(COMPANY_DATA_FIELDS, 12)}
+        company["metrics"] = rng.choice([{"employees": rng.choice(values)}, "N/A"])
+        company["category"] = {"sector": rng.choice(["Fintech", "Healthtech"])}
+        company = {key: value for key, value in company.items() if value is not None}
+        record = CompanyRecord.from_dict(company)
+        assert apply_investment_rules(record, "fintech") == apply_investment_rules(company, "fintech")
+
+def test_record_pickles():
+    record = CompanyRecord.from_dict(COMPANY)
+    assert pickle.loads(pickle.dumps(record)) == record
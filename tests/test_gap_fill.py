@@ -0,0 +1,107 @@
+# tests/test_gap_fill.py
+import sys
+import os
+import asyncio
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import async_api_calls
+from gap_fill import SECTION_SCHEMAS, missing_fields, plan_gap_fill, gap_prompt, is_missing, na_answer_fields
+from api_calls import build_report_data
+from rules import apply_investment_rules
+from company_record import CompanyRecord
+
+def _company_data():
+    return {
+        "name": "Acme", "foundedYear": 2019, "geo": "Berlin", "description": "Payments for shops",
+        "category": {"sector": "Fintech"}, "metrics": {"employees": 40},
+        "total_funding": "$10M", "valuation": "N/A", "key_investors": ["N/A"], "stage": "Seed",
+        "market_size": "$5B", "competitors": ["Stripe"],
+        "founders_analysis": {"names_of_founders": ["Ann", "Bo"], "number_of_founders": "two", "red_flags": "None"},
+        "glassdoor_rating": "Not available.",
+    }
+
+def _merged(sections):
+    return {key: value for data in sections.values() for key, value in data.items()}
+
+def test_schema_follows_the_section_templates():
+    team = SECTION_SCHEMAS["team"]
+    assert team["founders_analysis.number_of_founders"] == ("number", "2")
+    assert team["key_hires"][0] == "list"
+    assert "{startup_name}" in team["glassdoor_rating"][1]
+    assert SECTION_SCHEMAS["profile"]["foundedYear"][0] == "number"
+    assert "geo.city" in SECTION_SCHEMAS["profile"]
+
+def test_missing_fields_finds_na_and_malformed_values():
+    missing = missing_fields(_company_data())
+    assert {"valuation", "key_investors"} <= set(missing["financials"])
+    assert {"founders_analysis.number_of_founders", "glassdoor_rating"} <= set(missing["team"])
+    # "None" is an answer (no red flags), and "geo" holds a plain string rather than an object.
+    assert "founders_analysis.red_flags" not in missing["team"]
+    assert not any(path.startswith("geo.") for path in missing["profile"])
+    assert not is_missing(2, "number") and is_missing("N/A (private)")
+
+def test_plan_asks_for_rule_fields_first_within_the_budget():
+    requests, summary = plan_gap_fill(_company_data(), max_requests=1, max_fields=3)
+    # The team section has the most missing fields that rules read.
+    assert requests == [("team", ["founders_analysis.number_of_founders", "glassdoor_rating",
+                                  "founders_analysis.complementarity"])]
+    assert "valuation" in summary['over_budget'] and "glassdoor_rating" not in summary['over_budget']
+    assert plan_gap_fill(_company_data(), max_requests=0)[0] == []
+
+def test_no_red_flags_is_an_answer_not_a_gap():
+    assert "founders_analysis.red_flags" in na_answer_fields()
+    company_data = {"founders_analysis": {"names_of_founders": ["Ann"], "number_of_founders": 1, "red_flags": "N/A"}}
+    requests, summary = plan_gap_fill(company_data, max_requests=4)
+    assert "founders_analysis.red_flags" not in summary['missing']
+    assert all("founders_analysis.red_flags" not in paths for _, paths in requests)
+
+def test_gap_prompt_asks_only_for_the_missing_keys():
+    prompt = gap_prompt("team", ["founders_analysis.number_of_founders", "glassdoor_rating"]).format(
+        startup_name="Acme", sector="Fintech")
+    assert '"number_of_founders": 2' in prompt and "Acme Glassdoor rating" in prompt
+    assert "red_flags" not in prompt and "key_hires" not in prompt
+
+def test_report_pipeline_scores_rules_on_filled_fields(monkeypatch):
+    sections = {
+        "profile": {key: _company_data()[key] for key in ("name", "foundedYear", "description", "category", "metrics")},
+        "financials": {"total_funding": "$10M", "valuation": "N/A", "stage": "Seed", "key_investors": ["Sequoia"]},
+        "market": {"market_size": "$5B", "competitors": ["Stripe"]},
+        "team": {"founders_analysis": {"number_of_founders": "N/A", "red_flags": "None"}, "glassdoor_rating": "N/A"},
+    }
+    prompts = []
+
+    async def fetch(section, startup_name, sector, fresh=False):
+        return sections[section]
+
+    async def follow_up(template, startup_name, sector, ttl=None, fresh=False):
+        prompts.append(template)
+        if "glassdoor_rating" in template:
+            return {"founders_analysis": {"number_of_founders": 3}, "glassdoor_rating": "N/A"}
+        await asyncio.sleep(1)  # past the time budget
+        return {"valuation": "$80M"}
+
+    async def layer(company_data, *args):
+        return {"summary": "ok"}
+
+    monkeypatch.setenv("GAP_FILL_TIMEOUT_SECONDS", "0.2")
+    monkeypatch.setattr(async_api_calls, "fetch_company_section_async", fetch)
+    monkeypatch.setattr(async_api_calls, "_make_perplexity_request_async", follow_up)
+    for name in ("generate_qualitative_analysis_async", "generate_investment_thesis_async",
+                 "generate_founders_analysis_async", "generate_product_analysis_async"):
+        monkeypatch.setattr(async_api_calls, name, layer)
+
+    result = asyncio.run(async_api_calls.generate_report_async("Acme", "Fintech"))
+    gap_fill = result.results["gap_fill"]
+    assert len(prompts) == 2
+    assert gap_fill['filled'] == ["founders_analysis.number_of_founders"]
+    assert gap_fill['failed'] == {"financials": "timed out"}
+
+    report = build_report_data(result, "Acme")
+    assert report['company_data']['founders_analysis'] == {"number_of_founders": 3, "red_flags": "None"}
+    assert report['company_data']['glassdoor_rating'] == "N/A"
+    assert report['gap_filled'] == ["founders_analysis.number_of_founders"]
+    filled_rules = apply_investment_rules(CompanyRecord.from_dict(report['company_data']), "Fintech")
+    assert result.results["rules_feedback"] == filled_rules
+    assert filled_rules != apply_investment_rules(CompanyRecord.from_dict(_merged(sections)), "Fintech")
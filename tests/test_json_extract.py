@@ -0,0 +1,34 @@
+# tests/test_json_extract.py
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api_calls import _extract_json_from_response
+
+def test_fenced_block():
+    raw = 'Here you go:\n```json\n{"name": "Acme", "geo": {"city": "Pune"}}\n```\nThanks.'
+    assert _extract_json_from_response(raw) == {"name": "Acme", "geo": {"city": "Pune"}}
+
+def test_merges_multiple_objects_and_unfenced_keys_win():
+    raw = '{"a": 1, "b": 1}\n```json\n{"b": 2, "c": 2}\n```\ntext {"c": 3}'
+    assert _extract_json_from_response(raw) == {"b": 1, "c": 3, "a": 1}
+
+def test_braces_and_escapes_inside_strings():
+    raw = 'prefix {"summary": "uses {templates} and \\"quotes\\" }", "n": 1} suffix'
+    assert _extract_json_from_response(raw) == {"summary": 'uses {templates} and "quotes" }', "n": 1}
+
+def test_malformed_object_is_skipped_with_its_nested_objects():
+    raw = '{"bad": {"nested": 1}, oops "x}"} then {"good": true}'
+    assert _extract_json_from_response(raw) == {"good": True}
+
+def test_no_json_returns_error():
+    assert "error" in _extract_json_from_response("no objects { here")
+    assert "error" in _extract_json_from_response("")
+
+def test_logging_is_optional(capsys):
+    _extract_json_from_response('{"a": 1}')
+    assert "RAW CONTENT" not in capsys.readouterr().out
+    _extract_json_from_response('{"a": 1}', log=True)
+    assert "RAW CONTENT" in capsys.readouterr().out
@@ -0,0 +1,94 @@
+# tests/test_layer_cache.py
+import sys
+import os
+import asyncio
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import layer_cache
+import api_calls
+import async_api_calls
+from layer_cache import LayerCache, cached_layer, layer_key
+from api_calls import LAYER_CACHE_KEYS
+
+COMPANY = {
+    "name": "Acme", "description": "Payments for shops", "category": {"sector": "Fintech", "sub_sector": "Payments"},
+    "geo": {"city": "Pune", "country": "India"}, "foundedYear": 2019, "metrics": {"employees": 40},
+    "stage": "Seed", "total_funding": "$10M", "founders_analysis": {"number_of_founders": 2},
+}
+
+def _key(layer, *args):
+    version, inputs = LAYER_CACHE_KEYS[layer]
+    return layer_key(layer, version, inputs(*args))
+
+def test_keys_depend_only_on_prompt_inputs():
+    unrelated = dict(COMPANY, total_funding="$50M", category={"sector": "Fintech", "sub_sector": "Lending"},
+                     geo={"city": "Pune", "country": "IN"})
+    for layer in ("llm_analysis", "founders_analysis", "product_analysis"):
+        assert _key(layer, COMPANY) == _key(layer, unrelated)
+    assert _key("llm_analysis", COMPANY) != _key("llm_analysis", dict(COMPANY, description="Payroll"))
+    assert _key("founders_analysis", COMPANY) != _key("founders_analysis", dict(COMPANY, stage="Series A"))
+    assert _key("founders_analysis", COMPANY) != _key("product_analysis", COMPANY)
+
+    analysis = {"swot_analysis": "s", "key_highlights": ["k"], "unused": 1}
+    assert _key("investment_thesis", COMPANY, analysis) == _key("investment_thesis", unrelated, dict(analysis, unused=2))
+    assert _key("investment_thesis", COMPANY, analysis) != _key("investment_thesis", COMPANY, dict(analysis, swot_analysis="t"))
+
+def test_outputs_persist_across_instances(tmp_path):
+    path = str(tmp_path / "layers.sqlite3")
+    LayerCache(path=path).set("llm_analysis", "k", {"swot_analysis": "s"})
+    cache = LayerCache(path=path)
+    assert cache.get("llm_analysis", "k") == {"swot_analysis": "s"}
+    assert cache.get("llm_analysis", "other") is None
+    assert cache.stats()["hits"] == {"llm_analysis": 1} and cache.stats()["misses"] == {"llm_analysis": 1}
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    now = [0]
+    cache = LayerCache(path=str(tmp_path / "layers.sqlite3"), max_entries=2, clock=lambda: now[0])
+    for key in ("a", "b"):
+        now[0] += 1
+        cache.set("layer", key, {"key": key})
+    now[0] += 1
+    cache._memory.clear()
+    cache.get("layer", "a")
+    now[0] += 1
+    cache.set("layer", "c", {"key": "c"})
+    cache._memory.clear()
+    assert cache.get("layer", "b") is None
+    assert cache.get("layer", "a") == {"key": "a"} and cache.stats()["evictions"] == 1
+
+def test_cached_layer_skips_repeat_calls_and_keeps_errors_out(tmp_path, monkeypatch):
+    cache = LayerCache(path=str(tmp_path / "layers.sqlite3"))
+    monkeypatch.setattr(layer_cache, "get_layer_cache", lambda: cache)
+    calls = []
+
+    @cached_layer("demo", "v1", lambda data: {"name": data["name"]})
+    def layer(data):
+        calls.append(data)
+        return {"error": "failed"} if data["name"] == "Broken" else {"summary": data["name"]}
+
+    assert layer({"name": "Acme", "other": 1}) == {"summary": "Acme"}
+    assert layer({"name": "Acme", "other": 2}) == {"summary": "Acme"}
+    layer({"name": "Broken"})
+    layer({"name": "Broken"})
+    assert len(calls) == 3
+
+def test_sync_and_async_layers_share_outputs(tmp_path, monkeypatch):
+    cache = LayerCache(path=str(tmp_path / "layers.sqlite3"))
+    monkeypatch.setattr(layer_cache, "get_layer_cache", lambda: cache)
+    calls = []
+
+    def fake_groq(system_prompt, user_prompt, temperature):
+        calls.append(user_prompt)
+        return '{"swot_analysis": "Strong"}'
+
+    async def fail_groq(*args):
+        raise AssertionError("the async layer should have been served from the cache")
+
+    monkeypatch.setattr(api_calls, "_groq_chat_completion", fake_groq)
+    monkeypatch.setattr(async_api_calls, "_groq_chat_completion_async", fail_groq)
+    assert api_calls.generate_qualitative_analysis(COMPANY) == {"swot_analysis": "Strong"}
+    refetched = dict(COMPANY, total_funding="$12M")
+    assert asyncio.run(async_api_calls.generate_qualitative_analysis_async(refetched)) == {"swot_analysis": "Strong"}
+    assert len(calls) == 1
@@ -0,0 +1,53 @@
+# tests/test_normalize.py
+import sys
+import os
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from normalize import parse_numerical_value, parse_amount, to_amount, ParsedAmount
+
+@pytest.mark.parametrize("text, expected", [
+    ("$5 million", 5e6),
+    ("$1.2 billion", 1.2e9),
+    ("$12.5M", 12.5e6),
+    ("45k", 45e3),
+    ("$3.4 bn (2023)", 3.4e9),
+    ("$2.5 Trillion", 2.5e12),
+    ("1.2T", 1.2e12),
+    ("₹300 crore", 3e9),
+    ("₹1,250 Cr", 1.25e10),
+    ("Rs. 10 lakh", 1e6),
+    ("₹2.5 lakh crore", 2.5e12),
+    ("$5,000,000", 5e6),
+    ("25%", 25.0),
+    ("5 months", 5.0),
+    ("Series A: $15M", 15e6),
+])
+def test_single_values(text, expected):
+    assert parse_numerical_value(text) == pytest.approx(expected)
+
+def test_ranges_keep_low_high_and_midpoint():
+    assert parse_amount("$1-2B") == ParsedAmount(1e9, 2e9)
+    assert parse_amount("$1M – $3M") == ParsedAmount(1e6, 3e6)
+    assert parse_amount("10 to 20 crore") == ParsedAmount(1e8, 2e8)
+    assert parse_amount("$500 million to $1 billion").mid == 7.5e8
+    assert parse_amount("$1-2B").is_range
+    assert not parse_amount("$2B").is_range
+    assert parse_numerical_value("Estimated $10-15M ARR") == 12.5e6
+
+def test_missing_values():
+    for text in ("N/A", "n/a (private)", "", "   ", "Undisclosed"):
+        assert parse_numerical_value(text) is None
+    assert parse_numerical_value(42) == 42
+    assert parse_numerical_value(None) is None
+
+def test_to_amount_and_memo():
+    assert to_amount(7) == ParsedAmount(7, 7)
+    assert to_amount(True) is None
+    assert to_amount(["$1M"]) is None
+    parse_amount.cache_clear()
+    parse_amount("$9M")
+    parse_amount("$9M")
+    assert parse_amount.cache_info().hits == 1
@@ -0,0 +1,27 @@
+# tests/test_pdf_generator.py
+import sys
+import os
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reportlab.lib.colors import navy
+from pdf_generator import PDFReport, STYLES
+
+def test_instances_share_one_style_registry():
+    first, second = PDFReport(), PDFReport()
+    assert first.styles is second.styles is STYLES
+    assert STYLES['h2'] is STYLES['Heading2']
+    assert STYLES['Title'].fontSize == 24 and STYLES['Title'].textColor == navy
+    assert STYLES['Bullet'].leftIndent == 18
+    assert STYLES['Key'].fontName == 'Helvetica-Bold'
+
+def test_registry_is_read_only():
+    with pytest.raises(TypeError):
+        STYLES['Key'] = STYLES['Value']
+
+def test_reports_render_independently():
+    report = PDFReport().generate("Acme", {"domain": "acme.io"}, {}, [{"text": "A: b", "type": "positive"}], {}, {}, {})
+    again = PDFReport().generate("Acme", {"domain": "acme.io"}, {}, [], {}, {}, {})
+    assert report.startswith(b"%PDF") and again.startswith(b"%PDF")
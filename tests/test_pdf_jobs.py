@@ -0,0 +1,47 @@
+# tests/test_pdf_jobs.py
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pdf_jobs
+from pdf_jobs import submit_pdf, get_pdf_job
+
+def _report(name="Acme", feedback_type="positive"):
+    return {
+        "company_data": {"name": name, "domain": "acme.io"},
+        "llm_analysis": {}, "investment_thesis": {}, "founders_analysis": {}, "product_analysis": {},
+        "rules_feedback": [{"text": "Team Size: 42 employees", "type": feedback_type}],
+        "startup_name": name,
+    }
+
+def test_renders_once_per_content():
+    report = _report()
+    job = submit_pdf(report)
+    assert submit_pdf(_report()) is job
+    job.future.result(timeout=30)
+    assert job.done and job.error is None
+    assert job.pdf.startswith(b"%PDF")
+    assert job.size == len(job.pdf) and job.render_seconds >= 0
+    assert get_pdf_job(report) is job
+    assert get_pdf_job(_report(feedback_type="negative")) is None
+
+def test_render_uses_a_snapshot_of_the_report():
+    report = _report(name="Snapshot")
+    job = submit_pdf(report)
+    report["rules_feedback"] = []
+    job.future.result(timeout=30)
+    assert get_pdf_job(report) is None
+    assert get_pdf_job(_report(name="Snapshot")) is job
+
+def test_failed_render_is_retried(monkeypatch):
+    report = _report(name="Broken")
+    monkeypatch.setattr(pdf_jobs, "build_report_document", lambda report_data: 1 / 0)
+    failed = submit_pdf(report)
+    failed.future.result(timeout=30)
+    assert failed.pdf is None and "division by zero" in failed.error
+    monkeypatch.undo()
+    retried = submit_pdf(report)
+    retried.future.result(timeout=30)
+    assert retried is not failed and retried.pdf.startswith(b"%PDF")
@@ -0,0 +1,82 @@
+# tests/test_pipeline.py
+import sys
+import os
+import time
+import asyncio
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pipeline import Pipeline, AsyncPipeline
+
+def _slow(value, delay=0.2):
+    def func(*args):
+        time.sleep(delay)
+        return value
+    return func
+
+def test_independent_nodes_run_concurrently():
+    """Three independent 0.2s nodes should finish in roughly one node's time."""
+    pipeline = Pipeline()
+    pipeline.add("a", _slow("A"), inputs=["seed"])
+    pipeline.add("b", _slow("B"), inputs=["seed"])
+    pipeline.add("c", _slow("C"), inputs=["seed"])
+    result = pipeline.run({"seed": 1})
+    assert result.results == {"a": "A", "b": "B", "c": "C"}
+    assert result.elapsed < 0.5
+    assert set(result.timings) == {"a", "b", "c"}
+
+def test_dependent_node_receives_upstream_output():
+    pipeline = Pipeline()
+    pipeline.add("thesis", lambda data, analysis: f"{data}+{analysis}", inputs=["data", "analysis"])
+    pipeline.add("analysis", lambda data: f"analysed({data})", inputs=["data"])
+    result = pipeline.run({"data": "x"})
+    assert result.results["thesis"] == "x+analysed(x)"
+    assert result.ok
+
+def test_failure_keeps_partial_results_and_skips_dependents():
+    def boom(data):
+        raise RuntimeError("provider down")
+
+    pipeline = Pipeline()
+    pipeline.add("analysis", boom, inputs=["data"])
+    pipeline.add("thesis", lambda data, analysis: "never", inputs=["data", "analysis"])
+    pipeline.add("founders", lambda data: "founders ok", inputs=["data"])
+    result = pipeline.run({"data": "x"})
+    assert result.errors == {"analysis": "provider down"}
+    assert result.skipped == ["thesis"]
+    assert result.results == {"founders": "founders ok"}
+    assert not result.ok
+
+def test_multi_output_node_publishes_dict_keys():
+    pipeline = Pipeline()
+    pipeline.add("profile", lambda: {"name": "Acme", "stage": "Seed"}, outputs=["name", "stage", "description"])
+    pipeline.add("summary", lambda name, description: (name, description), inputs=["name", "description"])
+    result = pipeline.run()
+    assert result.results["summary"] == ("Acme", None)
+
+def test_invalid_graphs_are_rejected():
+    missing = Pipeline().add("a", lambda x: x, inputs=["unknown"])
+    with pytest.raises(ValueError):
+        missing.run()
+
+    cycle = Pipeline()
+    cycle.add("a", lambda b: b, inputs=["b"])
+    cycle.add("b", lambda a: a, inputs=["a"])
+    with pytest.raises(ValueError):
+        cycle.run()
+
+def test_async_pipeline_mixes_coroutines_and_plain_functions():
+    async def fetch(seed):
+        await asyncio.sleep(0.2)
+        return seed + 1
+
+    pipeline = AsyncPipeline()
+    pipeline.add("a", fetch, inputs=["seed"])
+    pipeline.add("b", fetch, inputs=["seed"])
+    pipeline.add("total", lambda a, b: a + b, inputs=["a", "b"])
+    result = asyncio.run(pipeline.run({"seed": 1}))
+    assert result.results["total"] == 4
+    assert result.elapsed < 0.35
+    assert result.ok
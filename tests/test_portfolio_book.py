@@ -0,0 +1,62 @@
+# tests/test_portfolio_book.py
+import sys
+import os
+import re
+import json
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pdf_generator import PDFReport
+from report_document import build_report_document
+from portfolio_book import build_book, read_pdf_part, read_reports, BookWriter
+
+def _report(name, domain="example.com"):
+    return {
+        "company_data": {"name": name, "domain": domain},
+        "llm_analysis": {}, "investment_thesis": {}, "founders_analysis": {}, "product_analysis": {},
+        "rules_feedback": [{"text": "Team Size: 42 employees", "type": "positive"}],
+        "startup_name": name,
+    }
+
+def test_book_stitches_memos_with_contents_and_bookmarks(tmp_path):
+    reports = [_report("Alpha"), _report("Beta (Labs)"), _report("Gamma", domain="N/A")]
+    memo_pages = [len(read_pdf_part(PDFReport().render(build_report_document(r)))[2]) for r in reports]
+    output = tmp_path / "book.pdf"
+
+    summary = build_book(iter(reports), str(output), workers=2)
+
+    assert summary["companies"] == 3 and summary["failed"] == []
+    data = output.read_bytes()
+    assert summary["bytes"] == len(data)
+    objects, skipped, pages = read_pdf_part(data)
+    assert len(pages) == summary["pages"] == 1 + sum(memo_pages)
+    assert all(b"/Parent 2 0 R" in objects[page] for page in pages)
+    outline = objects[int(re.search(rb"/Outlines (\d+) 0 R", objects[1]).group(1))]
+    assert b"/Count 4" in outline
+    # bookmark 2 ("Alpha") points at the first page after the contents
+    first_memo = [body for body in objects.values() if b"/Dest [ %d 0 R" % pages[1] in body]
+    assert first_memo and "Alpha".encode("utf-16-be").hex().upper().encode() in first_memo[0]
+
+def test_book_writer_renumbers_references(tmp_path):
+    part = PDFReport().render(build_report_document(_report("Delta")))
+    with open(tmp_path / "book.pdf", "wb") as f:
+        writer = BookWriter(f)
+        first = writer.add_part(part)
+        second = writer.add_part(part)
+        writer.finish(first + second, [("Delta", first[0])], "Book")
+    objects, _, pages = read_pdf_part((tmp_path / "book.pdf").read_bytes())
+    assert pages == first + second
+    assert not set(first) & set(second)
+    for body in objects.values():
+        for number in re.findall(rb"(\d+) 0 R", body.split(b"stream")[0]):
+            assert int(number) in objects
+
+def test_read_reports_skips_failed_companies(tmp_path):
+    path = tmp_path / "screening.jsonl"
+    all_sections_failed = {"startup_name": "Empty", "company_data": {}, "errors": {},
+                           "llm_analysis": {"error": "LLM generation failed"}}
+    lines = [json.dumps(_report("Alpha")), json.dumps({"startup_name": "Broken", "error": "timeout"}),
+             json.dumps(all_sections_failed), '{"torn']
+    path.write_text("\n".join(lines), encoding="utf-8")
+    assert [report["startup_name"] for report in read_reports(str(path))] == ["Alpha"]
@@ -0,0 +1,52 @@
+# tests/test_rate_limit.py
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rate_limit import ProviderLimiter, Throttled, call_with_limiter, _parse_duration
+
+def test_parse_duration_formats():
+    assert _parse_duration("7.66s") == 7.66
+    assert abs(_parse_duration("2m59.56s") - 179.56) < 1e-9
+    assert _parse_duration("250ms") == 0.25
+    assert _parse_duration("3") == 3.0
+    assert _parse_duration(None) is None
+
+def test_aimd_halves_on_throttle_and_grows_on_success():
+    limiter = ProviderLimiter("test", requests_per_minute=6000, max_concurrency=8)
+    limiter.acquire()
+    limiter.release({"retry-after": "0"}, throttled=True)
+    assert limiter.concurrency_limit == 4
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release()
+    assert 4 < limiter.concurrency_limit <= 8
+
+def test_retry_after_and_exhausted_quota_block_new_calls():
+    limiter = ProviderLimiter("test", requests_per_minute=6000, max_concurrency=4)
+    limiter.acquire()
+    limiter.release({"Retry-After": "30"}, throttled=True)
+    assert limiter._try_acquire() > 25
+
+    limiter = ProviderLimiter("test", requests_per_minute=6000, max_concurrency=4)
+    limiter.acquire()
+    limiter.release({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m"})
+    assert limiter._try_acquire() > 55
+
+def test_throttled_calls_queue_and_succeed():
+    limiter = ProviderLimiter("test", requests_per_minute=6000, max_concurrency=2)
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise Throttled({"retry-after": "0.05"})
+        return "done", {}
+
+    assert call_with_limiter(limiter, flaky) == "done"
+    assert len(attempts) == 3
+    assert limiter.stats["throttled"] == 2
+    assert limiter.in_flight == 0
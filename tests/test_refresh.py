@@ -0,0 +1,127 @@
+# tests/test_refresh.py
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import refresh
+import async_api_calls
+from refresh import refresh_report, stale_sections, section_ages
+from rules import IncrementalRules, apply_investment_rules
+from company_record import CompanyRecord
+
+HOUR = 3600
+
+def _report(now):
+    company_data = {
+        "name": "Acme", "description": "Payments for shops", "category": {"sector": "Fintech"},
+        "total_funding": "$10M", "stage": "Seed", "market_size": "$5B", "founders_analysis": {"number_of_founders": 2},
+    }
+    return {
+        "company_data": company_data,
+        "llm_analysis": {"swot_analysis": "old"}, "investment_thesis": {"investment_summary": "old"},
+        "founders_analysis": {"summary": "old"}, "product_analysis": {"summary": "old"},
+        "rules_feedback": apply_investment_rules(CompanyRecord.from_dict(company_data), "Fintech"),
+        "startup_name": "Acme", "user_sector_input": "Fintech",
+        "section_fetched_at": {"profile": now - 2 * HOUR, "financials": now - 30 * HOUR, "market": now - HOUR},
+    }
+
+def _fake_providers(monkeypatch, sections, calls, gap_answers=None):
+    async def fetch(section, startup_name, sector, fresh=False):
+        calls.append(section)
+        return sections[section]
+
+    async def follow_up(template, startup_name, sector, ttl=None, fresh=False):
+        return gap_answers or {}
+
+    def layer(name):
+        async def run(company_data, *args):
+            calls.append(name)
+            return {"summary": f"new {name}"}
+        return run
+
+    monkeypatch.setattr(refresh, "fetch_company_section_async", fetch)
+    monkeypatch.setattr(async_api_calls, "_make_perplexity_request_async", follow_up)
+    for name in list(refresh._INDEPENDENT_LAYERS):
+        monkeypatch.setitem(refresh._INDEPENDENT_LAYERS, name, layer(name))
+    monkeypatch.setattr(refresh, "generate_investment_thesis_async", layer("investment_thesis"))
+
+def test_stale_sections_follow_per_section_ttls():
+    now = time.time()
+    report = _report(now)
+    assert stale_sections(report, now) == ["financials", "team"]
+    assert section_ages(report, now)["team"] is None
+    assert section_ages(report, now)["market"] == HOUR
+
+def test_refresh_refetches_only_stale_sections_and_dependent_layers(monkeypatch):
+    now = time.time()
+    report = _report(now)
+    calls = []
+    _fake_providers(monkeypatch, {
+        "financials": {"total_funding": "$25M", "stage": "Seed"},
+        "team": {"founders_analysis": {"number_of_founders": 2}},
+    }, calls)
+
+    refreshed, summary = refresh_report(report)
+    assert sorted(calls) == ["financials", "team"]
+    assert summary["refreshed"] == ["financials", "team"] and summary["failed"] == {}
+    assert summary["changed_fields"] == ["total_funding"] and summary["rerun_layers"] == []
+    assert refreshed["company_data"]["total_funding"] == "$25M"
+    assert refreshed["company_data"]["market_size"] == "$5B"
+    assert refreshed["llm_analysis"] == report["llm_analysis"]
+    assert refreshed["section_fetched_at"]["financials"] >= now
+    assert refreshed["section_fetched_at"]["profile"] == report["section_fetched_at"]["profile"]
+    assert refreshed["rules_feedback"] == apply_investment_rules(refreshed["company_record"], "Fintech")
+    assert stale_sections(refreshed) == []
+
+def test_changed_inputs_rerun_their_layers(monkeypatch):
+    report = _report(time.time())
+    calls = []
+    _fake_providers(monkeypatch, {"financials": {"total_funding": "$10M", "stage": "Series A"}}, calls)
+
+    refreshed, summary = refresh_report(report, sections=["financials"])
+    assert summary["changed_fields"] == ["stage"]
+    assert summary["rerun_layers"] == ["founders_analysis", "product_analysis"]
+    assert refreshed["founders_analysis"] == {"summary": "new founders_analysis"}
+    assert refreshed["investment_thesis"] == report["investment_thesis"]
+
+def test_new_analysis_reruns_the_thesis(monkeypatch):
+    report = _report(time.time())
+    calls = []
+    _fake_providers(monkeypatch, {"profile": dict(report["company_data"], description="Payroll for shops")}, calls)
+
+    refreshed, summary = refresh_report(report, sections=["profile"])
+    assert summary["rerun_layers"] == ["llm_analysis", "founders_analysis", "product_analysis", "investment_thesis"]
+
+def test_failed_section_keeps_previous_data(monkeypatch):
+    report = _report(time.time())
+    calls = []
+    _fake_providers(monkeypatch, {"financials": {"error": "timeout"}}, calls)
+    rules_state = IncrementalRules()
+    rules_state.update(CompanyRecord.from_dict(report["company_data"]), "Fintech")
+
+    refreshed, summary = refresh_report(report, sections=["financials"], rules_state=rules_state)
+    assert summary["failed"] == {"financials": "timeout"} and summary["refreshed"] == []
+    assert refreshed["company_data"] == report["company_data"]
+    assert refreshed["section_fetched_at"] == report["section_fetched_at"]
+    assert rules_state.last_evaluated == 0 and summary["rerun_layers"] == []
+
+def test_refreshed_sections_are_gap_filled_again(monkeypatch):
+    report = _report(time.time())
+    report["company_data"] = dict(report["company_data"], valuation="$40M", glassdoor_rating=4.1)
+    report["gap_filled"] = ["valuation", "glassdoor_rating"]
+    calls = []
+    _fake_providers(monkeypatch, {"financials": {"total_funding": "$10M", "stage": "Seed", "valuation": "N/A"}},
+                    calls, gap_answers={"valuation": "$60M"})
+
+    refreshed, summary = refresh_report(report, sections=["financials"])
+    assert summary["gap_filled"] == ["valuation"] and summary["changed_fields"] == ["valuation"]
+    assert refreshed["company_data"]["valuation"] == "$60M"
+    # The team section was not refreshed, so what gap fill found for it stands.
+    assert refreshed["gap_filled"] == ["glassdoor_rating", "valuation"]
+
+    _fake_providers(monkeypatch, {"financials": {"total_funding": "$10M", "stage": "Seed", "valuation": "N/A"}}, calls)
+    refreshed, summary = refresh_report(report, sections=["financials"])
+    assert refreshed["company_data"]["valuation"] == "N/A" and refreshed["gap_filled"] == ["glassdoor_rating"]
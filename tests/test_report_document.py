@@ -0,0 +1,66 @@
+# tests/test_report_document.py
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reportlab import rl_config
+from company_record import CompanyRecord
+from pdf_generator import PDFReport
+from report_document import build_report_document, render_markdown, report_key
+
+REPORT_DATA = {
+    "company_data": {
+        "name": "Acme", "foundedYear": 2019, "domain": "acme.io",
+        "geo": {"city": "Berlin", "country": "Germany"},
+        "social_media": {"linkedin": "https://linkedin.com/acme"},
+        "competitors": ["Foo", "Bar"], "total_funding": "$12.5M",
+        "founders_analysis": {"names_of_founders": ["Ann", "Bob"], "red_flags": "None"},
+        "key_investors": ["Sequoia"],
+    },
+    "llm_analysis": {"swot_analysis": "Strong team", "key_highlights": ["Fast growth"]},
+    "investment_thesis": {"investment_summary": "Promising"},
+    "founders_analysis": {"error": "timed out"},
+    "product_analysis": {"moat": "Data network effects"},
+    "rules_feedback": [{"text": "Team Size: 42 employees", "type": "positive"}],
+    "startup_name": "Acme Corp",
+}
+
+def test_document_resolves_display_values():
+    document = build_report_document(REPORT_DATA)
+    assert document.name == "Acme"
+    assert (document.city, document.address) == ("Berlin", "N/A")
+    assert document.website_url == "https://acme.io"
+    assert dict(document.facts["market_competition"])["Competitors"] == "Foo, Bar"
+    assert dict(document.facts["financials"])["Total Funding"] == "$12.5M"
+    assert dict(document.founder_details)["Red Flags"] == "None"
+
+def test_markdown():
+    markdown = render_markdown(build_report_document(REPORT_DATA))
+    assert markdown.startswith("\n# Preliminary Investment Fit Report: Acme\n")
+    assert "- **Linkedin:** [https://linkedin.com/acme](https://linkedin.com/acme)\n" in markdown
+    assert "**Founder(s):** Ann, Bob\n" in markdown
+    assert "- **Competitors:** Foo, Bar\n" in markdown
+    assert "### SWOT Analysis\nStrong team\n" in markdown
+    assert "### Moat\nData network effects\n" in markdown
+    assert "timed out" not in markdown
+    assert markdown.endswith("## Investment Fit (Our Rules)\n- Team Size: 42 employees\n")
+
+def test_report_key_follows_content():
+    record_attached = dict(REPORT_DATA, company_record=CompanyRecord.from_dict(REPORT_DATA["company_data"]))
+    assert report_key(REPORT_DATA) == report_key(dict(reversed(list(REPORT_DATA.items()))))
+    assert report_key(record_attached) == report_key(REPORT_DATA)
+    rescored = dict(REPORT_DATA, rules_feedback=[{"text": "Team Size: 42 employees", "type": "negative"}])
+    assert report_key(rescored) != report_key(REPORT_DATA)
+
+def test_pdf_renders_the_same_document_as_generate(monkeypatch):
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    rendered = PDFReport().render(build_report_document(REPORT_DATA))
+    generated = PDFReport().generate(
+        REPORT_DATA["startup_name"], REPORT_DATA["company_data"], REPORT_DATA["llm_analysis"],
+        REPORT_DATA["rules_feedback"], REPORT_DATA["investment_thesis"],
+        REPORT_DATA["founders_analysis"], REPORT_DATA["product_analysis"],
+    )
+    assert rendered.startswith(b"%PDF")
+    assert rendered == generated
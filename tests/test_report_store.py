@@ -0,0 +1,77 @@
+# tests/test_report_store.py
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from report_store import ReportStore, normalize_name
+from company_record import CompanyRecord
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def _report(name, sector="Fintech", stage="Seed"):
+    return {
+        "company_data": {"name": name, "stage": stage, "total_funding": "$12M"},
+        "llm_analysis": {"swot_analysis": "Strong team."}, "investment_thesis": {},
+        "founders_analysis": {}, "product_analysis": {},
+        "rules_feedback": [{"text": "Team Size: 42 employees", "type": "positive"}],
+        "startup_name": name, "user_sector_input": sector,
+    }
+
+def test_normalize_name():
+    assert normalize_name("  Acme, Inc. ") == "acme"
+    assert normalize_name("Acme Pvt Ltd") == "acme"
+    assert normalize_name("Cred") == "cred"
+    assert normalize_name("Ltd") == "ltd"
+
+def test_round_trip_without_company_record(tmp_path):
+    store = ReportStore(path=str(tmp_path / "reports.sqlite3"))
+    report = _report("Acme")
+    report_id = store.save(dict(report, company_record=CompanyRecord.from_dict(report["company_data"])))
+    assert store.get(report_id) == report
+    assert store.get(report_id + 1) is None
+
+def test_latest_matches_normalized_name_and_sector(tmp_path):
+    clock = FakeClock()
+    store = ReportStore(path=str(tmp_path / "reports.sqlite3"), clock=clock)
+    store.save(_report("Acme Inc", sector="Fintech"))
+    clock.now += 10
+    store.save(_report("ACME", sector="Healthtech"))
+    assert store.latest("acme")["user_sector_input"] == "Healthtech"
+    assert store.latest("Acme, Inc.", sector=" fintech ")["startup_name"] == "Acme Inc"
+    assert store.latest("acme", sector="Crypto") is None
+    clock.now += 100
+    assert store.latest("acme", max_age=50) is None
+
+def test_keyset_pagination_and_filters(tmp_path):
+    clock = FakeClock()
+    store = ReportStore(path=str(tmp_path / "reports.sqlite3"), clock=clock)
+    for n in range(25):
+        clock.now += 1
+        store.save(_report(f"Company {n}", stage="Seed" if n % 2 else "Series A"))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.list_reports(limit=10, before=cursor)
+        seen.extend(report["startup_name"] for report in page)
+        if cursor is None:
+            break
+    assert seen == [f"Company {n}" for n in reversed(range(25))]
+    assert store.count() == 25
+
+    assert store.count(stage="seed") == 12
+    page, cursor = store.list_reports(stage="SEED", limit=5)
+    assert [report["stage"] for report in page] == ["seed"] * 5 and cursor is not None
+    page, _ = store.list_reports(name="company 1")
+    assert {report["startup_name"] for report in page} == {"Company 1"} | {f"Company {n}" for n in range(10, 20)}
+    assert store.count(sector="Crypto") == 0
+
+def test_store_survives_reopening(tmp_path):
+    path = str(tmp_path / "reports.sqlite3")
+    report_id = ReportStore(path=path).save(_report("Persisted"))
+    assert ReportStore(path=path).get(report_id)["startup_name"] == "Persisted"
@@ -0,0 +1,118 @@
+# tests/test_resilience.py
+import sys
+import os
+import time
+import asyncio
+import pytest
+import requests
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import resilience
+from rate_limit import get_limiter
+from resilience import LatencyHistogram, resilient_call, resilient_call_async
+
+def test_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for _ in range(95):
+        histogram.record(0.2)
+    for _ in range(5):
+        histogram.record(10.0)
+    assert 0.2 <= histogram.quantile(0.5) < 0.3
+    assert histogram.quantile(0.95) < 0.3
+    assert histogram.quantile(0.99) >= 10.0
+
+def test_transient_errors_are_retried(monkeypatch):
+    monkeypatch.setenv("RETRY_BASE_DELAY", "0.01")
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise requests.ConnectionError("reset by peer")
+        return "ok", {}
+
+    assert resilient_call("test-retry", "model", flaky) == "ok"
+    assert len(calls) == 3
+
+def test_permanent_errors_are_not_retried():
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad payload")
+
+    with pytest.raises(ValueError):
+        resilient_call("test-permanent", "model", broken)
+    assert len(calls) == 1
+
+def test_slow_call_is_hedged(monkeypatch):
+    monkeypatch.setenv("HEDGE_REQUESTS", "true")
+    monkeypatch.setenv("HEDGE_MIN_SAMPLES", "5")
+    monkeypatch.setenv("HEDGE_MAX_FRACTION", "1")
+    histogram, hedger = resilience._get("test-hedge", "model")
+    for _ in range(10):
+        histogram.record(0.05)
+
+    calls = []
+
+    async def sometimes_slow():
+        calls.append(1)
+        await asyncio.sleep(2 if len(calls) == 1 else 0.01)
+        return len(calls), {}
+
+    start = time.perf_counter()
+    assert asyncio.run(resilient_call_async("test-hedge", "model", sometimes_slow)) == 2
+    assert time.perf_counter() - start < 1
+    assert hedger.hedge_wins == 1
+
+def _hedging_enabled(monkeypatch, provider):
+    monkeypatch.setenv("HEDGE_REQUESTS", "true")
+    monkeypatch.setenv("HEDGE_MIN_SAMPLES", "5")
+    monkeypatch.setenv("HEDGE_MAX_FRACTION", "1")
+    histogram, hedger = resilience._get(provider, "model")
+    for _ in range(10):
+        histogram.record(0.05)
+    limiter = get_limiter(provider, "model")
+    return hedger, limiter
+
+def test_time_queued_in_the_limiter_does_not_trigger_a_hedge(monkeypatch):
+    hedger, limiter = _hedging_enabled(monkeypatch, "test-queued")
+    calls = []
+
+    def fast():
+        calls.append(1)
+        return "ok", {}
+
+    limiter.blocked_until = limiter.clock() + 0.5
+    assert resilient_call("test-queued", "model", fast) == "ok"
+    assert len(calls) == 1 and hedger.hedges == 0
+
+def test_time_queued_in_the_limiter_does_not_trigger_an_async_hedge(monkeypatch):
+    hedger, limiter = _hedging_enabled(monkeypatch, "test-queued-async")
+    calls = []
+
+    async def fast():
+        calls.append(1)
+        return "ok", {}
+
+    limiter.blocked_until = limiter.clock() + 0.5
+    assert asyncio.run(resilient_call_async("test-queued-async", "model", fast)) == "ok"
+    assert len(calls) == 1 and hedger.hedges == 0
+
+def test_sync_hedge_loser_still_queued_gives_up(monkeypatch):
+    monkeypatch.setenv("TEST-HEDGE-SYNC_MAX_CONCURRENCY", "1")
+    hedger, limiter = _hedging_enabled(monkeypatch, "test-hedge-sync")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.3)
+        return len(calls), {}
+
+    # With one slot, the hedge queues behind the primary and is abandoned once the primary wins.
+    assert resilient_call("test-hedge-sync", "model", slow) == 1
+    time.sleep(0.1)
+    assert len(calls) == 1 and hedger.hedges == 1
+    assert limiter.in_flight == 0
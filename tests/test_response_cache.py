@@ -0,0 +1,107 @@
+# tests/test_response_cache.py
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from response_cache import ResponseCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def test_hit_and_miss_counters(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"))
+    key = cache.make_key("groq", "llama", [{"role": "user", "content": "hi"}], 0.7)
+    assert cache.get("groq", key) == (None, None)
+    cache.set("groq", key, '{"ok": true}')
+    assert cache.get("groq", key)[0] == '{"ok": true}'
+    stats = cache.stats()
+    assert stats["hits"] == {"groq": 1}
+    assert stats["misses"] == {"groq": 1}
+    assert stats["entries"] == 1
+
+def test_key_depends_on_every_input():
+    messages = [{"role": "user", "content": "hi"}]
+    base = ResponseCache.make_key("groq", "llama", messages, 0.7)
+    assert base == ResponseCache.make_key("groq", "llama", [{"content": "hi", "role": "user"}], 0.7)
+    assert base != ResponseCache.make_key("groq", "llama", messages, 0.8)
+    assert base != ResponseCache.make_key("perplexity", "llama", messages, 0.7)
+    assert base != ResponseCache.make_key("groq", "other", messages, 0.7)
+
+def test_entries_expire_per_provider(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), ttls={"perplexity": 60, "groq": 3600}, clock=clock)
+    cache.set("perplexity", "p", "profile")
+    cache.set("groq", "g", "analysis")
+    clock.now += 120
+    assert cache.get("perplexity", "p")[0] is None
+    assert cache.get("groq", "g") == ("analysis", 1000.0)
+
+def test_lru_eviction_respects_size_cap(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), max_bytes=25, clock=clock)
+    cache.set("groq", "a", "x" * 10)
+    clock.now += 1
+    cache.set("groq", "b", "y" * 10)
+    clock.now += 1
+    assert cache.get("groq", "a")[0] == "x" * 10  # "a" is now the most recently used
+    clock.now += 1
+    cache.set("groq", "c", "z" * 10)
+    assert cache.get("groq", "b")[0] is None
+    assert cache.get("groq", "a")[0] == "x" * 10
+    assert cache.stats()["evictions"] == 1
+
+def test_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(path=path).set("perplexity", "k", "persisted")
+    assert ResponseCache(path=path).get("perplexity", "k")[0] == "persisted"
+
+def test_lookup_ttl_only_shortens_the_provider_ttl(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), ttls={"perplexity": 100}, clock=clock)
+    cache.set("perplexity", "k", "section")
+    clock.now += 50
+    assert cache.get("perplexity", "k", ttl=10)[0] is None
+    assert cache.get("perplexity", "k", ttl=1000) == ("section", 1000.0)
+    clock.now += 60
+    assert cache.get("perplexity", "k", ttl=1000)[0] is None
+
+def test_only_responses_with_json_are_cached(tmp_path, monkeypatch):
+    import api_calls
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"))
+    answers = iter(["Sorry, I could not find that.", '{"valuation": "$1B"}'])
+    monkeypatch.setenv("PERPLEXITY_API_KEY", "x")
+    monkeypatch.setattr(api_calls, "get_response_cache", lambda: cache)
+    monkeypatch.setattr(api_calls, "resilient_call", lambda provider, model, call: next(answers))
+    assert "error" in api_calls._make_perplexity_request("{startup_name}", "Acme", "Fintech")
+    assert cache.stats()["entries"] == 0
+    assert api_calls._make_perplexity_request("{startup_name}", "Acme", "Fintech") == {"valuation": "$1B"}
+    assert cache.stats()["entries"] == 1
+
+def test_cached_sections_keep_their_fetch_time(tmp_path, monkeypatch):
+    import api_calls
+    from pipeline import PipelineResult
+    clock = FakeClock()
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), clock=clock)
+    monkeypatch.setenv("PERPLEXITY_API_KEY", "x")
+    monkeypatch.setattr(api_calls, "get_response_cache", lambda: cache)
+    monkeypatch.setattr(api_calls, "resilient_call", lambda provider, model, call: '{"valuation": "$1B"}')
+    live = api_calls.fetch_company_section("financials", "Acme", "Fintech")
+    assert api_calls.pop_fetched_at(live, now=5000.0) == 5000.0 and live == {"valuation": "$1B"}
+
+    clock.now += 3600
+    fetched_at = {}
+    company_data = api_calls.get_company_data("Acme", "Fintech", fetched_at=fetched_at)
+    assert fetched_at["financials"] == 1000.0 and company_data["valuation"] == "$1B"
+    assert api_calls.FETCHED_AT_KEY not in company_data
+
+    result = PipelineResult()
+    result.results["financials"] = {api_calls.company_field(key): value for key, value in
+                                    api_calls.fetch_company_section("financials", "Acme", "Fintech").items()}
+    report = api_calls.build_report_data(result, "Acme")
+    assert report["section_fetched_at"] == {"financials": 1000.0}
+    assert report["company_data"] == {"valuation": "$1B"}
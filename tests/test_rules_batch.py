@@ -0,0 +1,73 @@
+# tests/test_rules_batch.py
+import sys
+import os
+import json
+import random
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rules import apply_investment_rules, load_ruleset
+from rules_batch import apply_investment_rules_batch, outcome_matrix, PASSED, FAILED, SKIPPED
+
+def _rule(rule_id, field, operator, value, **extra):
+    rule = {
+        "id": rule_id, "field_to_check": field, "operator": operator, "value": value,
+        "result_if_true": {"type": "positive", "text": rule_id + " yes {value}"},
+        "result_if_false": {"type": "negative", "text": rule_id + " no"},
+    }
+    rule.update(extra)
+    return rule
+
+RULES = [
+    _rule("BETWEEN", "metrics.employees", "between", [6, 199]),
+    _rule("GT", "glassdoor_rating", "gt", 3.5),
+    _rule("LT", "aggregate_founder_shareholding", "lt", 30),
+    _rule("LE", "foundedYear", "le", 2020, condition={"field": "stage", "operator": "contains_any", "value": ["Seed"]}),
+    _rule("EQUALS", "founders_analysis.number_of_founders", "equals", 1),
+    _rule("LISTLEN", "competitors", "list_length_between", [1, 3]),
+    _rule("AGE", "calculated.age", "between", [2, 10]),
+    _rule("FUNDING", "calculated.parsed_total_funding", "gt", 1_000_000),
+    _rule("SECTOR", "category.sector", "contains", "{user_sector_input}"),
+    _rule("EMPTY", "founders_analysis.red_flags", "is_empty_or_na", None),
+    _rule("EQUALS_STR", "stage", "equals", "Seed"),
+]
+
+VALUES = [None, 0, 1, 5, 6, 199, 200, 2015, 2021, 3.5, 3.6, float("nan"), True, False,
+          2 ** 60, 2 ** 60 + 1, 10 ** 400, "N/A", "", "12", [], ["a"], ["a", "b", "c", "d"], {}]
+
+def _random_company(rng):
+    company = {}
+    for field in ("glassdoor_rating", "aggregate_founder_shareholding", "foundedYear", "competitors"):
+        value = rng.choice(VALUES)
+        if value is not None:
+            company[field] = value
+    company["metrics"] = rng.choice([{"employees": rng.choice(VALUES)}, "N/A", {}])
+    company["founders_analysis"] = {"number_of_founders": rng.choice(VALUES), "red_flags": rng.choice(["None", "fraud", "", None])}
+    company["stage"] = rng.choice(["Seed", "Series A", None, 3])
+    company["category"] = {"sector": rng.choice(["Fintech", "Healthtech", 7])}
+    company["total_funding"] = rng.choice(["$5 million", "$500", "N/A", None])
+    return company
+
+def test_batch_matches_scalar_engine(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"global_rules": RULES}))
+    rng = random.Random(7)
+    companies = [_random_company(rng) for _ in range(2000)]
+    expected = [apply_investment_rules(company, "fintech", rules_path=str(path)) for company in companies]
+    assert apply_investment_rules_batch(companies, "fintech", rules_path=str(path)) == expected
+
+def test_outcome_matrix(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"global_rules": RULES[:2]}))
+    companies = [{"metrics": {"employees": 50}, "glassdoor_rating": 3.0}, {"metrics": {"employees": 500}}]
+    matrix = outcome_matrix(load_ruleset(str(path)), companies, "")
+    assert matrix.tolist() == [[PASSED, FAILED], [FAILED, SKIPPED]]
+
+def test_empty_inputs_and_missing_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"global_rules": []}))
+    assert apply_investment_rules_batch([{}, {}], "", rules_path=str(path)) == [[], []]
+    assert apply_investment_rules_batch([], "", rules_path=str(path)) == []
+    error = apply_investment_rules_batch([{}], "", rules_path=str(tmp_path / "nope.json"))
+    assert error == [[{"text": "Critical Error: Could not load or parse rules.json.", "type": "negative"}]]
@@ -0,0 +1,67 @@
+# tests/test_rules_engine.py
+import sys
+import os
+import json
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rules import apply_investment_rules, load_ruleset
+
+def _rule(rule_id, field, operator, value, true_text="yes {value}", false_text="no {value}", **extra):
+    rule = {
+        "id": rule_id, "field_to_check": field, "operator": operator, "value": value,
+        "result_if_true": {"type": "positive", "text": true_text},
+        "result_if_false": {"type": "negative", "text": false_text},
+    }
+    rule.update(extra)
+    return rule
+
+def _write(path, rules):
+    path.write_text(json.dumps({"global_rules": rules}))
+
+def test_operators_paths_and_conditions(tmp_path):
+    path = tmp_path / "rules.json"
+    _write(path, [
+        _rule("R1", "category.sector", "contains", "{user_sector_input}"),
+        _rule("R2", "metrics.employees", "between", [6, 199]),
+        _rule("R3", "competitors", "list_length_between", [1, 3]),
+        _rule("R4", "calculated.parsed_market_size", "gt", 1_000_000_000),
+        _rule("R5", "foundedYear", "le", 2020, condition={"field": "stage", "operator": "contains_any", "value": ["Seed"]}),
+        _rule("R6", "missing.field", "is_not_empty", None),
+        _rule("R7", "description", "unknown_operator", None),
+    ])
+    company = {
+        "category": {"sector": "Fintech"}, "metrics": {"employees": 250}, "competitors": ["A", "B"],
+        "market_size": "$2.5 billion", "foundedYear": 2018, "stage": "Series A", "description": "x",
+    }
+    assert apply_investment_rules(company, "fintech", rules_path=str(path)) == [
+        {"text": "yes Fintech", "type": "positive"},
+        {"text": "no 250", "type": "negative"},
+        {"text": "yes 2", "type": "positive"},
+        {"text": "yes 2500000000.0", "type": "positive"},
+        {"text": "no x", "type": "negative"},
+    ]
+
+def test_ruleset_recompiles_only_when_file_changes(tmp_path):
+    path = tmp_path / "rules.json"
+    _write(path, [_rule("R1", "name", "is_not_empty", None)])
+    first = load_ruleset(str(path))
+    assert load_ruleset(str(path)) is first
+
+    # Same content with a new mtime: re-hashed but not recompiled.
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    assert load_ruleset(str(path)) is first
+
+    _write(path, [_rule("R1", "name", "equals", "Acme")])
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2 * 10**9))
+    second = load_ruleset(str(path))
+    assert second is not first
+    assert apply_investment_rules({"name": "Acme"}, "", rules_path=str(path)) == [{"text": "yes Acme", "type": "positive"}]
+
+def test_missing_or_invalid_rules_file(tmp_path):
+    error = [{"text": "Critical Error: Could not load or parse rules.json.", "type": "negative"}]
+    assert apply_investment_rules({}, "", rules_path=str(tmp_path / "nope.json")) == error
+    path = tmp_path / "broken.json"
+    path.write_text("{not json")
+    assert apply_investment_rules({}, "", rules_path=str(path)) == error
@@ -0,0 +1,69 @@
+# tests/test_rules_incremental.py
+import sys
+import os
+import copy
+import json
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rules import apply_investment_rules, load_ruleset, IncrementalRules, SECTOR_INPUT
+
+RULES = {"global_rules": [
+    {"field_to_check": "category.sector", "operator": "contains", "value": "{user_sector_input}",
+     "result_if_true": {"type": "positive", "text": "sector fit"}, "result_if_false": {"type": "negative", "text": "sector miss"}},
+    {"field_to_check": "metrics.employees", "operator": "between", "value": [6, 199],
+     "result_if_true": {"type": "positive", "text": "team {value}"}, "result_if_false": {"type": "negative", "text": "team off {value}"}},
+    {"field_to_check": "calculated.age", "operator": "between", "value": [2, 10],
+     "result_if_true": {"type": "positive", "text": "age {value}"}, "result_if_false": {"type": "negative", "text": "age off {value}"}},
+    {"field_to_check": "foundedYear", "operator": "le", "value": 2020,
+     "condition": {"field": "stage", "operator": "contains_any", "value": ["Seed"]},
+     "result_if_true": {"type": "negative", "text": "delayed"}, "result_if_false": {"type": "positive", "text": "on time"}},
+]}
+
+COMPANY = {"category": {"sector": "Fintech"}, "metrics": {"employees": 40}, "foundedYear": 2019, "stage": "Seed"}
+
+def _rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(RULES))
+    return str(path)
+
+def test_index_covers_conditions_calculations_and_sector(tmp_path):
+    ruleset = load_ruleset(_rules_file(tmp_path))
+    assert ruleset.rules_reading([SECTOR_INPUT]) == [0]
+    assert ruleset.rules_reading(["foundedYear"]) == [2, 3]
+    assert ruleset.rules_reading(["stage"]) == [3]
+    assert ruleset.rules_reading(["metrics", "unknown"]) == [1]
+
+def test_only_rules_reading_changed_inputs_are_rerun(tmp_path):
+    path = _rules_file(tmp_path)
+    state = IncrementalRules(path)
+    assert state.update(COMPANY, "fintech") == apply_investment_rules(COMPANY, "fintech", rules_path=path)
+    assert state.last_evaluated == 4
+
+    assert state.update(COMPANY, "healthtech") == apply_investment_rules(COMPANY, "healthtech", rules_path=path)
+    assert state.last_evaluated == 1
+
+    edited = copy.deepcopy(COMPANY)
+    edited["foundedYear"] = 2023
+    assert state.update(edited, "healthtech") == apply_investment_rules(edited, "healthtech", rules_path=path)
+    assert state.last_evaluated == 2
+
+    edited["metrics"]["employees"] = 500  # nested edit made in place
+    assert state.update(edited, "healthtech") == apply_investment_rules(edited, "healthtech", rules_path=path)
+    assert state.last_evaluated == 1
+
+    assert state.update(edited, "healthtech", changed=[]) == apply_investment_rules(edited, "healthtech", rules_path=path)
+    assert state.last_evaluated == 0
+
+def test_new_rules_file_triggers_full_evaluation(tmp_path):
+    path = _rules_file(tmp_path)
+    state = IncrementalRules(path)
+    state.update(COMPANY, "fintech")
+    rules = json.loads(json.dumps(RULES))
+    rules["global_rules"][1]["value"] = [50, 100]
+    with open(path, "w") as f:
+        json.dump(rules, f)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    assert state.update(COMPANY, "fintech") == apply_investment_rules(COMPANY, "fintech", rules_path=path)
+    assert state.last_evaluated == 4
@@ -0,0 +1,68 @@
+# tests/test_rules_multi.py
+import sys
+import os
+import json
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rules import apply_investment_rules, apply_investment_rules_multi, load_ruleset, load_multi_ruleset
+
+def _rule(field, operator, value, text, **extra):
+    rule = {
+        "field_to_check": field, "operator": operator, "value": value,
+        "result_if_true": {"type": "positive", "text": text + " yes {value}"},
+        "result_if_false": {"type": "negative", "text": text + " no"},
+    }
+    rule.update(extra)
+    return rule
+
+SEED_CONDITION = {"field": "stage", "operator": "contains_any", "value": ["Seed"]}
+
+def _write_funds(tmp_path):
+    funds = {
+        "seed_fund": [
+            _rule("category.sector", "contains", "{user_sector_input}", "Seed sector"),
+            _rule("metrics.employees", "between", [1, 50], "Seed team"),
+            _rule("foundedYear", "le", 2020, "Seed delay", condition=SEED_CONDITION),
+        ],
+        "growth_fund": [
+            _rule("metrics.employees", "between", [1, 50], "Growth team"),
+            _rule("metrics.employees", "between", [50, 500], "Growth scale"),
+            _rule("calculated.age", "between", [2, 10], "Growth age"),
+            _rule("foundedYear", "le", 2020, "Growth delay", condition=SEED_CONDITION),
+        ],
+    }
+    paths = {}
+    for name, rules in funds.items():
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps({"global_rules": rules}))
+        paths[name] = str(path)
+    return paths
+
+def test_matches_each_ruleset_evaluated_alone(tmp_path):
+    paths = _write_funds(tmp_path)
+    companies = [
+        {"category": {"sector": "Fintech"}, "metrics": {"employees": 30}, "foundedYear": 2018, "stage": "Seed"},
+        {"category": {"sector": "Healthtech"}, "metrics": {"employees": 120}, "foundedYear": 2022, "stage": "Series A"},
+        {},
+    ]
+    for company in companies:
+        feedback = apply_investment_rules_multi(company, "fintech", paths)
+        assert list(feedback) == ["seed_fund", "growth_fund"]
+        for name, path in paths.items():
+            assert feedback[name] == apply_investment_rules(company, "fintech", rules_path=path)
+
+def test_shared_predicates_are_evaluated_once(tmp_path):
+    paths = _write_funds(tmp_path)
+    multi = load_multi_ruleset({name: load_ruleset(path) for name, path in paths.items()})
+    assert len(multi.predicates) == 5
+    assert len(multi.conditions) == 1
+    assert load_multi_ruleset({name: load_ruleset(path) for name, path in paths.items()}) is multi
+
+def test_missing_ruleset_only_affects_its_own_fund(tmp_path):
+    paths = _write_funds(tmp_path)
+    paths["broken"] = str(tmp_path / "missing.json")
+    feedback = apply_investment_rules_multi({"metrics": {"employees": 10}}, "", paths)
+    assert feedback["broken"] == [{"text": "Critical Error: Could not load or parse rules.json.", "type": "negative"}]
+    assert feedback["seed_fund"] == [{"text": "Seed team yes 10", "type": "positive"}]
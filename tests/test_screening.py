@@ -0,0 +1,98 @@
+# tests/test_screening.py
+import sys
+import os
+import json
+import sqlite3
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import screening
+from screening import screen, parse_range
+from report_store import ReportStore, screening_values
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def _report(name, sector="Fintech", funding="$10M", founders=2, red_flags="None", positives=3):
+    return {
+        "company_data": {
+            "name": name, "stage": "Seed", "foundedYear": 2019, "total_funding": funding,
+            "category": {"sector": sector}, "metrics": {"employees": "50-100"},
+            "founders_analysis": {"names_of_founders": ["A", "B", "C"][:founders], "number_of_founders": founders,
+                                  "red_flags": red_flags},
+        },
+        "rules_feedback": [{"text": "ok", "type": "positive"}] * positives + [{"text": "no", "type": "negative"}],
+        "startup_name": name, "user_sector_input": "Fintech",
+    }
+
+def _store(tmp_path):
+    clock = FakeClock()
+    store = ReportStore(path=str(tmp_path / "reports.sqlite3"), clock=clock)
+    for report in (
+        _report("Alpha", funding="$5M", positives=2),
+        _report("Beta", funding="$20-30M", positives=5),
+        _report("Gamma", funding="$60M", positives=6),
+        _report("Delta", founders=1, positives=4),
+        _report("Epsilon", red_flags="Lawsuit from a former co-founder", positives=7),
+        _report("Zeta", sector="Healthtech", positives=8),
+        _report("Eta", funding="N/A", positives=9),
+    ):
+        clock.now += 1
+        store.save(report)
+    return store, clock
+
+def test_screening_values():
+    values = screening_values(_report("Acme", funding="$20-30M", red_flags="N/A"))
+    assert values == {
+        "total_funding": 25_000_000, "valuation": None, "market_size": None, "employees": 75,
+        "year_founded": 2019, "founders": 2, "red_flags": 0, "positive_rules": 3, "negative_rules": 1,
+    }
+    report = _report("Acme", red_flags=["Lawsuit", "N/A"])
+    del report["company_data"]["founders_analysis"]["number_of_founders"]
+    assert screening_values(report)["founders"] == 2 and screening_values(report)["red_flags"] == 1
+
+def test_screen_filters_and_sorts(tmp_path):
+    store, _ = _store(tmp_path)
+    rows, total = screen(store, sector="FINTECH", ranges={
+        "total_funding": (5e6, 50e6), "founders": (2, None), "red_flags": (None, 0),
+    })
+    assert [row["startup_name"] for row in rows] == ["Beta", "Alpha"] and total == 2
+
+    rows, total = screen(store, sort_by="total_funding", descending=False, limit=3, offset=1)
+    assert [row["startup_name"] for row in rows] == ["Delta", "Epsilon", "Zeta"]
+    assert total == 7
+    funding = [row["total_funding"] for row in screen(store, sort_by="total_funding", limit=10)[0]]
+    assert funding[-1] is None and funding[:-1] == sorted(funding[:-1], reverse=True)
+
+def test_latest_report_replaces_screening_row(tmp_path):
+    store, clock = _store(tmp_path)
+    clock.now += 1
+    store.save(_report("alpha", funding="$40M", positives=1))
+    rows, total = screen(store, name="Alph")
+    assert total == 1 and rows[0]["total_funding"] == 40e6 and rows[0]["positive_rules"] == 1
+    assert store.count(name="alpha") == 2
+
+def test_existing_store_is_backfilled(tmp_path):
+    store, _ = _store(tmp_path)
+    connection = sqlite3.connect(store.path)
+    connection.execute("DROP TABLE screening")
+    connection.commit()
+    connection.close()
+    assert screen(ReportStore(path=store.path))[1] == 7
+
+def test_parse_range():
+    assert parse_range("5M-50M") == (5e6, 50e6)
+    assert parse_range("$5M-") == (5e6, None)
+    assert parse_range("-0") == (None, 0)
+    assert parse_range("2") == (2, 2)
+
+def test_cli_prints_json_lines(tmp_path, capsys):
+    store, _ = _store(tmp_path)
+    assert screening.main(["--store", store.path, "--sector", "fintech", "--total-funding", "5M-50M",
+                           "--min-founders", "2", "--max-red-flags", "0", "--json"]) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["startup_name"] for row in rows] == ["Beta", "Alpha"]
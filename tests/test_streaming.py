@@ -0,0 +1,56 @@
+# tests/test_streaming.py
+import sys
+import os
+import json
+import queue
+import asyncio
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streaming import emit, with_stream_sink, parse_sse_line
+from async_api_calls import _drain
+
+def _line(chunk):
+    return "data: " + json.dumps(chunk)
+
+def test_parse_sse_deltas_and_done():
+    text = ""
+    for part in ['{"name": ', '"Acme"}']:
+        text, finished = parse_sse_line(_line({"choices": [{"delta": {"content": part}}]}), text)
+        assert not finished
+    assert text == '{"name": "Acme"}'
+    assert parse_sse_line("", text) == (text, False)
+    assert parse_sse_line(": keep-alive", text) == (text, False)
+    assert parse_sse_line("data: [DONE]", text) == (text, True)
+
+def test_parse_sse_cumulative_message_chunks():
+    text, _ = parse_sse_line(_line({"choices": [{"message": {"content": "{\"na"}}]}), "")
+    text, finished = parse_sse_line(_line({"choices": [{"message": {"content": "{\"name\": 1}"}, "finish_reason": "stop"}]}), text)
+    assert text == '{"name": 1}'
+    assert finished
+
+def test_stream_sink_is_scoped_to_each_node():
+    seen = []
+
+    async def node(label):
+        await asyncio.sleep(0)
+        emit(label)
+        return label
+
+    async def run():
+        wrapped = [with_stream_sink(name, node, lambda n, t: seen.append((n, t))) for name in ("a", "b")]
+        await asyncio.gather(wrapped[0]("one"), wrapped[1]("two"))
+        emit("outside")
+
+    asyncio.run(run())
+    assert sorted(seen) == [("a", "one"), ("b", "two")]
+
+def test_drain_keeps_latest_partial_per_node_in_order():
+    events = queue.Queue()
+    for event in [("partial", "a", "x"), ("partial", "b", "y"), ("partial", "a", "xy"),
+                  ("done", "a", "result"), ("partial", "b", "yz")]:
+        events.put(event)
+    assert _drain(events, timeout=0.1) == [
+        ("partial", "a", "xy"), ("done", "a", "result"), ("partial", "b", "yz"),
+    ]